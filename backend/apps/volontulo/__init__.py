@@ -3,3 +3,5 @@
 """
 .. module:: __init__
 """
+
+default_app_config = 'apps.volontulo.apps.VolontuloConfig'
@@ -7,12 +7,16 @@
 from django.contrib import admin
 
 from apps.volontulo.models import Offer
+from apps.volontulo.models import OfferApplication
 from apps.volontulo.models import OfferImage
 from apps.volontulo.models import Organization
+from apps.volontulo.models import OutgoingEmail
 from apps.volontulo.models import UserProfile
 
 
 admin.site.register(Offer)
+admin.site.register(OfferApplication)
 admin.site.register(OfferImage)
 admin.site.register(Organization)
+admin.site.register(OutgoingEmail)
 admin.site.register(UserProfile)
@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: apps
+"""
+
+from django.apps import AppConfig
+
+
+class VolontuloConfig(AppConfig):
+    """Volontulo application config."""
+
+    name = 'apps.volontulo'
+    verbose_name = 'Volontulo'
+
+    def ready(self):
+        """Connect signal handlers."""
+        # pylint: disable=unused-variable
+        from apps.volontulo import signals
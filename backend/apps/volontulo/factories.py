@@ -8,6 +8,7 @@ import datetime
 import os
 
 from django.contrib.auth import get_user_model
+from django.db.models import F
 from django.utils import timezone
 import factory
 from factory.django import ImageField
@@ -15,6 +16,7 @@ from factory.fuzzy import FuzzyChoice
 import requests
 
 from apps.volontulo.models import Offer
+from apps.volontulo.models import OfferApplication
 from apps.volontulo.models import OfferImage
 from apps.volontulo.models import Organization
 from apps.volontulo.models import UserProfile
@@ -190,7 +192,11 @@ class OfferFactory(factory.DjangoModelFactory):
         if extracted:
             # A list of Users were passed in, use them
             for user in extracted:
-                self.volunteers.add(user)
+                OfferApplication.objects.create(offer=self, user=user)
+            Offer.objects.filter(id=self.id).update(
+                volunteers_count=F('volunteers_count') + len(extracted),
+            )
+            self.volunteers_count += len(extracted)
 
     description = factory.Faker("paragraph")
     requirements = factory.Faker("paragraph")
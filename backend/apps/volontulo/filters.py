@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: filters
+"""
+
+import math
+
+from django.contrib.postgres.search import SearchQuery
+from django.contrib.postgres.search import SearchRank
+from django.db import connections
+from django.db.models import DecimalField
+from django.db.models import ExpressionWrapper
+from django.db.models import F
+from django.db.models import FloatField
+from django.db.models import Q
+from django.db.models import Value
+from django.db.models.functions import Cast
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+from apps.volontulo.lib.geo import get_bounding_box
+from apps.volontulo.lib.geo import KM_PER_DEGREE
+
+# has to match configuration used by triggers from migration 0016:
+SEARCH_CONFIG = 'polish'
+
+
+class OfferPermissionFilter(BaseFilterBackend):
+
+    """Limits offers to the ones visible to user.
+
+    Administrators see all offers, members of organizations also the
+    unpublished offers of their organizations and everybody else only the
+    published ones. Organizations are taken from `organization_ids`
+    cached on user's profile for the whole request, so authorization is
+    a condition on indexed columns of the offers query instead of
+    a check of every offer. Besides API views it is used by
+    server-rendered views, which pass no view.
+    """
+
+    def filter_queryset(self, request, queryset, view=None):
+        user = request.user
+        if not user.is_authenticated():
+            return queryset.filter(offer_status='published')
+        if user.userprofile.is_administrator:
+            return queryset
+        return queryset.filter(
+            Q(offer_status='published') |
+            Q(organization_id__in=user.userprofile.organization_ids)
+        )
+
+
+class OfferSearchFilter(BaseFilterBackend):
+
+    """Full-text search over offers.
+
+    On PostgreSQL offers are matched against trigger-maintained
+    `search_vector` column (GIN indexed) and annotated with `rank`. Rank is
+    cast to a fixed precision decimal, so it can be safely used in
+    pagination cursors. Other databases fall back to substring matching
+    of every searched word.
+    """
+
+    search_param = 'search'
+    search_fields = (
+        'title',
+        'description',
+        'requirements',
+        'benefits',
+        'location',
+        'organization__name',
+    )
+
+    def filter_queryset(self, request, queryset, view):
+        terms = request.query_params.get(self.search_param, '').strip()
+        if not terms:
+            return queryset
+
+        if connections[queryset.db].vendor == 'postgresql':
+            query = SearchQuery(terms, config=SEARCH_CONFIG)
+            return queryset.filter(search_vector=query).annotate(
+                rank=Cast(
+                    SearchRank(F('search_vector'), query),
+                    DecimalField(max_digits=12, decimal_places=8),
+                ),
+            ).order_by('-rank', 'weight', 'id')
+
+        for term in terms.split():
+            condition = Q()
+            for field in self.search_fields:
+                condition |= Q(**{'{}__icontains'.format(field): term})
+            queryset = queryset.filter(condition)
+        return queryset
+
+
+class OfferNearFilter(BaseFilterBackend):
+
+    """Filters offers located near given point.
+
+    `near=lat,lon&radius=km` returns offers within radius (up to
+    max_radius), `near=lat,lon` alone returns `nearest` (10 by default)
+    closest offers. Both are ordered by distance.
+
+    Candidates are selected with a bounding box over indexed coordinates,
+    so distance is computed only for offers inside the box. Distance uses
+    equirectangular projection, which is accurate enough at the scale of
+    a country. Its square is annotated as `distance_squared` and cast to
+    a fixed precision decimal, so it can be used in pagination cursors.
+    """
+
+    near_param = 'near'
+    radius_param = 'radius'
+    nearest_param = 'nearest'
+    default_nearest = 10
+    max_nearest = 100
+    # nearest offers are looked for in growing circles:
+    initial_radius = 10
+    max_radius = 1000
+    invalid_near_message = (
+        'Niepoprawne współrzędne, oczekiwano formatu: szerokość,długość.'
+    )
+    invalid_radius_message = 'Niepoprawny promień.'
+    invalid_nearest_message = 'Niepoprawna liczba ofert.'
+
+    def filter_queryset(self, request, queryset, view):
+        if self.near_param not in request.query_params:
+            return queryset
+        latitude, longitude = self.get_point(request)
+
+        if self.radius_param in request.query_params:
+            # larger circles wouldn't fit precision of distance_squared:
+            return self.filter_radius(
+                queryset,
+                latitude,
+                longitude,
+                min(
+                    self.get_positive_number(
+                        request,
+                        self.radius_param,
+                        float,
+                        self.invalid_radius_message,
+                    ),
+                    self.max_radius,
+                ),
+            )
+
+        nearest = min(
+            self.get_positive_number(
+                request,
+                self.nearest_param,
+                int,
+                self.invalid_nearest_message,
+                self.default_nearest,
+            ),
+            self.max_nearest,
+        )
+        # circle holding enough offers holds the nearest ones, it grows up
+        # to max_radius, like the one given in radius param:
+        radius = self.initial_radius
+        while radius < self.max_radius:
+            if self.filter_radius(
+                    queryset, latitude, longitude, radius
+            ).count() >= nearest:
+                break
+            radius = min(radius * 2, self.max_radius)
+        nearest_ids = list(self.filter_radius(
+            queryset, latitude, longitude, radius,
+        ).values_list('id', flat=True)[:nearest])
+        return self.filter_radius(
+            queryset.filter(id__in=nearest_ids), latitude, longitude, radius,
+        )
+
+    def get_point(self, request):
+        """Return latitude and longitude given in request."""
+        try:
+            latitude, longitude = (
+                float(value)
+                for value in request.query_params[self.near_param].split(',')
+            )
+        except ValueError:
+            raise ValidationError({self.near_param: [
+                self.invalid_near_message,
+            ]})
+        if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+            raise ValidationError({self.near_param: [
+                self.invalid_near_message,
+            ]})
+        return latitude, longitude
+
+    @staticmethod
+    def get_positive_number(request, param, number_type, message,
+                            default=None):
+        """Return positive number given in request or default."""
+        if param not in request.query_params and default is not None:
+            return default
+        try:
+            value = number_type(request.query_params[param])
+        except ValueError:
+            raise ValidationError({param: [message]})
+        if not 0 < value < float('inf'):
+            raise ValidationError({param: [message]})
+        return value
+
+    @staticmethod
+    def filter_box(queryset, latitude, longitude, radius):
+        """Return offers inside bounding box of given circle."""
+        min_lat, max_lat, min_lon, max_lon = get_bounding_box(
+            latitude, longitude, radius,
+        )
+        return queryset.filter(
+            latitude__range=(min_lat, max_lat),
+            longitude__range=(min_lon, max_lon),
+        )
+
+    def filter_radius(self, queryset, latitude, longitude, radius):
+        """Return offers inside given circle ordered by distance."""
+        latitude_distance = (F('latitude') - Value(latitude)) * KM_PER_DEGREE
+        longitude_distance = (F('longitude') - Value(longitude)) * (
+            KM_PER_DEGREE * math.cos(math.radians(latitude))
+        )
+        return self.filter_box(
+            queryset, latitude, longitude, radius,
+        ).annotate(
+            distance_squared=Cast(
+                ExpressionWrapper(
+                    latitude_distance * latitude_distance +
+                    longitude_distance * longitude_distance,
+                    output_field=FloatField(),
+                ),
+                DecimalField(max_digits=14, decimal_places=6),
+            ),
+        ).filter(
+            distance_squared__lte=radius ** 2,
+        ).order_by('distance_squared', 'id')
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: api_cache
+"""
+
+import uuid
+
+from django.core.cache import cache
+from django.utils.http import urlencode
+
+GENERATION_CACHE_KEY = 'volontulo:api:generation'
+RESPONSE_CACHE_KEY = 'volontulo:api:{generation}:{path}?{query}'
+RESPONSE_CACHE_TIMEOUT = 60 * 15
+
+
+def get_generation():
+    """Return current generation of cached API responses."""
+    generation = cache.get(GENERATION_CACHE_KEY)
+    if generation is None:
+        cache.add(GENERATION_CACHE_KEY, uuid.uuid4().hex, None)
+        generation = cache.get(GENERATION_CACHE_KEY)
+    return generation
+
+
+def invalidate_api_cache():
+    """Invalidate all cached API responses at once.
+
+    Responses are cached under keys including current generation, so
+    changing it makes all of them unreachable. Stale entries expire on
+    their own. Writes invalidate it with transaction.on_commit(), so
+    responses cached by concurrent requests before commit are dropped too.
+    """
+    cache.set(GENERATION_CACHE_KEY, uuid.uuid4().hex, None)
+
+
+def get_response_cache_key(request):
+    """Return cache key of response for given request.
+
+    Query params are sorted, so their order doesn't matter.
+    """
+    return RESPONSE_CACHE_KEY.format(
+        generation=get_generation(),
+        path=request.path,
+        query=urlencode(sorted(
+            (key, value)
+            for key, values in request.GET.lists()
+            for value in values
+        )),
+    )
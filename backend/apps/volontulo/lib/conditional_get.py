@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: conditional_get
+"""
+
+import calendar
+import hashlib
+import math
+
+from django.db.models import Count
+from django.db.models import Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.utils.http import quote_etag
+
+
+def get_validators(request, queryset, timestamp_fields=('updated_at',)):
+    """Return ETag and last modification timestamp of queryset's resource.
+
+    Both are computed with a single aggregate query. Number of rows is
+    included in ETag, so removing an object changes it as well. Timestamp
+    keeps microseconds, see respond_conditionally.
+
+    :param request: request the resource is served for
+    :param queryset: QuerySet of serialized objects
+    :param timestamp_fields: fields holding last modification time
+    """
+    aggregates = queryset.order_by().aggregate(
+        count=Count('pk'),
+        **{
+            'timestamp_{}'.format(index): Max(field)
+            for index, field in enumerate(timestamp_fields)
+        }
+    )
+    timestamps = [
+        aggregates['timestamp_{}'.format(index)]
+        for index in range(len(timestamp_fields))
+        if aggregates['timestamp_{}'.format(index)] is not None
+    ]
+    last_modified = (
+        calendar.timegm(max(timestamps).utctimetuple()) +
+        max(timestamps).microsecond / 1000000
+        if timestamps else None
+    )
+    etag = quote_etag(hashlib.md5(repr((
+        request.get_full_path(),
+        request.user.pk,
+        aggregates['count'],
+        [timestamp.isoformat() for timestamp in timestamps],
+    )).encode('utf-8')).hexdigest())
+    return etag, last_modified
+
+
+def conditional_response(request, queryset, render,
+                         timestamp_fields=('updated_at',)):
+    """Return 304 Not Modified or response rendered by render() callable.
+
+    :param request: request the resource is served for
+    :param queryset: QuerySet of serialized objects
+    :param render: argumentless callable returning full response
+    :param timestamp_fields: fields holding last modification time
+    """
+    etag, last_modified = get_validators(request, queryset, timestamp_fields)
+    return respond_conditionally(request, etag, last_modified, render)
+
+
+def respond_conditionally(request, etag, last_modified, render):
+    """Return 304 Not Modified or response rendered by render() callable.
+
+    ETag takes precedence over If-Modified-Since, which is checked only
+    without If-None-Match, as in RFC 7232. Last-Modified has one second
+    resolution, so it's sent rounded down, while If-Modified-Since is
+    compared with the timestamp rounded up - resource changed later within
+    the same second isn't taken for not modified. Timestamp is kept on
+    response as `last_modified_timestamp` for responses cached later.
+
+    :param request: request the resource is served for
+    :param etag: quoted ETag of the resource
+    :param last_modified: POSIX timestamp of last modification or None
+    :param render: argumentless callable returning full response
+    """
+    response = get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=(
+            math.ceil(last_modified) if last_modified is not None else None
+        ),
+    )
+    if response is None:
+        response = render()
+    if response.status_code in (200, 304):
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(math.floor(last_modified))
+        response.last_modified_timestamp = last_modified
+    return response
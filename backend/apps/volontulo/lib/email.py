@@ -4,20 +4,39 @@
 .. module:: email
 """
 
+import datetime
+import json
+import logging
+import time
+
 from django.conf import settings
 from django.contrib.sites.shortcuts import get_current_site
 from django.core.mail import EmailMultiAlternatives
 from django.core.mail import get_connection
+from django.db import transaction
+from django.db.models import F
 from django.template.loader import get_template
+from django.utils import timezone
 
+from apps.volontulo.lib import metrics
+from apps.volontulo.models import OutgoingEmail
 from apps.volontulo.utils import get_administrators_emails
 
+logger = logging.getLogger('volontulo.email')
+
 FROM_ADDRESS = 'no-reply@' + settings.SYSTEM_DOMAIN
 FAIL_SILENTLY = False
 AUTH_USER = None
 AUTH_PASSWORD = None
 CONNECTION = None
 
+# Queued delivery: n-th failed attempt is retried after RETRY_DELAY * 2^(n-1)
+# and email is given up after MAX_ATTEMPTS.
+RETRY_DELAY = datetime.timedelta(minutes=1)
+MAX_ATTEMPTS = 5
+# Claimed emails are retried after that, if their worker didn't send them.
+CLAIM_TIMEOUT = datetime.timedelta(minutes=10)
+
 SUBJECTS = {
     'offer_application': 'Zgłoszenie chęci pomocy w ofercie',
     'offer_creation': 'Zgłoszenie oferty na Volontulo',
@@ -30,7 +49,40 @@ SUBJECTS = {
 
 def send_mail(request, templates_name, recipient_list, context=None,
               send_copy_to_admin=True):
-    """Proxy for sending emails."""
+    """Proxy for sending emails.
+
+    Depending on EMAIL_DELIVERY_MODE setting email is sent right away
+    ('sync') or stored in outbox for send_queued_emails command ('queue').
+    Duration and outcome are recorded in metrics.
+    """
+    start = time.perf_counter()
+    outcome = 'failed'
+    try:
+        result = _send_mail(
+            request,
+            templates_name,
+            recipient_list,
+            context,
+            send_copy_to_admin,
+        )
+        outcome = (
+            'queued' if settings.EMAIL_DELIVERY_MODE == 'queue' else 'sent'
+        )
+        return result
+    finally:
+        metrics.observe(
+            'volontulo_email_send_duration_seconds',
+            time.perf_counter() - start,
+        )
+        metrics.inc('volontulo_emails_total', {
+            'template': templates_name,
+            'outcome': outcome,
+        })
+
+
+def _send_mail(request, templates_name, recipient_list, context,
+               send_copy_to_admin):
+    """Send or queue email, see send_mail."""
     fail_silently = FAIL_SILENTLY
     auth_user = AUTH_USER
     auth_password = AUTH_PASSWORD
@@ -45,11 +97,6 @@ def send_mail(request, templates_name, recipient_list, context=None,
     text_template = get_template('emails/{}.txt'.format(templates_name))
     html_template = get_template('emails/{}.html'.format(templates_name))
 
-    connection = connection or get_connection(
-        username=auth_user,
-        password=auth_password,
-        fail_silently=fail_silently
-    )
     if send_copy_to_admin:
         bcc = list(get_administrators_emails().values())
         # required, if omitted then no emails from BCC are send
@@ -58,6 +105,23 @@ def send_mail(request, templates_name, recipient_list, context=None,
         bcc = []
         headers = None
 
+    if settings.EMAIL_DELIVERY_MODE == 'queue':
+        OutgoingEmail.objects.create(
+            subject=SUBJECTS[templates_name],
+            from_email=FROM_ADDRESS,
+            recipients=json.dumps(list(recipient_list)),
+            bcc=json.dumps(bcc),
+            headers=json.dumps(headers or {}),
+            body=text_template.render(context),
+            html_body=html_template.render(context),
+        )
+        return 1
+
+    connection = connection or get_connection(
+        username=auth_user,
+        password=auth_password,
+        fail_silently=fail_silently
+    )
     email = EmailMultiAlternatives(
         SUBJECTS[templates_name],
         text_template.render(context),
@@ -70,3 +134,91 @@ def send_mail(request, templates_name, recipient_list, context=None,
     email.attach_alternative(html_template.render(context), 'text/html')
 
     return email.send()
+
+
+def _build_message(outgoing_email, connection):
+    """Build EmailMultiAlternatives out of outbox entry."""
+    email = EmailMultiAlternatives(
+        outgoing_email.subject,
+        outgoing_email.body,
+        outgoing_email.from_email,
+        json.loads(outgoing_email.recipients),
+        json.loads(outgoing_email.bcc),
+        connection=connection,
+        headers=json.loads(outgoing_email.headers) or None,
+    )
+    if outgoing_email.html_body:
+        email.attach_alternative(outgoing_email.html_body, 'text/html')
+    return email
+
+
+def send_queued_mails(batch_size=100, max_attempts=MAX_ATTEMPTS):
+    """Send batch of due emails from outbox over a single connection.
+
+    Emails are claimed in a short transaction, which postpones them by
+    CLAIM_TIMEOUT, and sent outside of it. Every email's outcome is saved
+    right after sending, so a crashed worker resends at most the email it
+    was sending, once its claim expires.
+
+    Returns tuple of numbers of sent and failed emails.
+    """
+    sent = failed = 0
+    with transaction.atomic():
+        # skip_locked lets many workers share the outbox:
+        outgoing_emails = list(OutgoingEmail.objects.select_for_update(
+            skip_locked=True,
+        ).filter(
+            status='pending',
+            next_attempt_at__lte=timezone.now(),
+        ).order_by('next_attempt_at', 'id')[:batch_size])
+        if not outgoing_emails:
+            return sent, failed
+        OutgoingEmail.objects.filter(id__in=[
+            outgoing_email.id for outgoing_email in outgoing_emails
+        ]).update(
+            attempts=F('attempts') + 1,
+            next_attempt_at=timezone.now() + CLAIM_TIMEOUT,
+        )
+
+    connection = get_connection(
+        username=AUTH_USER,
+        password=AUTH_PASSWORD,
+        fail_silently=False,
+    )
+    try:
+        for outgoing_email in outgoing_emails:
+            outgoing_email.attempts += 1
+            try:
+                # no-op if connection is already open:
+                connection.open()
+                _build_message(outgoing_email, connection).send()
+            except Exception as ex:  # pylint: disable=broad-except
+                logger.warning(
+                    'Sending email %s failed: %s',
+                    outgoing_email.id,
+                    ex,
+                )
+                failed += 1
+                outgoing_email.last_error = str(ex)
+                if outgoing_email.attempts >= max_attempts:
+                    outgoing_email.status = 'failed'
+                else:
+                    outgoing_email.next_attempt_at = (
+                        timezone.now() +
+                        RETRY_DELAY * 2 ** (outgoing_email.attempts - 1)
+                    )
+                # broken connection is reopened for the next email
+                connection.close()
+            else:
+                sent += 1
+                outgoing_email.status = 'sent'
+                outgoing_email.sent_at = timezone.now()
+            outgoing_email.save(update_fields=(
+                'last_error',
+                'next_attempt_at',
+                'sent_at',
+                'status',
+            ))
+    finally:
+        connection.close()
+    return sent, failed
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: geo
+"""
+
+import csv
+import functools
+import math
+import os
+import re
+import unicodedata
+
+GAZETTEER_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'data',
+    'gazetteer.csv',
+)
+EARTH_RADIUS = 6371.0
+KM_PER_DEGREE = math.pi * EARTH_RADIUS / 180
+POSTAL_CODE_PATTERN = re.compile(r'\b\d{2}-\d{3}\b')
+
+
+def normalize_name(name):
+    """Return town name in form used as gazetteer key.
+
+    Case, diacritics and surplus whitespace are ignored, so 'Gdansk'
+    matches 'Gdańsk'.
+    """
+    name = name.lower().replace('ł', 'l')
+    name = unicodedata.normalize('NFKD', name)
+    name = ''.join(char for char in name if not unicodedata.combining(char))
+    return ' '.join(name.split())
+
+
+@functools.lru_cache(maxsize=None)
+def load_gazetteer(path=GAZETTEER_PATH):
+    """Return dict of town coordinates read from local gazetteer file."""
+    with open(path, encoding='utf-8') as gazetteer_file:
+        return {
+            normalize_name(row['name']): (
+                float(row['latitude']),
+                float(row['longitude']),
+            )
+            for row in csv.DictReader(gazetteer_file)
+        }
+
+
+def geocode(text):
+    """Return (latitude, longitude) of town mentioned in text or None.
+
+    Text is looked up as a whole first and then part by part from its
+    end, so addresses like 'ul. Długa 5, 80-001 Gdańsk' are understood
+    as well.
+    """
+    if not text:
+        return None
+    gazetteer = load_gazetteer()
+    parts = [text] + list(reversed(text.split(',')))
+    for part in parts:
+        name = normalize_name(POSTAL_CODE_PATTERN.sub('', part))
+        if name in gazetteer:
+            return gazetteer[name]
+    return None
+
+
+def get_bounding_box(latitude, longitude, radius):
+    """Return (min_lat, max_lat, min_lon, max_lon) around circle.
+
+    :param latitude: latitude of circle's center
+    :param longitude: longitude of circle's center
+    :param radius: radius of circle in kilometers
+    """
+    latitude_delta = radius / KM_PER_DEGREE
+    longitude_delta = radius / (
+        KM_PER_DEGREE * max(math.cos(math.radians(latitude)), 0.01)
+    )
+    return (
+        latitude - latitude_delta,
+        latitude + latitude_delta,
+        longitude - longitude_delta,
+        longitude + longitude_delta,
+    )
@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: metrics
+"""
+
+import bisect
+import hashlib
+import json
+import threading
+import time
+from collections import Counter
+from collections import OrderedDict
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connection
+
+# upper bounds of histograms' buckets, in seconds:
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+# name: (type, help)
+METRICS = OrderedDict((
+    ('volontulo_http_requests_total', (
+        'counter', 'HTTP requests by route, method and status.',
+    )),
+    ('volontulo_http_request_duration_seconds', (
+        'histogram', 'HTTP request latency by route.',
+    )),
+    ('volontulo_db_queries_total', (
+        'counter', 'Database queries made by requests by route.',
+    )),
+    ('volontulo_emails_total', (
+        'counter', 'Emails sent, queued or failed by template.',
+    )),
+    ('volontulo_email_send_duration_seconds', (
+        'histogram', 'Duration of sending or queueing email.',
+    )),
+    ('volontulo_offer_applications_total', (
+        'counter', 'Applications for offers by result.',
+    )),
+    ('volontulo_offers_published_total', (
+        'counter', 'Published offers.',
+    )),
+))
+# sums of durations are kept in microseconds, as counters are integers:
+MICRO = 1000000
+
+_lock = threading.Lock()
+_pending = Counter()
+_last_flush = time.monotonic()
+
+
+def _get_series(name, labels):
+    """Return key of time series, as JSON of name and sorted labels."""
+    return json.dumps([name, sorted((labels or {}).items())])
+
+
+def _get_key(series):
+    """Return unique key of time series' row."""
+    return hashlib.md5(series.encode('utf-8')).hexdigest()
+
+
+def _get_samples():
+    """Return MetricSample model, looked up as models import this module."""
+    return apps.get_model('volontulo', 'MetricSample')
+
+
+def inc(name, labels=None, value=1):
+    """Increment counter in process' registry.
+
+    :param name: one of METRICS
+    :param labels: dict of label values
+    :param value: integer increment
+    """
+    if not settings.METRICS:
+        return
+    with _lock:
+        _pending[_get_series(name, labels)] += value
+    _flush_if_due()
+
+
+def observe(name, seconds, labels=None):
+    """Add observation to histogram in process' registry.
+
+    Buckets are counted separately and accumulated when rendered, so
+    an observation is a single increment of its bucket.
+    """
+    if not settings.METRICS:
+        return
+    labels = labels or {}
+    bucket = bisect.bisect_left(BUCKETS, seconds)
+    bound = str(BUCKETS[bucket]) if bucket < len(BUCKETS) else '+Inf'
+    with _lock:
+        _pending[_get_series(name + '_bucket', dict(labels, le=bound))] += 1
+        _pending[_get_series(name + '_sum', labels)] += int(seconds * MICRO)
+        _pending[_get_series(name + '_count', labels)] += 1
+    _flush_if_due()
+
+
+def _flush_if_due():
+    """Flush registry if METRICS_FLUSH_INTERVAL has passed.
+
+    Registry isn't flushed within transactions, so rows of metrics aren't
+    locked until unrelated changes are committed, or rolled back with them.
+    """
+    if connection.in_atomic_block:
+        return
+    if time.monotonic() - _last_flush >= settings.METRICS_FLUSH_INTERVAL:
+        flush()
+
+
+def flush():
+    """Add process' registry to counters shared by all processes.
+
+    Counters are rows of MetricSample incremented in the database with
+    single UPDATEs, so all workers of all hosts are aggregated without
+    losing updates, whatever the cache backend and without any external
+    service.
+    """
+    global _last_flush  # pylint: disable=global-statement
+    with _lock:
+        pending = dict(_pending)
+        _pending.clear()
+        _last_flush = time.monotonic()
+    samples = _get_samples()
+    # rows are updated in the same order by all processes, so concurrent
+    # flushes don't deadlock:
+    for series in sorted(pending):
+        samples.objects.increment(
+            {'key': _get_key(series)},
+            {'value': pending[series]},
+            {'series': series},
+        )
+
+
+def reset():
+    """Reset metrics of all processes, buffered ones are dropped."""
+    with _lock:
+        _pending.clear()
+    _get_samples().objects.all().delete()
+
+
+def _format_labels(labels):
+    """Return labels in Prometheus text format."""
+    if not labels:
+        return ''
+    return '{{{}}}'.format(','.join(
+        '{}="{}"'.format(
+            label,
+            str(value).replace('\\', r'\\').replace('"', r'\"').replace(
+                '\n', r'\n',
+            ),
+        )
+        for label, value in labels
+    ))
+
+
+def _format_value(series_name, value):
+    """Return value in text format, durations in seconds."""
+    if series_name.endswith('_seconds_sum'):
+        return repr(value / MICRO)
+    return str(value)
+
+
+def render():
+    """Return all metrics in Prometheus text exposition format."""
+    flush()
+    rows = _get_samples().objects.order_by('series')
+    samples = {}
+    for series, value in rows.values_list('series', 'value'):
+        series_name, labels = json.loads(series)
+        samples.setdefault(series_name, []).append((
+            [tuple(label) for label in labels],
+            value,
+        ))
+
+    lines = []
+    for name, (metric_type, description) in METRICS.items():
+        lines.append('# HELP {} {}'.format(name, description))
+        lines.append('# TYPE {} {}'.format(name, metric_type))
+        if metric_type == 'counter':
+            for labels, value in samples.get(name, []):
+                lines.append('{}{} {}'.format(
+                    name, _format_labels(labels), value,
+                ))
+            continue
+        for labels, _ in samples.get(name + '_count', []):
+            lines.extend(_render_histogram(name, labels, samples))
+    return '\n'.join(lines) + '\n'
+
+
+def _render_histogram(name, labels, samples):
+    """Yield lines of histogram with cumulative buckets."""
+    buckets = {
+        dict(bucket_labels)['le']: value
+        for bucket_labels, value in samples.get(name + '_bucket', [])
+        if [label for label in bucket_labels if label[0] != 'le'] == labels
+    }
+    cumulative = 0
+    for bound in [str(bucket) for bucket in BUCKETS] + ['+Inf']:
+        cumulative += buckets.get(bound, 0)
+        yield '{}_bucket{} {}'.format(
+            name,
+            _format_labels(sorted(labels + [('le', bound)])),
+            cumulative,
+        )
+    for suffix in ('_sum', '_count'):
+        for series_labels, value in samples.get(name + suffix, []):
+            if series_labels == labels:
+                yield '{}{}{} {}'.format(
+                    name,
+                    suffix,
+                    _format_labels(labels),
+                    _format_value(name + suffix, value),
+                )
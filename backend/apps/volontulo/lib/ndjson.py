@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: ndjson
+"""
+
+import itertools
+import json
+
+from djangorestframework_camel_case.util import camelize
+from djangorestframework_camel_case.util import underscoreize
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+CONTENT_TYPE = 'application/x-ndjson'
+
+
+def dumps(data):
+    """Return camelCased data as a single NDJSON line."""
+    return json.dumps(
+        camelize(data),
+        cls=JSONEncoder,
+        ensure_ascii=False,
+    ) + '\n'
+
+
+def iter_rows(stream):
+    """Yield (line number, row or None if it isn't valid JSON) from stream.
+
+    Stream is read line by line, blank lines are skipped. Keys of rows
+    are converted from camelCase like in the rest of the API.
+    """
+    for number, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield number, underscoreize(json.loads(line.decode('utf-8')))
+        except ValueError:
+            yield number, None
+
+
+def iter_batches(iterable, size):
+    """Yield lists of up to size consecutive items of iterable."""
+    iterator = iter(iterable)
+    while True:
+        batch = list(itertools.islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+class NDJSONRenderer(BaseRenderer):
+
+    """Renders data as NDJSON line, used by streaming views for errors."""
+
+    media_type = CONTENT_TYPE
+    format = 'ndjson'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return dumps(data).encode('utf-8')
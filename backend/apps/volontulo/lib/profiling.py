@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: profiling
+"""
+
+import re
+from collections import Counter
+
+from django.db.models import F
+
+from apps.volontulo.models import RequestProfile
+
+# counters summed up for every view, times are kept in microseconds:
+COUNTERS = (
+    'requests',
+    'slow_requests',
+    'time',
+    'db_time',
+    'queries',
+    'duplicate_queries',
+)
+FINGERPRINT_PATTERNS = (
+    # string literals:
+    (re.compile(r"'(?:[^']|'')*'"), '?'),
+    # numbers not being part of names:
+    (re.compile(r'\b\d+(?:\.\d+)?\b'), '?'),
+    # lists of values in IN clauses:
+    (re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)'), '(...)'),
+    (re.compile(r'\s+'), ' '),
+)
+
+
+def get_fingerprint(sql):
+    """Return SQL with literals replaced, same for repeated queries.
+
+    Queries differing only in parameters, e.g. fetching images of
+    different offers one by one, share a fingerprint.
+    """
+    for pattern, replacement in FINGERPRINT_PATTERNS:
+        sql = pattern.sub(replacement, sql)
+    return sql.strip()
+
+
+def get_repeated(queries):
+    """Return list of (fingerprint, count) of queries repeated in request.
+
+    :param queries: list of SQL statements
+    """
+    return [
+        (fingerprint, count)
+        for fingerprint, count in Counter(
+            get_fingerprint(sql) for sql in queries
+        ).most_common()
+        if count > 1
+    ]
+
+
+def record(view_name, values):
+    """Add values to counters of view, shared by all processes.
+
+    Counters are rows of RequestProfile incremented in the database, so
+    they are aggregated over all workers and hosts and no update is lost
+    to concurrent requests, whatever the cache backend.
+
+    :param view_name: name of resolved view
+    :param values: dict of increments of COUNTERS
+    """
+    RequestProfile.objects.increment(
+        {'view_name': view_name},
+        {counter: values[counter] for counter in COUNTERS},
+    )
+
+
+def get_stats():
+    """Return list of views' counters, the most time consuming first."""
+    return list(RequestProfile.objects.filter(
+        requests__gt=0,
+    ).order_by('-time').values(*COUNTERS, view=F('view_name')))
+
+
+def reset_stats():
+    """Reset counters of all views."""
+    RequestProfile.objects.all().delete()
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: renditions
+"""
+
+import io
+import os
+from collections import OrderedDict
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image
+from PIL import ImageOps
+
+# name: (width, height, crop) - cropped renditions are cut to exact size,
+# the other ones only fit in it, keeping aspect ratio. Sizes are doubled
+# for high density screens.
+RENDITIONS = OrderedDict((
+    ('thumb', (160, 160, True)),
+    ('card', (640, 360, True)),
+    ('hero', (1600, 640, False)),
+))
+# extension: Pillow format - WebP with JPEG fallback for older browsers
+FORMATS = OrderedDict((
+    ('webp', 'WEBP'),
+    ('jpg', 'JPEG'),
+))
+QUALITY = 80
+# Pillow reports broken or unsupported files with any of these:
+IMAGE_ERRORS = (OSError, SyntaxError, ValueError)
+
+
+def get_rendition_name(name, rendition, extension):
+    """Return storage name of image's rendition, placed next to original.
+
+    :param name: storage name of original image
+    :param rendition: one of RENDITIONS
+    :param extension: one of FORMATS
+    """
+    root, _ = os.path.splitext(name)
+    return '{}.{}.{}'.format(root, rendition, extension)
+
+
+def get_rendition_names(name):
+    """Return storage names of all renditions of image."""
+    return [
+        get_rendition_name(name, rendition, extension)
+        for rendition in RENDITIONS
+        for extension in FORMATS
+    ]
+
+
+def get_original_root(name):
+    """Return root of original image's name if name is a rendition's one.
+
+    Returns None for other names. Root is original's name without
+    extension, so 'a.thumb.jpg' belongs to 'a.png' or any other 'a.*'.
+    """
+    parts = name.rsplit('.', 2)
+    if len(parts) == 3 and parts[1] in RENDITIONS and parts[2] in FORMATS:
+        return parts[0]
+    return None
+
+
+def get_rendition_urls(name, storage=default_storage):
+    """Return dict of rendition URLs by rendition name and extension."""
+    return OrderedDict(
+        (rendition, OrderedDict(
+            (extension, storage.url(
+                get_rendition_name(name, rendition, extension)
+            ))
+            for extension in FORMATS
+        ))
+        for rendition in RENDITIONS
+    )
+
+
+def _to_rgb(image):
+    """Return RGB copy of image, transparency is flattened onto white."""
+    if image.mode in ('RGBA', 'LA') or (
+            image.mode == 'P' and 'transparency' in image.info
+    ):
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.split()[-1])
+        return background
+    return image.convert('RGB')
+
+
+def create_renditions(name, storage=default_storage):
+    """Create all renditions of stored image.
+
+    Existing renditions are overwritten. Raises one of IMAGE_ERRORS if
+    file isn't a supported image.
+
+    :param name: storage name of original image
+    :param storage: storage holding the image
+    """
+    with storage.open(name) as original_file:
+        original = Image.open(original_file)
+        original.load()
+    original = _to_rgb(original)
+
+    for rendition, (width, height, crop) in RENDITIONS.items():
+        if crop:
+            image = ImageOps.fit(original, (width, height), Image.LANCZOS)
+        else:
+            image = original.copy()
+            image.thumbnail((width, height), Image.LANCZOS)
+        for extension, image_format in FORMATS.items():
+            content = io.BytesIO()
+            image.save(content, image_format, quality=QUALITY)
+            rendition_name = get_rendition_name(name, rendition, extension)
+            # storage would pick another name for an existing file:
+            storage.delete(rendition_name)
+            storage.save(rendition_name, ContentFile(content.getvalue()))
+
+
+def delete_renditions(name, storage=default_storage):
+    """Delete all renditions of image."""
+    for rendition_name in get_rendition_names(name):
+        storage.delete(rendition_name)
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: uploads
+"""
+
+import binascii
+import io
+import re
+
+from django.core.files.base import File
+
+BASE64_PATTERN = re.compile(r'[A-Za-z0-9+/]*={0,2}')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+# decoded bytes per read, multiple of 3 so chunks end on base64 quantums:
+CHUNK_SIZE = 3 * 2 ** 16
+
+
+def strip_whitespace(content):
+    """Return base64 content without line breaks and other whitespace.
+
+    Line wrapped content, e.g. of MIME encoders, is accepted as by
+    b64decode. It is copied only if it has any whitespace.
+    """
+    if WHITESPACE_PATTERN.search(content) is None:
+        return content
+    return WHITESPACE_PATTERN.sub('', content)
+
+
+def is_base64(content):
+    """Check if content is padded base64 without whitespace.
+
+    Whitespace has to be removed with strip_whitespace first.
+    """
+    return (
+        len(content) % 4 == 0 and
+        BASE64_PATTERN.fullmatch(content) is not None
+    )
+
+
+def get_base64_size(content):
+    """Return size of base64 encoded content without decoding it."""
+    return len(content) // 4 * 3 - content[-2:].count('=')
+
+
+class Base64Reader(io.RawIOBase):
+
+    """Readable stream decoding base64 string on the fly.
+
+    Only the requested part of content is decoded, so storage reading it
+    in chunks never holds more than a chunk of decoded data.
+    """
+
+    def __init__(self, content):
+        super(Base64Reader, self).__init__()
+        self.content = content
+        self.position = 0
+        # decoded bytes which didn't fit into previous buffer:
+        self.pending = b''
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        if not self.pending:
+            length = max(len(buffer) // 3, 1) * 4
+            self.pending = binascii.a2b_base64(
+                self.content[self.position:self.position + length]
+            )
+            self.position += length
+        size = min(len(self.pending), len(buffer))
+        buffer[:size] = self.pending[:size]
+        self.pending = self.pending[size:]
+        return size
+
+
+def open_base64(content, name=None):
+    """Return file lazily decoded from base64 content.
+
+    Content has to be validated with is_base64 first.
+    """
+    base64_file = File(
+        io.BufferedReader(Base64Reader(content), buffer_size=CHUNK_SIZE),
+        name,
+    )
+    base64_file.size = get_base64_size(content)
+    return base64_file
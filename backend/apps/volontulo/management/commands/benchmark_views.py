@@ -0,0 +1,328 @@
+# -*- coding: utf-8 -*-
+
+import itertools
+import json
+import math
+import statistics
+import time
+from types import SimpleNamespace
+
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+from django.db import connection
+from django.db import transaction
+from django.test import Client
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve
+from django.utils.text import slugify
+
+from apps.volontulo import urls
+from apps.volontulo.factories import OfferFactory
+from apps.volontulo.factories import OrganizationFactory
+from apps.volontulo.factories import UserProfileFactory
+from apps.volontulo.lib.api_cache import invalidate_api_cache
+from apps.volontulo.models import Offer
+from apps.volontulo.models import OfferApplication
+from apps.volontulo.models import OfferImage
+from apps.volontulo.views.api import OfferViewSet
+
+# (name, user role or None for anonymous, path) - path is filled with
+# `offer` and `organization` of organization's user and their slugs:
+ROUTES = (
+    ('api offers', None, '/api/offers/'),
+    ('api offers', 'organization', '/api/offers/'),
+    ('api offers', 'administrator', '/api/offers/'),
+    ('api offer', None, '/api/offers/{offer.id}/'),
+    ('api offers export', 'organization', '/api/offers/export/'),
+    ('api organizations', None, '/api/organizations/'),
+    ('api organization', None, '/api/organizations/{organization.id}/'),
+    (
+        'api organization offers',
+        None,
+        '/api/organizations/{organization.id}/offers/',
+    ),
+    (
+        'api organization offers',
+        'organization',
+        '/api/organizations/{organization.id}/offers/',
+    ),
+    ('api current user', 'organization', '/api/current-user/'),
+    ('api messages', None, '/api/messages/'),
+    ('api profiling', 'administrator', '/api/profiling/'),
+    ('offers list', None, '/o/offers'),
+    ('offers list', 'administrator', '/o/offers'),
+    ('offers archived', None, '/o/offers/archived'),
+    ('offers reorder', 'administrator', '/o/offers/reorder/'),
+    ('offers create', 'organization', '/o/offers/create'),
+    ('offer edit', 'organization', '/o/offers/{offer_slug}/{offer.id}/edit'),
+    ('offer join', 'volunteer', '/o/offers/{offer_slug}/{offer.id}/join'),
+    (
+        'organization',
+        None,
+        '/o/organizations/{organization_slug}/{organization.id}',
+    ),
+    (
+        'organization',
+        'organization',
+        '/o/organizations/{organization_slug}/{organization.id}',
+    ),
+    (
+        'organization edit',
+        'organization',
+        '/o/organizations/{organization_slug}/{organization.id}/edit',
+    ),
+    ('organizations create', 'volunteer', '/o/organizations/create'),
+    ('user profile', 'volunteer', '/o/me'),
+    ('user profile', 'organization', '/o/me'),
+    ('contact', None, '/o/contact'),
+    ('register', None, '/o/register'),
+)
+# names of routes of apps.volontulo.urls left out of ROUTES, see
+# find_unbenchmarked:
+EXCLUDED_URL_NAMES = (
+    # POST only:
+    'api_login',
+    'api_logout',
+    'offer-image',
+    'offer-import',
+    'offer-reorder',
+    'organization-contact',
+    'password_reset',
+    'password_reset_confirm',
+    # GET changing data:
+    'activate',
+    'logout',
+    'offers_accept',
+    'offers_delete',
+    # disabled by default:
+    'metrics',
+    # lists routes only:
+    'api-root',
+)
+# streamed routes make a query per batch of offers:
+BATCH_SIZES = {
+    'api offers export': OfferViewSet.export_batch_size,
+}
+# seeded offers are spread over that many organizations:
+ORGANIZATIONS_COUNT = 10
+# seeded images point to a file which doesn't have to exist:
+IMAGE_PATH = 'offers/benchmark.png'
+
+
+def find_growing(scales):
+    """Return routes making more queries at the biggest scale.
+
+    Streamed routes may make one more query per batch of offers.
+    """
+    if len(scales) < 2:
+        return []
+    growing = []
+    for smallest, biggest in zip(
+            scales[0]['routes'],
+            scales[-1]['routes'],
+    ):
+        allowed = 0
+        if biggest['name'] in BATCH_SIZES:
+            allowed = math.ceil(
+                scales[-1]['offers'] / BATCH_SIZES[biggest['name']]
+            )
+        if biggest['queries'] > smallest['queries'] + allowed:
+            growing.append('{name} ({user})'.format(**biggest))
+    return growing
+
+
+def iter_url_names(patterns):
+    """Yield names of URL patterns, included ones as well."""
+    for pattern in patterns:
+        if hasattr(pattern, 'url_patterns'):
+            for name in iter_url_names(pattern.url_patterns):
+                yield name
+        elif pattern.name:
+            yield pattern.name
+
+
+def find_unbenchmarked():
+    """Return names of routes neither in ROUTES nor EXCLUDED_URL_NAMES.
+
+    Paths of ROUTES are resolved with placeholder objects, so views added
+    to urls without being benchmarked can't silently grow N+1 queries.
+    """
+    placeholder = SimpleNamespace(id=1)
+    benchmarked = {
+        resolve(path.format(
+            offer=placeholder,
+            offer_slug='offer',
+            organization=placeholder,
+            organization_slug='organization',
+        )).view_name
+        for _, _, path in ROUTES
+    }
+    return sorted(
+        set(iter_url_names(urls.urlpatterns)) -
+        benchmarked -
+        set(EXCLUDED_URL_NAMES)
+    )
+
+
+class Command(BaseCommand):
+    """Benchmark views against databases of growing size."""
+
+    help = (
+        "Seeds database with offers at given scales and measures wall "
+        "time, number of queries and response size of API and "
+        "server-rendered views. Fails if number of queries of any view "
+        "grows with number of offers. Seeded data is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scales',
+            type=int,
+            nargs='+',
+            default=[1000, 10000],
+            help="Numbers of offers to seed, e.g. 1000 10000 100000.",
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=3,
+            help="Number of requests per view, median time is reported.",
+        )
+        parser.add_argument(
+            '--output',
+            help="Path of JSON report, it's printed out by default.",
+        )
+
+    def handle(self, *args, **options):
+        """Benchmark views against databases of growing size."""
+        report = {'vendor': connection.vendor, 'scales': []}
+        # test client's host has to be allowed:
+        with override_settings(ALLOWED_HOSTS=['testserver']):
+            with transaction.atomic():
+                context = self._seed_context()
+                for scale in sorted(set(options['scales'])):
+                    if options['verbosity'] > 1:
+                        self.stderr.write('Seeding {} offers'.format(scale))
+                    self._seed_offers(context, scale)
+                    report['scales'].append({
+                        'offers': scale,
+                        'routes': self._measure(context, options['repeat']),
+                    })
+                transaction.set_rollback(True)
+
+        report['failed'] = sorted({
+            '{name} ({user})'.format(**route)
+            for scale in report['scales']
+            for route in scale['routes']
+            if route['status'] != 200
+        })
+        report['growing_queries'] = find_growing(report['scales'])
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as output_file:
+                output_file.write(output)
+        else:
+            self.stdout.write(output)
+
+        if report['failed']:
+            raise CommandError('Failed views: {}'.format(
+                ', '.join(report['failed'])
+            ))
+        if report['growing_queries']:
+            raise CommandError(
+                'Number of queries grows with offers: {}'.format(
+                    ', '.join(report['growing_queries'])
+                )
+            )
+
+    @staticmethod
+    def _seed_context():
+        """Create users and organizations and return them as a dict."""
+        users = {
+            role: UserProfileFactory(
+                is_administrator=role == 'administrator',
+            ).user
+            for role in ('volunteer', 'organization', 'administrator')
+        }
+        organizations = OrganizationFactory.create_batch(ORGANIZATIONS_COUNT)
+        users['organization'].userprofile.organizations.add(organizations[0])
+        return {'users': users, 'organizations': organizations}
+
+    @staticmethod
+    def _seed_offers(context, total):
+        """Add offers, with images and applications, up to total.
+
+        Offers are built by factory and inserted in bulk, without signals.
+        All of them are active, so every list shows them at every scale.
+        """
+        organizations = itertools.cycle(context['organizations'])
+        Offer.objects.bulk_create(
+            OfferFactory.build(
+                organization=next(organizations),
+                image=None,
+                offer_status='published',
+                action_status='ongoing',
+                recruitment_status='open',
+            )
+            for _ in range(total - Offer.objects.count())
+        )
+        OfferImage.objects.bulk_create(
+            OfferImage(offer_id=offer_id, path=IMAGE_PATH, is_main=True)
+            for offer_id in Offer.objects.filter(
+                images__isnull=True,
+            ).values_list('id', flat=True).iterator()
+        )
+        # volunteer applies to all offers but the ones of organization's
+        # user, so they can still join them:
+        volunteer = context['users']['volunteer']
+        OfferApplication.objects.bulk_create(
+            OfferApplication(offer_id=offer_id, user=volunteer)
+            for offer_id in Offer.objects.exclude(
+                volunteers=volunteer,
+            ).exclude(
+                organization=context['organizations'][0],
+            ).values_list('id', flat=True).iterator()
+        )
+        invalidate_api_cache()
+
+        offer = Offer.objects.filter(
+            organization=context['organizations'][0],
+        ).order_by('id').first()
+        context.update({
+            'offer': offer,
+            'offer_slug': slugify(offer.title),
+            'organization': offer.organization,
+            'organization_slug': slugify(offer.organization.name),
+        })
+
+    @staticmethod
+    def _measure(context, repeat):
+        """Return measurements of all routes."""
+        measurements = []
+        for name, role, path_template in ROUTES:
+            path = path_template.format(**context)
+            client = Client()
+            if role is not None:
+                client.force_login(context['users'][role])
+            times = []
+            for _ in range(repeat):
+                # cached API responses would hide queries:
+                invalidate_api_cache()
+                with CaptureQueriesContext(connection) as queries:
+                    start = time.perf_counter()
+                    response = client.get(path)
+                    content = b''.join(response.streaming_content) if (
+                        response.streaming
+                    ) else response.content
+                    times.append(time.perf_counter() - start)
+            measurements.append({
+                'name': name,
+                'user': role or 'anonymous',
+                'path': path,
+                'status': response.status_code,
+                'queries': len(queries),
+                'time': round(statistics.median(times), 6),
+                'bytes': len(content),
+            })
+        return measurements
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from apps.volontulo.lib.api_cache import invalidate_api_cache
+from apps.volontulo.lib.renditions import create_renditions
+from apps.volontulo.lib.renditions import IMAGE_ERRORS
+from apps.volontulo.models import OfferImage
+from apps.volontulo.models import UserGallery
+
+
+def _create_renditions(name):
+    """Create renditions of image in worker process.
+
+    Returns (name, error) - error is None on success.
+    """
+    try:
+        create_renditions(name)
+    except IMAGE_ERRORS as error:
+        return name, str(error) or error.__class__.__name__
+    return name, None
+
+
+class Command(BaseCommand):
+    """Create renditions of offer images and avatars."""
+
+    help = (
+        "Creates resized renditions of uploaded offer images and avatars. "
+        "New images get them on upload, run it after deployment or after "
+        "changing renditions sizes (with --force)."
+    )
+    batch_size = 500
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes',
+            type=int,
+            default=os.cpu_count(),
+            help="Number of worker processes resizing images.",
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help="Recreate renditions of images that already have them.",
+        )
+
+    def handle(self, *args, **options):
+        """Create renditions of offer images and avatars."""
+        # forked workers must not share database connections:
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=options['processes']) as pool:
+            for model in (OfferImage, UserGallery):
+                self._create_model_renditions(model, pool, options['force'])
+        invalidate_api_cache()
+
+    def _create_model_renditions(self, model, pool, force):
+        """Create renditions of all images of model using pool."""
+        images = model.objects.exclude(**{model.IMAGE_FIELD: ''})
+        if not force:
+            images = images.filter(has_renditions=False)
+        pks_by_name = {}
+        for pk, name in images.values_list(
+                'pk', model.IMAGE_FIELD
+        ).iterator():
+            pks_by_name.setdefault(name, []).append(pk)
+
+        created = []
+        for name, error in pool.map(_create_renditions, pks_by_name):
+            if error is None:
+                created.extend(pks_by_name[name])
+            else:
+                self.stderr.write('{}: {}'.format(name, error))
+        # batches keep the number of query parameters within SQLite limits:
+        for start in range(0, len(created), self.batch_size):
+            model.objects.filter(
+                pk__in=created[start:start + self.batch_size],
+            ).update(has_renditions=True)
+        self.stdout.write('{}: {} created, {} failed'.format(
+            model.__name__,
+            len(created),
+            sum(len(pks) for pks in pks_by_name.values()) - len(created),
+        ))
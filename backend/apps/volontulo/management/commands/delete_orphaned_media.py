@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+
+import os
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.volontulo.lib.renditions import get_original_root
+from apps.volontulo.models import OfferImage
+from apps.volontulo.models import UserGallery
+
+
+class Command(BaseCommand):
+    """Delete uploaded images no longer referenced by any object."""
+
+    help = (
+        "Deletes files from offers and profiles upload directories which "
+        "aren't images of any offer or user, together with renditions of "
+        "such images."
+    )
+    # upload directory: model storing its files
+    directories = (
+        ('offers', OfferImage),
+        ('profiles', UserGallery),
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            dest='dry_run',
+            help="Only report orphaned files.",
+        )
+        parser.add_argument(
+            '--min-age',
+            type=int,
+            default=3600,
+            help=(
+                "Keep files modified less than that many seconds ago, "
+                "their objects might not be saved yet."
+            ),
+        )
+
+    def handle(self, *args, **options):
+        """Delete uploaded images no longer referenced by any object."""
+        modified_before = time.time() - options['min_age']
+        for directory, model in self.directories:
+            path = os.path.join(settings.MEDIA_ROOT, directory)
+            if not os.path.isdir(path):
+                continue
+            names, roots = self._get_referenced(model, directory)
+            scanned = orphaned = size = 0
+            for entry in os.scandir(path):
+                if not entry.is_file():
+                    continue
+                scanned += 1
+                if entry.name in names:
+                    continue
+                root = get_original_root(entry.name)
+                if root is not None and root in roots:
+                    continue
+                stat = entry.stat()
+                if stat.st_mtime > modified_before:
+                    continue
+                orphaned += 1
+                size += stat.st_size
+                if options['verbosity'] > 1 or options['dry_run']:
+                    self.stdout.write(entry.path)
+                if not options['dry_run']:
+                    os.remove(entry.path)
+            self.stdout.write(
+                '{}: {} files, {} orphaned ({:.1f} MB){}'.format(
+                    directory,
+                    scanned,
+                    orphaned,
+                    size / 1024 / 1024,
+                    '' if options['dry_run'] else ', deleted',
+                )
+            )
+
+    @staticmethod
+    def _get_referenced(model, directory):
+        """Return sets of referenced file names and their roots.
+
+        Names are relative to directory, roots lack extensions and are
+        used to match renditions.
+        """
+        names = set()
+        roots = set()
+        prefix = directory + '/'
+        for name in model.objects.values_list(
+                model.IMAGE_FIELD, flat=True,
+        ).order_by().iterator():
+            if not name.startswith(prefix):
+                continue
+            name = name[len(prefix):]
+            names.add(name)
+            roots.add(os.path.splitext(name)[0])
+        return names, roots
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+
+import re
+
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+from django.db import connection
+
+from apps.volontulo.models import Offer
+
+
+INDEX_SCAN_PATTERNS = {
+    'postgresql': re.compile(r'Index (Only )?Scan'),
+    'sqlite': re.compile(r'USING (COVERING )?INDEX|USING INTEGER PRIMARY KEY'),
+}
+EXPLAIN_PREFIXES = {
+    'postgresql': 'EXPLAIN ',
+    'sqlite': 'EXPLAIN QUERY PLAN ',
+}
+
+
+class Command(BaseCommand):
+    """Explain queries of offers manager methods."""
+
+    help = (
+        "Runs EXPLAIN on queries of offers manager methods and reports "
+        "whether they use an index. Keep in mind that planner may prefer "
+        "sequential scan on small tables."
+    )
+
+    manager_methods = (
+        'get_active',
+        'get_archived',
+        'get_weightened',
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--strict',
+            action='store_true',
+            dest='strict',
+            help="Fail if any of queries doesn't use an index.",
+        )
+
+    def handle(self, *args, **options):
+        """Explain queries of offers manager methods."""
+        if connection.vendor not in EXPLAIN_PREFIXES:
+            raise CommandError(
+                'Database {} is not supported'.format(connection.vendor)
+            )
+
+        without_index = []
+        for method_name in self.manager_methods:
+            plan = self.explain(getattr(Offer.objects, method_name)())
+            if INDEX_SCAN_PATTERNS[connection.vendor].search(plan):
+                self.stdout.write(self.style.SUCCESS(
+                    '{}: index used'.format(method_name)
+                ))
+            else:
+                without_index.append(method_name)
+                self.stdout.write(self.style.ERROR(
+                    '{}: index not used'.format(method_name)
+                ))
+            if options['verbosity'] > 1:
+                self.stdout.write(plan)
+
+        if options['strict'] and without_index:
+            raise CommandError(
+                'Queries without index: {}'.format(', '.join(without_index))
+            )
+
+    @staticmethod
+    def explain(queryset):
+        """Return query plan of given queryset as a text."""
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(EXPLAIN_PREFIXES[connection.vendor] + sql, params)
+            return '\n'.join(
+                ' '.join(str(column) for column in row)
+                for row in cursor.fetchall()
+            )
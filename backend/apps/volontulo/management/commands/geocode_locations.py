@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+
+from django.core.management.base import BaseCommand
+
+from apps.volontulo.lib.api_cache import invalidate_api_cache
+from apps.volontulo.lib.geo import geocode
+from apps.volontulo.models import Offer
+from apps.volontulo.models import Organization
+
+
+class Command(BaseCommand):
+    """Geocode locations of offers and addresses of organizations."""
+
+    help = (
+        "Sets coordinates of all offers and organizations using local "
+        "gazetteer. New and edited objects are geocoded on save, run it "
+        "after deployment or gazetteer update."
+    )
+
+    def handle(self, *args, **options):
+        """Geocode locations of offers and addresses of organizations."""
+        for model, field in ((Offer, 'location'), (Organization, 'address')):
+            geocoded = failed = 0
+            # one UPDATE per distinct location instead of one per object:
+            for text in model.objects.values_list(
+                    field, flat=True
+            ).distinct().order_by().iterator():
+                latitude, longitude = geocode(text) or (None, None)
+                count = model.objects.filter(**{field: text}).update(
+                    latitude=latitude,
+                    longitude=longitude,
+                )
+                if latitude is None:
+                    failed += count
+                else:
+                    geocoded += count
+            self.stdout.write('{}: {} geocoded, {} not found'.format(
+                model._meta.verbose_name_plural,
+                geocoded,
+                failed,
+            ))
+        invalidate_api_cache()
@@ -1,17 +1,82 @@
 # -*- coding: utf-8 -*-
 
+import io
 import random
+import uuid
 
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
 from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db import transaction
+from django.db.models import Max
 from factory.django import ImageField
+from PIL import Image
+from PIL import ImageDraw
 from tqdm import tqdm
 
 from apps.volontulo.factories import OfferFactory
 from apps.volontulo.factories import OrganizationFactory
 from apps.volontulo.factories import placeimg_com_download
+from apps.volontulo.factories import UserFactory
 from apps.volontulo.factories import UserProfileFactory
+from apps.volontulo.lib.api_cache import invalidate_api_cache
+from apps.volontulo.lib.geo import geocode
+from apps.volontulo.lib.renditions import create_renditions
 from apps.volontulo.models import Offer
+from apps.volontulo.models import OfferApplication
+from apps.volontulo.models import OfferImage
 from apps.volontulo.models import Organization
+from apps.volontulo.models import upload_to_offers
+from apps.volontulo.models import UserProfile
+
+# numbers of objects created at scale 1:
+ORGANIZATIONS_COUNT = 15
+OFFERS_COUNT = 50
+VOLUNTEERS_COUNT = 150
+# every volunteer applies to up to that many offers:
+MAX_APPLICATIONS = 10
+# bulk created users share a password, hashing it is slow:
+BULK_PASSWORD = 'volontulo'
+PLACEHOLDERS_COUNT = 8
+
+
+def bulk_create(model, objects):
+    """Insert objects and set their primary keys.
+
+    Databases that don't return ids from bulk inserts get them from
+    the table. It assumes nothing else inserts to it at the same time.
+    """
+    if connection.features.can_return_ids_from_bulk_insert:
+        return model.objects.bulk_create(objects)
+    last_id = model.objects.aggregate(last_id=Max('pk'))['last_id'] or 0
+    model.objects.bulk_create(objects)
+    for obj, pk in zip(objects, model.objects.filter(
+            pk__gt=last_id,
+    ).order_by('pk').values_list('pk', flat=True)):
+        obj.pk = pk
+    return objects
+
+
+def create_placeholder(number):
+    """Store placeholder offer image and its renditions, return its name."""
+    image = Image.new('RGB', (1000, 400), (
+        random.randrange(256),
+        random.randrange(256),
+        random.randrange(256),
+    ))
+    ImageDraw.Draw(image).text((20, 20), 'Volontulo #{}'.format(number))
+    content = io.BytesIO()
+    image.save(content, 'PNG')
+    name = default_storage.save(
+        upload_to_offers(None, 'placeholder.png'),
+        ContentFile(content.getvalue()),
+    )
+    create_renditions(name)
+    return name
 
 
 class Command(BaseCommand):
@@ -19,34 +84,204 @@ class Command(BaseCommand):
 
     help = "Populates database with fake items."
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scale',
+            type=int,
+            default=1,
+            help=(
+                "Multiplies numbers of created objects ({} organizations, "
+                "{} offers and {} volunteers).".format(
+                    ORGANIZATIONS_COUNT,
+                    OFFERS_COUNT,
+                    VOLUNTEERS_COUNT,
+                )
+            ),
+        )
+        parser.add_argument(
+            '--bulk',
+            action='store_true',
+            help=(
+                "Insert objects in bulk, in transaction per batch, with "
+                "locally generated images. Signals aren't sent, users "
+                "get '{}' password.".format(BULK_PASSWORD)
+            ),
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help="Number of objects inserted in one transaction with --bulk.",
+        )
+
     def handle(self, *args, **options):
         """Populate database with fake objects."""
+        counts = (
+            ORGANIZATIONS_COUNT * options['scale'],
+            OFFERS_COUNT * options['scale'],
+            VOLUNTEERS_COUNT * options['scale'],
+        )
+        if options['bulk']:
+            self.populate_bulk(*counts, batch_size=options['batch_size'])
+        else:
+            self.populate(*counts)
+        call_command('reconcile_volunteers_counts', stdout=self.stdout)
+
+        self.stdout.write(
+            self.style.SUCCESS('Database successfully populated')
+        )
 
-        self.stdout.write(self.style.SUCCESS('Creating 15 organizations'))
-        for _ in tqdm(range(15)):
+    def populate(self, organizations_count, offers_count, volunteers_count):
+        """Create objects one by one, sending signals."""
+        self.stdout.write(self.style.SUCCESS(
+            'Creating {} organizations'.format(organizations_count)
+        ))
+        organizations = []
+        for _ in tqdm(range(organizations_count)):
             organization = OrganizationFactory.create()
             UserProfileFactory.create(
                 organizations=(organization,),
             )
+            organizations.append(organization)
 
-        self.stdout.write(self.style.SUCCESS('Creating 50 offers'))
-        for _ in tqdm(range(50)):
-            OfferFactory.create(
-                organization=random.choice(Organization.objects.all()),
+        self.stdout.write(self.style.SUCCESS(
+            'Creating {} offers'.format(offers_count)
+        ))
+        offers = []
+        for _ in tqdm(range(offers_count)):
+            offers.append(OfferFactory.create(
+                organization=random.choice(organizations),
                 image__path=ImageField(
                     from_func=placeimg_com_download(1000, 400, 'any')
                 )
-            )
+            ))
 
-        self.stdout.write(self.style.SUCCESS('Creating 150 volunteers'))
-        for _ in tqdm(range(150)):
+        self.stdout.write(self.style.SUCCESS(
+            'Creating {} volunteers'.format(volunteers_count)
+        ))
+        for _ in tqdm(range(volunteers_count)):
             userprofile = UserProfileFactory.create()
-            no_of_offers = random.randrange(10)
-            for offer in random.sample(
-                list(Offer.objects.all()), no_of_offers
-            ):
-                offer.volunteers.add(userprofile.user)
+            OfferApplication.objects.bulk_create(
+                OfferApplication(offer=offer, user=userprofile.user)
+                for offer in random.sample(
+                    offers,
+                    min(random.randrange(MAX_APPLICATIONS), len(offers)),
+                )
+            )
 
-        self.stdout.write(
-            self.style.SUCCESS('Database successfully populated')
+    def populate_bulk(self, organizations_count, offers_count,
+                      volunteers_count, batch_size):
+        """Create objects built by factories with bulk inserts."""
+        self.stdout.write(self.style.SUCCESS(
+            'Creating {} placeholder images'.format(PLACEHOLDERS_COUNT)
+        ))
+        placeholders = [
+            create_placeholder(number)
+            for number in range(PLACEHOLDERS_COUNT)
+        ]
+        password = make_password(BULK_PASSWORD)
+
+        self.stdout.write(self.style.SUCCESS(
+            'Creating {} organizations'.format(organizations_count)
+        ))
+        organizations = []
+        for size in self._batches(organizations_count, batch_size):
+            with transaction.atomic():
+                batch = bulk_create(Organization, [
+                    self._build_organization() for _ in range(size)
+                ])
+                userprofiles = self._create_userprofiles(size, password)
+                UserProfile.organizations.through.objects.bulk_create(
+                    UserProfile.organizations.through(
+                        userprofile_id=userprofile.pk,
+                        organization_id=organization.pk,
+                    )
+                    for userprofile, organization in zip(userprofiles, batch)
+                )
+            organizations.extend(batch)
+
+        self.stdout.write(self.style.SUCCESS(
+            'Creating {} offers'.format(offers_count)
+        ))
+        offers_ids = []
+        for size in self._batches(offers_count, batch_size):
+            with transaction.atomic():
+                batch = bulk_create(Offer, [
+                    self._build_offer(random.choice(organizations))
+                    for _ in range(size)
+                ])
+                OfferImage.objects.bulk_create(
+                    OfferImage(
+                        offer_id=offer.pk,
+                        path=random.choice(placeholders),
+                        is_main=True,
+                        has_renditions=True,
+                    )
+                    for offer in batch
+                )
+            offers_ids.extend(offer.pk for offer in batch)
+
+        self.stdout.write(self.style.SUCCESS(
+            'Creating {} volunteers'.format(volunteers_count)
+        ))
+        for size in self._batches(volunteers_count, batch_size):
+            with transaction.atomic():
+                userprofiles = self._create_userprofiles(size, password)
+                OfferApplication.objects.bulk_create(
+                    OfferApplication(offer_id=offer_id, user_id=user_id)
+                    for user_id in (
+                        userprofile.user_id for userprofile in userprofiles
+                    )
+                    for offer_id in random.sample(
+                        offers_ids,
+                        min(
+                            random.randrange(MAX_APPLICATIONS),
+                            len(offers_ids),
+                        ),
+                    )
+                )
+        # bulk inserts send no signals:
+        invalidate_api_cache()
+
+    @staticmethod
+    def _batches(count, batch_size):
+        """Return progress bar over sizes of batches of count objects."""
+        return tqdm(
+            [batch_size] * (count // batch_size) +
+            ([count % batch_size] if count % batch_size else []),
+        )
+
+    @staticmethod
+    def _build_organization():
+        """Build geocoded organization."""
+        organization = OrganizationFactory.build()
+        organization.latitude, organization.longitude = (
+            geocode(organization.address) or (None, None)
         )
+        return organization
+
+    @staticmethod
+    def _build_offer(organization):
+        """Build geocoded offer of organization."""
+        offer = OfferFactory.build(organization=organization, image=None)
+        offer.latitude, offer.longitude = (
+            geocode(offer.location) or (None, None)
+        )
+        return offer
+
+    @staticmethod
+    def _create_userprofiles(count, password):
+        """Create users with profiles, return profiles."""
+        users = []
+        for _ in range(count):
+            user = UserFactory.build(password=password)
+            # fake emails repeat, usernames have to be unique:
+            user.email = user.username = '{}.{}'.format(
+                uuid.uuid4().hex[:8],
+                user.email,
+            )
+            users.append(user)
+        bulk_create(User, users)
+        return bulk_create(UserProfile, [
+            UserProfileFactory.build(user=user) for user in users
+        ])
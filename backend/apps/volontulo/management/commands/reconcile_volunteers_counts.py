@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+from django.db.models import F
+from django.db.models import IntegerField
+from django.db.models import OuterRef
+from django.db.models import Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from apps.volontulo.lib.api_cache import invalidate_api_cache
+from apps.volontulo.models import Offer
+from apps.volontulo.models import OfferApplication
+
+
+def count_applications(is_reserve):
+    """Return expression counting offer's main or reserve applications."""
+    return Coalesce(
+        Subquery(
+            OfferApplication.objects.filter(
+                offer=OuterRef('pk'),
+                is_reserve=is_reserve,
+            ).order_by().values('offer').annotate(
+                count=Count('id'),
+            ).values('count'),
+            output_field=IntegerField(),
+        ),
+        0,
+    )
+
+
+class Command(BaseCommand):
+    """Fix drifted volunteers counters of offers."""
+
+    help = (
+        "Recounts applications of offers and fixes volunteers counters "
+        "that drifted from them, with a single UPDATE."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            dest='dry_run',
+            help="Only report offers with drifted counters.",
+        )
+
+    def handle(self, *args, **options):
+        """Fix drifted volunteers counters of offers."""
+        drifted = Offer.objects.annotate(
+            actual_volunteers_count=count_applications(False),
+            actual_reserve_volunteers_count=count_applications(True),
+        ).exclude(
+            volunteers_count=F('actual_volunteers_count'),
+            reserve_volunteers_count=F('actual_reserve_volunteers_count'),
+        )
+
+        if options['verbosity'] > 1 or options['dry_run']:
+            for offer in drifted.values(
+                    'id',
+                    'volunteers_count',
+                    'actual_volunteers_count',
+                    'reserve_volunteers_count',
+                    'actual_reserve_volunteers_count',
+            ).iterator():
+                self.stdout.write(
+                    'Offer {id}: {volunteers_count} -> '
+                    '{actual_volunteers_count} volunteers, '
+                    '{reserve_volunteers_count} -> '
+                    '{actual_reserve_volunteers_count} reserve '
+                    'volunteers'.format(**offer)
+                )
+        if options['dry_run']:
+            return
+
+        with transaction.atomic():
+            fixed = Offer.objects.filter(
+                id__in=drifted.values('id'),
+            ).update(
+                volunteers_count=count_applications(False),
+                reserve_volunteers_count=count_applications(True),
+                updated_at=timezone.now(),
+            )
+        if fixed:
+            invalidate_api_cache()
+        self.stdout.write(self.style.SUCCESS(
+            'Fixed counters of {} offers'.format(fixed)
+        ))
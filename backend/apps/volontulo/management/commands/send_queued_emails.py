@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.volontulo.lib.email import MAX_ATTEMPTS
+from apps.volontulo.lib.email import send_queued_mails
+
+
+class Command(BaseCommand):
+    """Send emails waiting in the outbox."""
+
+    help = "Sends emails waiting in the outbox."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=100,
+            dest='batch_size',
+            help="Number of emails sent over a single connection.",
+        )
+        parser.add_argument(
+            '--max-attempts',
+            type=int,
+            default=MAX_ATTEMPTS,
+            dest='max_attempts',
+            help="Number of attempts after which email is given up.",
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            dest='loop',
+            help="Keep polling the outbox instead of exiting when empty.",
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5,
+            dest='interval',
+            help="Seconds to wait between polls of empty outbox.",
+        )
+
+    def handle(self, *args, **options):
+        """Send emails waiting in the outbox."""
+        total_sent = total_failed = 0
+        while True:
+            sent, failed = send_queued_mails(
+                batch_size=options['batch_size'],
+                max_attempts=options['max_attempts'],
+            )
+            total_sent += sent
+            total_failed += failed
+            if sent or failed:
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+        self.stdout.write(self.style.SUCCESS(
+            'Sent {} emails, {} failed'.format(total_sent, total_failed)
+        ))
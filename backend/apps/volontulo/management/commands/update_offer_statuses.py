@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.volontulo.models import Offer
+
+
+class Command(BaseCommand):
+    """Update action and recruitment statuses of offers from their dates."""
+
+    help = (
+        "Moves offers whose dates have passed to matching action and "
+        "recruitment statuses. Meant to be run every minute, e.g. by cron "
+        "or with --loop."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            dest='loop',
+            help="Keep updating statuses instead of exiting.",
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=60,
+            dest='interval',
+            help="Seconds to wait between updates.",
+        )
+
+    def handle(self, *args, **options):
+        """Update action and recruitment statuses of offers."""
+        while True:
+            updated = Offer.objects.update_statuses()
+            if any(updated.values()) or options['verbosity'] > 1:
+                self.stdout.write(self.style.SUCCESS(', '.join(
+                    '{}: {}'.format(transition, count)
+                    for transition, count in updated.items()
+                )))
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: middleware
+"""
+
+import logging
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.utils.deprecation import MiddlewareMixin
+
+from apps.volontulo.lib import metrics
+from apps.volontulo.lib import profiling
+
+logger = logging.getLogger('volontulo.profiling')
+
+
+def start_capturing_queries():
+    """Turn debug cursors on, return their previous states."""
+    # queries log is cleared on every request_started signal:
+    debug_cursors = {
+        connection.alias: connection.force_debug_cursor
+        for connection in connections.all()
+    }
+    for connection in connections.all():
+        connection.force_debug_cursor = True
+    return debug_cursors
+
+
+def stop_capturing_queries(debug_cursors):
+    """Restore states of debug cursors, return captured queries."""
+    queries = []
+    for connection in connections.all():
+        queries.extend(connection.queries)
+        connection.force_debug_cursor = debug_cursors[connection.alias]
+    return queries
+
+
+def get_view_name(request):
+    """Return name of view resolved for request."""
+    resolver_match = getattr(request, 'resolver_match', None)
+    return resolver_match.view_name if resolver_match else '<unresolved>'
+
+
+class RequestProfilingMiddleware(MiddlewareMixin):
+
+    """Records time and SQL queries of every request.
+
+    Enabled with REQUEST_PROFILING setting. Queries are captured with
+    debug cursors, as with DEBUG on. Counters are aggregated per view in
+    the database, see lib.profiling. Requests slower than
+    REQUEST_PROFILING_SLOW_TIME seconds or making more than
+    REQUEST_PROFILING_SLOW_QUERIES queries are logged with their most
+    repeated queries.
+    """
+
+    def __init__(self, get_response=None):
+        if not settings.REQUEST_PROFILING:
+            raise MiddlewareNotUsed
+        super(RequestProfilingMiddleware, self).__init__(get_response)
+
+    @staticmethod
+    def process_request(request):
+        """Start recording queries and time."""
+        request.profiling_debug_cursors = start_capturing_queries()
+        request.profiling_start = time.perf_counter()
+
+    @staticmethod
+    def process_response(request, response):
+        """Record request's time and queries."""
+        if not hasattr(request, 'profiling_start'):
+            return response
+        elapsed = time.perf_counter() - request.profiling_start
+        queries = stop_capturing_queries(request.profiling_debug_cursors)
+        view_name = get_view_name(request)
+        repeated = profiling.get_repeated(query['sql'] for query in queries)
+        db_time = sum(float(query['time']) for query in queries)
+        is_slow = (
+            elapsed > settings.REQUEST_PROFILING_SLOW_TIME or
+            len(queries) > settings.REQUEST_PROFILING_SLOW_QUERIES
+        )
+
+        profiling.record(view_name, {
+            'requests': 1,
+            'slow_requests': int(is_slow),
+            'time': int(elapsed * 1000000),
+            'db_time': int(db_time * 1000000),
+            'queries': len(queries),
+            'duplicate_queries': sum(count - 1 for _, count in repeated),
+        })
+        if is_slow:
+            logger.warning(
+                'Slow request %s %s (%s): %.3f s, %.3f s in %d queries, '
+                'repeated: %s',
+                request.method,
+                request.path,
+                view_name,
+                elapsed,
+                db_time,
+                len(queries),
+                '; '.join(
+                    '{}x {}'.format(count, fingerprint)
+                    for fingerprint, count in repeated[:3]
+                ) or 'none',
+            )
+        return response
+
+
+class MetricsMiddleware(MiddlewareMixin):
+
+    """Records latency, status and queries of requests in metrics.
+
+    Enabled with METRICS setting. Requests are labelled with name of the
+    resolved view, which keeps number of series bounded.
+    """
+
+    def __init__(self, get_response=None):
+        if not settings.METRICS:
+            raise MiddlewareNotUsed
+        super(MetricsMiddleware, self).__init__(get_response)
+
+    @staticmethod
+    def process_request(request):
+        """Start recording queries and time."""
+        request.metrics_debug_cursors = start_capturing_queries()
+        request.metrics_start = time.perf_counter()
+
+    @staticmethod
+    def process_response(request, response):
+        """Record request's latency, status and queries."""
+        if not hasattr(request, 'metrics_start'):
+            return response
+        elapsed = time.perf_counter() - request.metrics_start
+        queries = stop_capturing_queries(request.metrics_debug_cursors)
+        route = get_view_name(request)
+        metrics.observe(
+            'volontulo_http_request_duration_seconds',
+            elapsed,
+            {'route': route},
+        )
+        metrics.inc('volontulo_http_requests_total', {
+            'route': route,
+            'method': request.method,
+            'status': response.status_code,
+        })
+        metrics.inc(
+            'volontulo_db_queries_total',
+            {'route': route},
+            len(queries),
+        )
+        return response
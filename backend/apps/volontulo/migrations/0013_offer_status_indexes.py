@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.5 on 2026-10-18 20:10
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('volontulo', '0012_auto_20180228_1944'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='offer',
+            index=models.Index(fields=['weight', 'id'], name='offer_weight_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='offer',
+            index=models.Index(fields=['offer_status', 'recruitment_status', 'action_status'], name='offer_statuses_idx'),
+        ),
+        # Django's Index doesn't support partial indexes yet. Both
+        # PostgreSQL and SQLite understand this syntax.
+        migrations.RunSQL(
+            sql=[
+                "CREATE INDEX offer_published_weight_idx "
+                "ON volontulo_offer (weight, id) "
+                "WHERE offer_status = 'published'",
+            ],
+            reverse_sql=["DROP INDEX offer_published_weight_idx"],
+        ),
+    ]
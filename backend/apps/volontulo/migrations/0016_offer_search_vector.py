@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.5 on 2026-10-18 21:40
+from __future__ import unicode_literals
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+# Search vector is kept up to date by triggers, so bulk updates and raw SQL
+# can't leave it stale. Organization name is copied in as well, renaming
+# organization touches its offers. PostgreSQL has no Polish stemmer out of
+# the box - `polish` configuration is created as a copy of `simple`, so an
+# ispell dictionary (e.g. from sjp.pl) can be plugged in later without
+# touching the triggers or the code.
+CREATE_SEARCH_SQL = [
+    """
+    DO $$
+    BEGIN
+        IF NOT EXISTS (
+            SELECT 1 FROM pg_ts_config WHERE cfgname = 'polish'
+        ) THEN
+            CREATE TEXT SEARCH CONFIGURATION polish (COPY = simple);
+        END IF;
+    END
+    $$
+    """,
+    """
+    CREATE FUNCTION volontulo_offer_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('polish', coalesce(NEW.title, '')), 'A') ||
+            setweight(to_tsvector('polish', coalesce((
+                SELECT name FROM volontulo_organization
+                WHERE id = NEW.organization_id
+            ), '')), 'B') ||
+            setweight(to_tsvector('polish', coalesce(NEW.location, '')), 'B') ||
+            setweight(
+                to_tsvector('polish', coalesce(NEW.description, '')), 'C'
+            ) ||
+            setweight(
+                to_tsvector('polish', coalesce(NEW.requirements, '')), 'D'
+            ) ||
+            setweight(to_tsvector('polish', coalesce(NEW.benefits, '')), 'D');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER volontulo_offer_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF
+        title, description, requirements, benefits, location, organization_id
+    ON volontulo_offer
+    FOR EACH ROW EXECUTE PROCEDURE volontulo_offer_search_vector_update()
+    """,
+    """
+    CREATE FUNCTION volontulo_organization_search_vector_update()
+    RETURNS trigger AS $$
+    BEGIN
+        UPDATE volontulo_offer SET title = title
+        WHERE organization_id = NEW.id;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER volontulo_organization_search_vector_trigger
+    AFTER UPDATE OF name ON volontulo_organization
+    FOR EACH ROW WHEN (OLD.name IS DISTINCT FROM NEW.name)
+    EXECUTE PROCEDURE volontulo_organization_search_vector_update()
+    """,
+    "UPDATE volontulo_offer SET title = title",
+    """
+    CREATE INDEX offer_search_vector_idx
+    ON volontulo_offer USING gin (search_vector)
+    """,
+]
+
+DROP_SEARCH_SQL = [
+    "DROP INDEX offer_search_vector_idx",
+    """
+    DROP TRIGGER volontulo_organization_search_vector_trigger
+    ON volontulo_organization
+    """,
+    "DROP FUNCTION volontulo_organization_search_vector_update()",
+    "DROP TRIGGER volontulo_offer_search_vector_trigger ON volontulo_offer",
+    "DROP FUNCTION volontulo_offer_search_vector_update()",
+]
+
+
+def _execute_on_postgresql(statements):
+    """Return migration function executing statements on PostgreSQL only.
+
+    Other databases (SQLite used in development) fall back to plain
+    substring search and don't need the index.
+    """
+    def execute(apps, schema_editor):  # pylint: disable=unused-argument
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return execute
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('volontulo', '0015_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='offer',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(
+            _execute_on_postgresql(CREATE_SEARCH_SQL),
+            _execute_on_postgresql(DROP_SEARCH_SQL),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.5 on 2026-10-18 20:31
+from __future__ import unicode_literals
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('volontulo', '0017_coordinates'),
+    ]
+
+    operations = [
+        # OfferApplication takes over table of auto-created offer.volunteers
+        # relation, which already has the same columns and unique
+        # constraint, so only the state changes.
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name='OfferApplication',
+                    fields=[
+                        ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                        ('offer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='volontulo.Offer')),
+                        ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+                    ],
+                    options={
+                        'db_table': 'volontulo_offer_volunteers',
+                    },
+                ),
+                migrations.AlterUniqueTogether(
+                    name='offerapplication',
+                    unique_together=set([('offer', 'user')]),
+                ),
+                migrations.AlterField(
+                    model_name='offer',
+                    name='volunteers',
+                    field=models.ManyToManyField(through='volontulo.OfferApplication', to=settings.AUTH_USER_MODEL),
+                ),
+            ],
+        ),
+        migrations.AddField(
+            model_name='offerapplication',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+    ]
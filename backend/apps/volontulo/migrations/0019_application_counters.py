@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.5 on 2026-10-18 20:34
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models import IntegerField
+from django.db.models import OuterRef
+from django.db.models import Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_volunteers(apps, schema_editor):
+    """All existing applications are on main lists."""
+    Offer = apps.get_model('volontulo', 'Offer')
+    OfferApplication = apps.get_model('volontulo', 'OfferApplication')
+    Offer.objects.update(volunteers_count=Coalesce(
+        Subquery(
+            OfferApplication.objects.filter(
+                offer=OuterRef('pk'),
+            ).order_by().values('offer').annotate(
+                count=Count('id'),
+            ).values('count'),
+            output_field=IntegerField(),
+        ),
+        0,
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('volontulo', '0018_offerapplication'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='offer',
+            name='reserve_volunteers_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='offer',
+            name='volunteers_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='offerapplication',
+            name='is_reserve',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(count_volunteers, migrations.RunPython.noop),
+    ]
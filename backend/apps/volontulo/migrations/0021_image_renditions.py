@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.5 on 2026-10-18 20:41
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('volontulo', '0020_offer_status_date_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='offerimage',
+            name='has_renditions',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.AddField(
+            model_name='usergallery',
+            name='has_renditions',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+    ]
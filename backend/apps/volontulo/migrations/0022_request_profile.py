@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.5 on 2026-10-18 21:56
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('volontulo', '0021_image_renditions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RequestProfile',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('view_name', models.CharField(max_length=255, unique=True)),
+                ('requests', models.BigIntegerField(default=0)),
+                ('slow_requests', models.BigIntegerField(default=0)),
+                ('time', models.BigIntegerField(default=0)),
+                ('db_time', models.BigIntegerField(default=0)),
+                ('queries', models.BigIntegerField(default=0)),
+                ('duplicate_queries', models.BigIntegerField(default=0)),
+            ],
+        ),
+    ]
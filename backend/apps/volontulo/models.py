@@ -10,9 +10,24 @@ import uuid
 
 from django.conf import settings
 from django.contrib.auth.models import User
+from django.contrib.postgres.search import SearchVectorField
+from django.db import connections
+from django.db import IntegrityError
 from django.db import models
+from django.db import transaction
+from django.db.models import Case
 from django.db.models import F
+from django.db.models import Q
+from django.db.models import Subquery
+from django.db.models import Value
+from django.db.models import When
+from django.db.models.functions import Coalesce
 from django.utils import timezone
+from django.utils.functional import cached_property
+
+from apps.volontulo.lib import metrics
+from apps.volontulo.lib.api_cache import invalidate_api_cache
+from apps.volontulo.lib.renditions import delete_renditions
 
 logger = logging.getLogger('volontulo.models')
 
@@ -50,6 +65,10 @@ class Organization(models.Model):
     name = models.CharField(max_length=150, db_index=True)
     address = models.CharField(max_length=150)
     description = models.TextField()
+    updated_at = models.DateTimeField(auto_now=True)
+    # geocoded from address, see signals
+    latitude = models.FloatField(null=True, editable=False)
+    longitude = models.FloatField(null=True, editable=False)
 
     def __str__(self):
         """Organization model string reprezentation."""
@@ -75,6 +94,37 @@ class OffersManager(models.Manager):
         """Return all published offers ordered by weight."""
         return self.filter(offer_status='published').order_by('weight')
 
+    def set_weights(self, weights):
+        """Set weights of many offers with a single UPDATE statement.
+
+        :param weights: dict mapping offer id to its new weight
+        """
+        if not weights:
+            return 0
+        updated = self.filter(id__in=weights.keys()).update(
+            weight=Case(
+                *[
+                    When(id=id_, then=Value(weight))
+                    for id_, weight in weights.items()
+                ],
+                output_field=models.IntegerField()
+            ),
+            updated_at=timezone.now(),
+        )
+        # update() doesn't send post_save signal:
+        transaction.on_commit(invalidate_api_cache, using=self.db)
+        return updated
+
+    def reorder(self, offer_ids):
+        """Order offers as in given list of their ids.
+
+        :param offer_ids: list of ids of all offers, first one is placed
+            first
+        """
+        return self.set_weights(
+            {id_: weight for weight, id_ in enumerate(offer_ids)}
+        )
+
     def get_archived(self):
         """Return archived offers."""
         return self.filter(
@@ -83,6 +133,65 @@ class OffersManager(models.Manager):
             recruitment_status='closed',
         ).all()
 
+    def update_statuses(self, now=None):
+        """Move offers whose dates have passed to matching statuses.
+
+        Every transition is a single UPDATE of offers that need it, found
+        through (status, date) indexes, so it is cheap enough to be run
+        every minute. Only transitions caused by passing time are made.
+        Returns dict with numbers of offers moved by each transition.
+
+        :param now: datetime to compare dates with, defaults to now
+        """
+        now = now or timezone.now()
+        with transaction.atomic(using=self.db):
+            updated = {
+                # finished action closes recruitment as well:
+                'finished': self.filter(
+                    action_status__in=('future', 'ongoing'),
+                    finished_at__lt=now,
+                ).update(
+                    action_status='finished',
+                    recruitment_status='closed',
+                    updated_at=now,
+                ),
+                'started': self.filter(
+                    action_status='future',
+                    started_at__lte=now,
+                ).update(
+                    action_status='ongoing',
+                    updated_at=now,
+                ),
+                'recruitment_ended': self.filter(
+                    recruitment_status='open',
+                    recruitment_end_date__lt=now,
+                ).update(
+                    recruitment_status=Case(
+                        When(
+                            Q(reserve_recruitment=True) & (
+                                Q(reserve_recruitment_end_date__isnull=True) |
+                                Q(reserve_recruitment_end_date__gte=now)
+                            ),
+                            then=Value('supplemental'),
+                        ),
+                        default=Value('closed'),
+                        output_field=models.CharField(),
+                    ),
+                    updated_at=now,
+                ),
+                'reserve_recruitment_ended': self.filter(
+                    recruitment_status='supplemental',
+                    reserve_recruitment_end_date__lt=now,
+                ).update(
+                    recruitment_status='closed',
+                    updated_at=now,
+                ),
+            }
+        if any(updated.values()):
+            # update() doesn't send post_save signal:
+            transaction.on_commit(invalidate_api_cache, using=self.db)
+        return updated
+
 
 class Offer(models.Model):
     """Offer model."""
@@ -105,7 +214,7 @@ class Offer(models.Model):
 
     objects = OffersManager()
     organization = models.ForeignKey(Organization)
-    volunteers = models.ManyToManyField(User)
+    volunteers = models.ManyToManyField(User, through='OfferApplication')
     description = models.TextField()
     requirements = models.TextField(blank=True, default='')
     time_commitment = models.TextField()
@@ -155,12 +264,73 @@ class Offer(models.Model):
     volunteers_limit = models.IntegerField(default=0, null=True, blank=True)
     reserve_volunteers_limit = models.IntegerField(
         default=0, null=True, blank=True)
+    # updated only by OfferApplication.objects.apply(), see COUNTER_FIELDS:
+    volunteers_count = models.PositiveIntegerField(default=0, editable=False)
+    reserve_volunteers_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+    )
     weight = models.IntegerField(default=0, null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    # maintained by database trigger on PostgreSQL, see migration 0016
+    search_vector = SearchVectorField(null=True, editable=False)
+    # geocoded from location, see signals
+    latitude = models.FloatField(null=True, editable=False)
+    longitude = models.FloatField(null=True, editable=False)
+
+    class Meta:  # pylint: disable=C0111
+        indexes = [
+            models.Index(fields=['weight', 'id'], name='offer_weight_id_idx'),
+            models.Index(
+                fields=['offer_status', 'recruitment_status', 'action_status'],
+                name='offer_statuses_idx',
+            ),
+            models.Index(
+                fields=['latitude', 'longitude'],
+                name='offer_coordinates_idx',
+            ),
+            # used by OffersManager.update_statuses():
+            models.Index(
+                fields=['action_status', 'started_at'],
+                name='offer_action_start_idx',
+            ),
+            models.Index(
+                fields=['action_status', 'finished_at'],
+                name='offer_action_finish_idx',
+            ),
+            models.Index(
+                fields=['recruitment_status', 'recruitment_end_date'],
+                name='offer_recruitment_end_idx',
+            ),
+            models.Index(
+                fields=['recruitment_status', 'reserve_recruitment_end_date'],
+                name='offer_reserve_end_idx',
+            ),
+        ]
+
+    # key of PostgreSQL advisory lock serializing publications, see publish:
+    PUBLISH_LOCK_ID = 1
+
+    # Counters are changed concurrently with conditional UPDATEs, so saving
+    # an instance loaded earlier must not overwrite them:
+    COUNTER_FIELDS = ('volunteers_count', 'reserve_volunteers_count')
 
     def __str__(self):
         """Offer string representation."""
         return self.title
 
+    def save_without_counters(self):
+        """Save existing offer edited by form or serializer.
+
+        All fields but application counters are written, as the instance
+        could be loaded before concurrent applications changed them.
+        """
+        self.save(update_fields=[
+            field.name for field in self._meta.concrete_fields
+            if not field.primary_key and
+            field.name not in self.COUNTER_FIELDS
+        ])
+
     def set_main_image(self, is_main):
         """Set main image flag unsetting other offers images.
 
@@ -214,27 +384,55 @@ class Offer(models.Model):
         """
         if status in ('published', 'rejected', 'unpublished'):
             self.offer_status = status
-            self.save()
+            self.save(update_fields=('offer_status', 'updated_at'))
         return self
 
     def unpublish(self):
         """Unpublish offer."""
         self.offer_status = 'unpublished'
-        self.save()
+        self.save(update_fields=('offer_status', 'updated_at'))
         return self
 
     def publish(self):
-        """Publish offer."""
-        self.offer_status = 'published'
-        Offer.objects.all().update(weight=F('weight') + 1)
-        self.weight = 0
-        self.save()
+        """Publish offer.
+
+        Published offer gets weight lower than any other offer, so it is
+        placed first without rewriting weights of the other offers. Weight
+        is computed by the UPDATE itself. On PostgreSQL concurrent
+        publications, which wouldn't see each other's uncommitted weights,
+        are serialized with an advisory lock held until commit.
+        """
+        using = Offer.objects.db
+        with transaction.atomic(using=using):
+            connection = connections[using]
+            if connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        'SELECT pg_advisory_xact_lock(%s)',
+                        [self.PUBLISH_LOCK_ID],
+                    )
+            lowest_weight = Offer.objects.exclude(pk=self.pk).filter(
+                weight__isnull=False,
+            ).order_by('weight').values('weight')[:1]
+            Offer.objects.filter(pk=self.pk).update(
+                offer_status='published',
+                weight=Coalesce(
+                    Subquery(lowest_weight) - 1,
+                    Value(0),
+                    output_field=models.IntegerField(),
+                ),
+                updated_at=timezone.now(),
+            )
+            # update() doesn't send post_save signal:
+            transaction.on_commit(invalidate_api_cache, using=using)
+        self.refresh_from_db(fields=('offer_status', 'weight', 'updated_at'))
+        metrics.inc('volontulo_offers_published_total')
         return self
 
     def reject(self):
         """Reject offer."""
         self.offer_status = 'rejected'
-        self.save()
+        self.save(update_fields=('offer_status', 'updated_at'))
         return self
 
     def close_offer(self):
@@ -242,10 +440,223 @@ class Offer(models.Model):
         self.offer_status = 'unpublished'
         self.action_status = 'finished'
         self.recruitment_status = 'closed'
-        self.save()
+        self.save(update_fields=(
+            'offer_status',
+            'action_status',
+            'recruitment_status',
+            'updated_at',
+        ))
         return self
 
 
+class OfferApplicationsManager(models.Manager):
+    """Offer applications manager."""
+
+    APPLIED = 'applied'
+    APPLIED_RESERVE = 'applied_reserve'
+    ALREADY_APPLIED = 'already_applied'
+    OFFER_FULL = 'offer_full'
+
+    def apply(self, offer_id, user_id):
+        """Apply user for offer within its volunteers limits.
+
+        Application is inserted first, ignoring duplicates, and then a
+        place is claimed with a conditional UPDATE of offer's counter. The
+        UPDATE locks only the offer's row until commit, so concurrent
+        applications can neither over-fill the offer nor block each other
+        for longer than that. When main list is full, volunteer is put on
+        reserve list, if offer has one.
+
+        Returns APPLIED, APPLIED_RESERVE, ALREADY_APPLIED or OFFER_FULL.
+        """
+        result = self._apply(offer_id, user_id)
+        metrics.inc('volontulo_offer_applications_total', {'result': result})
+        return result
+
+    def _apply(self, offer_id, user_id):
+        """Apply user for offer, see apply."""
+        with transaction.atomic(using=self.db):
+            if not self._insert(offer_id, user_id):
+                return self.ALREADY_APPLIED
+            if self._claim_place(offer_id, reserve=False):
+                result = self.APPLIED
+            elif self._claim_place(offer_id, reserve=True):
+                self.filter(offer_id=offer_id, user_id=user_id).update(
+                    is_reserve=True,
+                )
+                result = self.APPLIED_RESERVE
+            else:
+                transaction.set_rollback(True, using=self.db)
+                return self.OFFER_FULL
+            transaction.on_commit(invalidate_api_cache, using=self.db)
+        return result
+
+    def _insert(self, offer_id, user_id):
+        """Insert application ignoring duplicates in a single query.
+
+        Returns True if application was created.
+        """
+        connection = connections[self.db]
+        opts = self.model._meta
+        insert_sql = {
+            'postgresql': (
+                'INSERT INTO {table} ({columns}) VALUES (%s, %s, %s, %s) '
+                'ON CONFLICT DO NOTHING'
+            ),
+            'sqlite': (
+                'INSERT OR IGNORE INTO {table} ({columns}) '
+                'VALUES (%s, %s, %s, %s)'
+            ),
+        }.get(connection.vendor)
+        if insert_sql is None:
+            _, created = self.get_or_create(
+                offer_id=offer_id,
+                user_id=user_id,
+            )
+            return created
+
+        created_at = opts.get_field('created_at')
+        with connection.cursor() as cursor:
+            cursor.execute(
+                insert_sql.format(
+                    table=connection.ops.quote_name(opts.db_table),
+                    columns=', '.join(
+                        connection.ops.quote_name(
+                            opts.get_field(name).column
+                        )
+                        for name in ('offer', 'user', 'created_at',
+                                     'is_reserve')
+                    ),
+                ),
+                [
+                    offer_id,
+                    user_id,
+                    created_at.get_db_prep_save(timezone.now(), connection),
+                    False,
+                ],
+            )
+            return cursor.rowcount == 1
+
+    @staticmethod
+    def _claim_place(offer_id, reserve):
+        """Increment offer's counter if there is a free place.
+
+        Limit of 0 (or none) means unlimited list. Recruitment status is
+        switched in the same UPDATE when the last place is taken - to
+        supplemental, if offer has reserve list, or to closed.
+        Returns True if place was claimed.
+        """
+        if reserve:
+            count_field = 'reserve_volunteers_count'
+            limit_field = 'reserve_volunteers_limit'
+            conditions = Q(
+                reserve_recruitment=True,
+                recruitment_status__in=('open', 'supplemental'),
+            )
+            filled_status = Value('closed')
+        else:
+            count_field = 'volunteers_count'
+            limit_field = 'volunteers_limit'
+            conditions = Q(recruitment_status='open')
+            filled_status = Case(
+                When(reserve_recruitment=True, then=Value('supplemental')),
+                default=Value('closed'),
+                output_field=models.CharField(),
+            )
+        has_limit = Q(**{'{}__gt'.format(limit_field): 0})
+        conditions &= ~has_limit | Q(**{
+            '{}__lt'.format(count_field): F(limit_field),
+        })
+
+        return Offer.objects.filter(conditions, id=offer_id).update(**{
+            count_field: F(count_field) + 1,
+            'recruitment_status': Case(
+                When(
+                    has_limit & Q(**{
+                        '{}__gte'.format(count_field): F(limit_field) - 1,
+                    }),
+                    then=filled_status,
+                ),
+                default=F('recruitment_status'),
+                output_field=models.CharField(),
+            ),
+            'updated_at': timezone.now(),
+        }) == 1
+
+    @staticmethod
+    def release_place(offer_id, reserve):
+        """Decrement offer's counter after volunteer has left.
+
+        Recruitment status switched by _claim_place when the list was
+        filled is switched back in the same UPDATE - to open for the main
+        list, to supplemental for the reserve list - so the freed place can
+        be claimed again. Finished offers and recruitments past their end
+        dates stay closed.
+        """
+        now = timezone.now()
+        active = ~Q(action_status='finished')
+        if reserve:
+            count_field = 'reserve_volunteers_count'
+            limit_field = 'reserve_volunteers_limit'
+            active &= Q(
+                Q(reserve_recruitment_end_date__isnull=True) |
+                Q(reserve_recruitment_end_date__gte=now),
+                reserve_recruitment=True,
+                recruitment_status='closed',
+                # main list is still full:
+                volunteers_limit__gt=0,
+                volunteers_count__gte=F('volunteers_limit'),
+            )
+            reopened_status = Value('supplemental')
+        else:
+            count_field = 'volunteers_count'
+            limit_field = 'volunteers_limit'
+            active &= Q(
+                Q(recruitment_end_date__isnull=True) |
+                Q(recruitment_end_date__gte=now),
+                recruitment_status__in=('supplemental', 'closed'),
+            )
+            reopened_status = Value('open')
+
+        return Offer.objects.filter(id=offer_id, **{
+            '{}__gt'.format(count_field): 0,
+        }).update(**{
+            count_field: F(count_field) - 1,
+            'recruitment_status': Case(
+                When(
+                    active & Q(**{
+                        '{}__gt'.format(limit_field): 0,
+                        '{}__lte'.format(count_field): F(limit_field),
+                    }),
+                    then=reopened_status,
+                ),
+                default=F('recruitment_status'),
+                output_field=models.CharField(),
+            ),
+            'updated_at': now,
+        }) == 1
+
+
+class OfferApplication(models.Model):
+    """Volunteer's application for an offer."""
+
+    offer = models.ForeignKey(Offer, on_delete=models.CASCADE)
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    created_at = models.DateTimeField(auto_now_add=True)
+    is_reserve = models.BooleanField(default=False)
+
+    objects = OfferApplicationsManager()
+
+    class Meta:  # pylint: disable=C0111
+        # table of former auto-created offer.volunteers relation:
+        db_table = 'volontulo_offer_volunteers'
+        unique_together = ('offer', 'user')
+
+    def __str__(self):
+        """String representation of an application."""
+        return '{} - {}'.format(self.offer_id, self.user_id)
+
+
 class UserProfile(models.Model):
     """Model that handles users profiles."""
 
@@ -275,12 +686,24 @@ class UserProfile(models.Model):
         """Return True if current user is volunteer, else return False"""
         return not (self.is_administrator and self.organizations)
 
+    @cached_property
+    def organization_ids(self):
+        """Return ids of organizations that user belongs to.
+
+        Ids are cached on profile instance. As request.user.userprofile
+        returns the same instance for the whole request, organizations
+        are fetched at most once per request.
+        """
+        return frozenset(self.organizations.values_list('id', flat=True))
+
     def can_edit_offer(self, offer=None, offer_id=None):
         """Checks if the user can edit an offer based on its ID"""
         if offer is None:
-            offer = Offer.objects.get(id=offer_id)
-        return self.is_administrator or self.organizations.filter(
-            id=offer.organization_id).exists()
+            offer = Offer.objects.only('organization_id').get(id=offer_id)
+        return (
+            self.is_administrator or
+            offer.organization_id in self.organization_ids
+        )
 
     def get_avatar(self):
         """Return avatar for current user."""
@@ -297,6 +720,7 @@ class UserProfile(models.Model):
                 os.remove(os.path.join(settings.MEDIA_ROOT, str(image.image)))
             except OSError as ex:
                 logger.error(ex)
+            delete_renditions(image.image.name, image.image.storage)
 
             image.delete()
 
@@ -306,9 +730,13 @@ class UserProfile(models.Model):
 
 class UserGallery(models.Model):
     """Handling user images."""
+    # name of the field holding image, see signals.create_image_renditions
+    IMAGE_FIELD = 'image'
+
     userprofile = models.ForeignKey(UserProfile, related_name='images')
     image = models.ImageField(upload_to=upload_to_profiles)
     is_avatar = models.BooleanField(default=False)
+    has_renditions = models.BooleanField(default=False, editable=False)
 
     def __str__(self):
         """String representation of an image."""
@@ -317,11 +745,121 @@ class UserGallery(models.Model):
 
 class OfferImage(models.Model):
     """Handling offer image."""
+    # name of the field holding image, see signals.create_image_renditions
+    IMAGE_FIELD = 'path'
+
     offer = models.ForeignKey(Offer, related_name='images')
     path = models.ImageField(upload_to=upload_to_offers)
     is_main = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    has_renditions = models.BooleanField(default=False, editable=False)
 
     def __str__(self):
         """String representation of an image."""
         return str(self.path)
+
+
+class OutgoingEmail(models.Model):
+    """Email waiting in the outbox to be sent by send_queued_emails."""
+
+    STATUSES = (
+        ('pending', 'Pending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    )
+
+    subject = models.CharField(max_length=255)
+    from_email = models.CharField(max_length=255)
+    # recipients, bcc and headers are stored as JSON:
+    recipients = models.TextField()
+    bcc = models.TextField(default='[]')
+    headers = models.TextField(default='{}')
+    body = models.TextField()
+    html_body = models.TextField(blank=True, default='')
+    status = models.CharField(
+        max_length=16,
+        choices=STATUSES,
+        default='pending',
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    sent_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:  # pylint: disable=C0111
+        indexes = [
+            models.Index(
+                fields=['status', 'next_attempt_at'],
+                name='outgoingemail_due_idx',
+            ),
+        ]
+
+    def __str__(self):
+        """String representation of an email."""
+        return self.subject
+
+
+class CountersManager(models.Manager):
+    """Manager of rows of counters incremented by many processes."""
+
+    def increment(self, lookup, increments, defaults=None):
+        """Add increments to counters of row matching lookup.
+
+        Counters are incremented with a single UPDATE, so concurrent
+        processes don't lose each other's updates on any database. Missing
+        row is inserted, if another process inserts it first, the UPDATE
+        is retried.
+
+        :param lookup: dict of unique field's value of the row
+        :param increments: dict of counters' increments
+        :param defaults: dict of other fields' values of inserted row
+        """
+        updates = {
+            counter: F(counter) + value
+            for counter, value in increments.items()
+        }
+        if self.filter(**lookup).update(**updates):
+            return
+        values = dict(lookup, **increments)
+        values.update(defaults or {})
+        try:
+            with transaction.atomic():
+                self.create(**values)
+        except IntegrityError:
+            self.filter(**lookup).update(**updates)
+
+
+class RequestProfile(models.Model):
+    """Request profiling counters of a view, summed up by all processes."""
+
+    view_name = models.CharField(max_length=255, unique=True)
+    requests = models.BigIntegerField(default=0)
+    slow_requests = models.BigIntegerField(default=0)
+    # times are kept in microseconds:
+    time = models.BigIntegerField(default=0)
+    db_time = models.BigIntegerField(default=0)
+    queries = models.BigIntegerField(default=0)
+    duplicate_queries = models.BigIntegerField(default=0)
+
+    objects = CountersManager()
+
+    def __str__(self):
+        """String representation of view's counters."""
+        return self.view_name
+
+
+class MetricSample(models.Model):
+    """Value of metrics' time series, summed up by all processes."""
+
+    # MD5 of series, which may be too long to be indexed:
+    key = models.CharField(max_length=32, unique=True)
+    # JSON of metric's name and sorted labels, see lib.metrics:
+    series = models.TextField()
+    value = models.BigIntegerField(default=0)
+
+    objects = CountersManager()
+
+    def __str__(self):
+        """String representation of a sample."""
+        return self.series
@@ -0,0 +1,316 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: pagination
+"""
+
+import base64
+import binascii
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import FieldDoesNotExist
+from django.core.exceptions import ValidationError
+from django.db.models import F
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+# pylint: disable=abstract-method
+class KeysetPagination(BasePagination):
+
+    """Keyset (seek) pagination over a unique ordering.
+
+    Cursor holds the primary key of the boundary row together with its
+    ordering values. Page is fetched with a WHERE clause on ordering
+    columns, so its cost doesn't depend on its depth. Boundary row's
+    ordering values are re-read by primary key on every request, so pages
+    stay stable even if ordering values are shifted in the meantime.
+
+    Pagination is opt-in - it is enabled only when client sends `cursor`
+    or `page_size` query param, otherwise full list is returned.
+
+    Fields in ordering prefixed with '-' are sorted descending. Ordering
+    may depend on the queryset, see get_ordering_fields(). NULLs of
+    nullable model fields are placed after all other values in either
+    direction, the same on every database.
+    """
+
+    ordering = ('id',)
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    page_size = 20
+    max_page_size = 100
+    invalid_cursor_message = 'Niepoprawny kursor.'
+
+    def __init__(self):
+        self.base_url = None
+        self.page_size_value = None
+        self.has_next = False
+        self.has_previous = False
+        self.next_position = None
+        self.previous_position = None
+        self.ordering_fields = self.ordering
+        self.nullable_fields = frozenset()
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """Return single page of results or None if not requested."""
+        if not (
+                self.cursor_query_param in request.query_params or
+                self.page_size_query_param in request.query_params
+        ):
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.page_size_value = self.get_page_size(request)
+        self.ordering_fields = self.get_ordering_fields(queryset)
+        self.nullable_fields = self.get_nullable_fields(queryset)
+        cursor = self.decode_cursor(request)
+        reverse = bool(cursor and cursor['r'])
+
+        queryset = queryset.order_by(*self.get_ordering(reverse))
+        if cursor:
+            position = self.get_position(queryset, cursor)
+            try:
+                queryset = queryset.filter(
+                    self.get_seek_filter(position, reverse)
+                )
+            except (TypeError, ValueError, ValidationError):
+                # values of crafted cursor don't fit ordering fields:
+                raise NotFound(self.invalid_cursor_message)
+
+        results = list(queryset[:self.page_size_value + 1])
+        has_more = len(results) > self.page_size_value
+        results = results[:self.page_size_value]
+        if reverse:
+            results.reverse()
+            self.has_previous = has_more
+            self.has_next = True
+        else:
+            self.has_next = has_more
+            self.has_previous = cursor is not None
+
+        if results:
+            self.previous_position = self.get_row_position(results[0])
+            self.next_position = self.get_row_position(results[-1])
+        elif cursor:
+            self.previous_position = self.next_position = position
+        else:
+            self.has_next = self.has_previous = False
+        return results
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict((
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        )))
+
+    def get_page_size(self, request):
+        """Return page size requested by client, capped by max_page_size."""
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_ordering_fields(self, queryset):  # pylint: disable=W0613
+        """Return ordering used for given queryset."""
+        return self.ordering
+
+    def get_field_names(self):
+        """Return names of ordering fields without direction prefixes."""
+        return [field.lstrip('-') for field in self.ordering_fields]
+
+    def get_nullable_fields(self, queryset):
+        """Return names of ordering fields which are nullable model fields.
+
+        Annotations used in ordering are never NULL.
+        """
+        nullable_fields = set()
+        for name in self.get_field_names():
+            try:
+                field = queryset.model._meta.get_field(name)
+            except FieldDoesNotExist:
+                continue
+            if field.null:
+                nullable_fields.add(name)
+        return frozenset(nullable_fields)
+
+    def get_ordering(self, reverse=False):
+        """Return order_by() arguments for given direction.
+
+        Reversed ordering flips direction of every field, NULLs included.
+        """
+        ordering = []
+        for field in self.ordering_fields:
+            name = field.lstrip('-')
+            descending = field.startswith('-') != reverse
+            if name not in self.nullable_fields:
+                ordering.append('-' + name if descending else name)
+                continue
+            expression = F(name)
+            order = expression.desc if descending else expression.asc
+            ordering.append(order(nulls_first=reverse, nulls_last=not reverse))
+        return ordering
+
+    def get_row_position(self, row):
+        """Return primary key and ordering values of given row."""
+        return {
+            'k': row.pk,
+            'p': [getattr(row, field) for field in self.get_field_names()],
+        }
+
+    def get_position(self, queryset, cursor):
+        """Return current position of cursor's boundary row.
+
+        Row is looked up in paginated queryset, so annotated ordering
+        values are available. If row was removed or doesn't match anymore,
+        values stored in cursor are used instead.
+        """
+        values = queryset.prefetch_related(None).filter(
+            pk=cursor['k'],
+        ).values_list(*self.get_field_names()).first()
+        if values is None:
+            return cursor
+        return {'k': cursor['k'], 'p': list(values)}
+
+    def get_seek_filter(self, position, reverse=False):
+        """Return Q object selecting rows placed after given position.
+
+        For ordering (a, b) it builds `a > x OR (a = x AND b > y)`,
+        comparison is flipped for descending fields.
+        """
+        names = self.get_field_names()
+        values = position['p']
+        seek_filter = Q()
+        for index, field in enumerate(self.ordering_fields):
+            name = names[index]
+            if values[index] is None:
+                # NULLs are last, so only reversed direction goes past them:
+                if not reverse:
+                    continue
+                condition = Q(**{'{}__isnull'.format(name): False})
+            else:
+                descending = field.startswith('-')
+                lookup = 'lt' if descending != reverse else 'gt'
+                condition = Q(**{
+                    '{}__{}'.format(name, lookup): values[index],
+                })
+                if not reverse and name in self.nullable_fields:
+                    condition |= Q(**{'{}__isnull'.format(name): True})
+            for previous_index in range(index):
+                condition &= self.get_equal_filter(
+                    names[previous_index],
+                    values[previous_index],
+                )
+            seek_filter |= condition
+        return seek_filter
+
+    @staticmethod
+    def get_equal_filter(name, value):
+        """Return Q object selecting rows with given value, NULL included."""
+        if value is None:
+            return Q(**{'{}__isnull'.format(name): True})
+        return Q(**{name: value})
+
+    def get_next_link(self):
+        """Return URL of next page or None."""
+        if not self.has_next:
+            return None
+        return self.encode_cursor(self.next_position, reverse=False)
+
+    def get_previous_link(self):
+        """Return URL of previous page or None."""
+        if not self.has_previous:
+            return None
+        return self.encode_cursor(self.previous_position, reverse=True)
+
+    def decode_cursor(self, request):
+        """Decode cursor from request query params."""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            cursor = json.loads(
+                base64.urlsafe_b64decode(encoded.encode('ascii')).decode(
+                    'utf-8'
+                )
+            )
+            if not (
+                    self.is_integer(cursor['k']) and
+                    isinstance(cursor['p'], list) and
+                    len(cursor['p']) == len(self.ordering_fields) and
+                    all(
+                        self.is_integer(value) or
+                        isinstance(value, (str, float)) or
+                        value is None
+                        for value in cursor['p']
+                    )
+            ):
+                raise ValueError
+            return {
+                'k': cursor['k'],
+                'p': cursor['p'],
+                'r': bool(cursor.get('r')),
+            }
+        except (TypeError, ValueError, KeyError, UnicodeError,
+                binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+
+    @staticmethod
+    def is_integer(value):
+        """Return True if value fits integer columns."""
+        return (
+            isinstance(value, int) and
+            not isinstance(value, bool) and
+            -2 ** 31 <= value < 2 ** 31
+        )
+
+    def encode_cursor(self, position, reverse):
+        """Return URL with encoded cursor."""
+        encoded = base64.urlsafe_b64encode(json.dumps(
+            {'k': position['k'], 'p': position['p'], 'r': int(reverse)},
+            default=str,
+        ).encode('utf-8')).decode('ascii')
+        return replace_query_param(
+            self.base_url,
+            self.cursor_query_param,
+            encoded,
+        )
+
+
+# pylint: disable=abstract-method
+class OfferPagination(KeysetPagination):
+
+    """Offers are paginated in the order of their weights.
+
+    Search results annotated with rank by OfferSearchFilter are paginated
+    from the most relevant ones, offers near given point annotated by
+    OfferNearFilter from the closest ones.
+    """
+
+    ordering = ('weight', 'id')
+    search_ordering = ('-rank', 'weight', 'id')
+    near_ordering = ('distance_squared', 'id')
+
+    def get_ordering_fields(self, queryset):
+        """Return ordering by annotations of filtered offers."""
+        if 'distance_squared' in queryset.query.annotations:
+            return self.near_ordering
+        if 'rank' in queryset.query.annotations:
+            return self.search_ordering
+        return self.ordering
+
+
+# pylint: disable=abstract-method
+class OrganizationPagination(KeysetPagination):
+
+    """Organizations are paginated alphabetically."""
+
+    ordering = ('name', 'id')
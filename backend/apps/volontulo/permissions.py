@@ -23,7 +23,7 @@ class OfferPermission(permissions.BasePermission):
         return request.method in permissions.SAFE_METHODS or (
             user.is_authenticated() and (
                 user.userprofile.is_administrator or
-                obj.organization in user.userprofile.organizations.all()
+                obj.organization_id in user.userprofile.organization_ids
             )
         )
 
@@ -35,3 +35,15 @@ class OrganizationPermission(permissions.BasePermission):
     def has_permission(self, request, view):
         """We are accepting only safe methods for now."""
         return request.method in permissions.SAFE_METHODS
+
+
+class IsAdministrator(permissions.BasePermission):
+
+    """REST API permission granted only to Volontulo administrators."""
+
+    def has_permission(self, request, view):
+        user = request.user
+        return (
+            user.is_authenticated() and
+            user.userprofile.is_administrator
+        )
@@ -4,9 +4,9 @@
 .. module:: serializers
 """
 
-import base64
-import io
+from collections import OrderedDict
 
+from django.conf import settings
 from django.contrib.auth.models import User
 from django.utils.text import slugify
 from rest_framework import serializers
@@ -14,6 +14,11 @@ from rest_framework.exceptions import PermissionDenied
 from rest_framework.fields import CharField, EmailField
 
 from apps.volontulo import models
+from apps.volontulo.lib.renditions import get_rendition_urls
+from apps.volontulo.lib.uploads import get_base64_size
+from apps.volontulo.lib.uploads import is_base64
+from apps.volontulo.lib.uploads import open_base64
+from apps.volontulo.lib.uploads import strip_whitespace
 
 
 class OrganizationSerializer(serializers.HyperlinkedModelSerializer):
@@ -58,24 +63,94 @@ class OrganizationField(serializers.Field):
             )
 
 
+def validate_image_size(size):
+    """Reject images bigger than OFFER_IMAGE_MAX_SIZE setting."""
+    if size > settings.OFFER_IMAGE_MAX_SIZE:
+        raise serializers.ValidationError(
+            "Obraz nie może być większy niż {} MB.".format(
+                round(settings.OFFER_IMAGE_MAX_SIZE / 1024 / 1024, 1)
+            )
+        )
+
+
 class OfferImageField(serializers.Field):
 
     """Custom field for offer's image serialization."""
 
+    @staticmethod
+    def get_main_image(value):
+        """Return main or first image of offer's images manager."""
+        # value.all() is served from prefetch_related() cache when present,
+        # so picking the image in Python keeps list endpoints query-constant.
+        images = sorted(
+            value.all(),
+            key=lambda image: (not image.is_main, image.pk),
+        )
+        return images[0] if images else None
+
     def to_representation(self, value):
         """Transform internal value into serializer representation."""
-        image = (
-            value.filter(is_main=True).first() or
-            value.first()
-        )
+        image = self.get_main_image(value)
         return self.context['request'].build_absolute_uri(
             location=image.path.url
         ) if image else None
 
     def to_internal_value(self, data):
-        """Transform  serializer representation into internal value."""
-        data['content'] = base64.b64decode(data['content'])
-        return data
+        """Transform  serializer representation into internal value.
+
+        Content is checked without decoding it and replaced with a file
+        decoded chunk by chunk while being written to the storage.
+        """
+        try:
+            filename, content = data['filename'], data['content']
+        except (TypeError, KeyError):
+            raise serializers.ValidationError(
+                "Wartość obrazu ma zły format. "
+                "Użyj obiektu z atrybutami filename i content."
+            )
+        if isinstance(content, str):
+            content = strip_whitespace(content)
+        if not isinstance(content, str) or not is_base64(content):
+            raise serializers.ValidationError(
+                "Zawartość obrazu musi być zakodowana w base64."
+            )
+        validate_image_size(get_base64_size(content))
+        return {
+            'filename': filename,
+            'content': open_base64(content, filename),
+        }
+
+
+class OfferImagesField(OfferImageField):
+
+    """Read-only field with URLs of offer's image renditions."""
+
+    def __init__(self, **kwargs):
+        kwargs['read_only'] = True
+        super(OfferImagesField, self).__init__(**kwargs)
+
+    def to_representation(self, value):
+        """Return dict of original and renditions URLs by their sizes.
+
+        Renditions are mapped by format, e.g. images['thumb']['webp'].
+        """
+        image = self.get_main_image(value)
+        if image is None:
+            return None
+        build_absolute_uri = self.context['request'].build_absolute_uri
+        images = OrderedDict((
+            ('original', build_absolute_uri(location=image.path.url)),
+        ))
+        if image.has_renditions:
+            for rendition, urls in get_rendition_urls(
+                    image.path.name,
+                    image.path.storage,
+            ).items():
+                images[rendition] = OrderedDict(
+                    (extension, build_absolute_uri(location=url))
+                    for extension, url in urls.items()
+                )
+        return images
 
 
 class OfferSerializer(serializers.HyperlinkedModelSerializer):
@@ -84,6 +159,7 @@ class OfferSerializer(serializers.HyperlinkedModelSerializer):
 
     slug = serializers.SerializerMethodField()
     image = OfferImageField(source='images', allow_null=True, required=False)
+    images = OfferImagesField()
     organization = OrganizationField()
 
     class Meta:
@@ -93,6 +169,7 @@ class OfferSerializer(serializers.HyperlinkedModelSerializer):
             'finished_at',
             'id',
             'image',
+            'images',
             'location',
             'offer_status',
             'organization',
@@ -106,6 +183,8 @@ class OfferSerializer(serializers.HyperlinkedModelSerializer):
             'time_commitment',
             'time_period',
             'recruitment_end_date',
+            'volunteers_count',
+            'reserve_volunteers_count',
         )
 
     start_finish_error = (
@@ -137,7 +216,7 @@ class OfferSerializer(serializers.HyperlinkedModelSerializer):
         """Custom organization validation."""
         userprofile = self.context['request'].user.userprofile
         if (
-                organization in userprofile.organizations.all() or
+                organization.id in userprofile.organization_ids or
                 (userprofile.is_administrator and self.instance is not None)
         ):
             return organization
@@ -154,6 +233,13 @@ class OfferSerializer(serializers.HyperlinkedModelSerializer):
             if start_field_value > end_field_value:
                 raise serializers.ValidationError(error_desc)
 
+    def update(self, instance, validated_data):
+        """Update offer without overwriting its application counters."""
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        instance.save_without_counters()
+        return instance
+
     def save(self, **kwargs):
         image_set = 'images' in self.validated_data
         if image_set:
@@ -162,19 +248,28 @@ class OfferSerializer(serializers.HyperlinkedModelSerializer):
         instance = super(OfferSerializer, self).save(**kwargs)
 
         if image_set:
-            instance.images.all().delete()
-            if image:
-                instance_image = models.OfferImage(
-                    offer=instance,
-                    is_main=True,
-                )
-                instance_image.path.save(
-                    image['filename'],
-                    io.BytesIO(image['content'])
-                )
-                instance_image.save()
+            self.replace_image(
+                instance,
+                image['filename'] if image else None,
+                image['content'] if image else None,
+            )
         return instance
 
+    @staticmethod
+    def replace_image(offer, filename, content):
+        """Replace offer's images with given one, streamed to storage.
+
+        :param offer: Offer instance
+        :param filename: name of uploaded file or None to remove images
+        :param content: file-like object with image content
+        """
+        offer.images.all().delete()
+        if filename is None:
+            return
+        offer_image = models.OfferImage(offer=offer, is_main=True)
+        offer_image.path.save(filename, content, save=False)
+        offer_image.save()
+
     @staticmethod
     def get_slug(obj):
         """Returns slugified title."""
@@ -219,6 +314,49 @@ class OrganizationContactSerializer(serializers.Serializer):
                         trim_whitespace=True)
 
 
+# pylint: disable=abstract-method
+class OfferImageUploadSerializer(serializers.Serializer):
+    """Serializer for offer's image uploaded as multipart form."""
+    image = serializers.ImageField()
+
+    @staticmethod
+    def validate_image(image):
+        """Check uploaded image size."""
+        validate_image_size(image.size)
+        return image
+
+
+# pylint: disable=abstract-method
+class OffersReorderSerializer(serializers.Serializer):
+    """Serializer for ordered list of offers ids."""
+    incomplete_message = "Lista musi zawierać wszystkie oferty."
+    offers = serializers.ListField(
+        child=serializers.IntegerField(),
+        allow_empty=False,
+    )
+
+    @staticmethod
+    def validate_offers(offers):
+        """Check if offers ids are unique and cover all existing offers.
+
+        Offers left out would keep their weights, colliding with the new
+        ones.
+        """
+        if len(set(offers)) != len(offers):
+            raise serializers.ValidationError(
+                "Oferty nie mogą się powtarzać."
+            )
+        if models.Offer.objects.filter(id__in=offers).count() != len(offers):
+            raise serializers.ValidationError(
+                "Nie znaleziono wszystkich ofert."
+            )
+        if models.Offer.objects.count() != len(offers):
+            raise serializers.ValidationError(
+                OffersReorderSerializer.incomplete_message
+            )
+        return offers
+
+
 # pylint: disable=abstract-method
 class UsernameSerializer(serializers.Serializer):
     """Serializer for password reset"""
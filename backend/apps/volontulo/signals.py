@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: signals
+"""
+
+import logging
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import post_delete
+from django.db.models.signals import post_save
+from django.db.models.signals import pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from apps.volontulo.lib.api_cache import invalidate_api_cache
+from apps.volontulo.lib.geo import geocode
+from apps.volontulo.lib.renditions import create_renditions
+from apps.volontulo.lib.renditions import IMAGE_ERRORS
+from apps.volontulo.models import Offer
+from apps.volontulo.models import OfferApplication
+from apps.volontulo.models import OfferImage
+from apps.volontulo.models import Organization
+from apps.volontulo.models import UserGallery
+from apps.volontulo.models import UserProfile
+from apps.volontulo.utils import invalidate_administrators_emails
+
+logger = logging.getLogger('volontulo.signals')
+
+
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+def userprofile_changed(**_):
+    """Administrator flag might have changed."""
+    invalidate_administrators_emails()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(update_fields=None, **_):
+    """Email or superuser flag might have changed.
+
+    Saves limited to other fields, like last_login on every login, are
+    skipped.
+    """
+    if update_fields is None or {'email', 'is_superuser'} & update_fields:
+        invalidate_administrators_emails()
+
+
+@receiver(post_save, sender=OfferImage)
+@receiver(post_save, sender=UserGallery)
+def create_image_renditions(sender, instance, **_):
+    """Uploaded image gets resized renditions once.
+
+    Broken images are served as they are, without renditions.
+    """
+    image = getattr(instance, instance.IMAGE_FIELD)
+    if instance.has_renditions or not image:
+        return
+    try:
+        create_renditions(image.name, image.storage)
+    except IMAGE_ERRORS as ex:
+        logger.warning('Renditions of %s not created: %s', image.name, ex)
+        return
+    instance.has_renditions = True
+    sender.objects.filter(pk=instance.pk).update(has_renditions=True)
+
+
+@receiver(post_save, sender=OfferImage)
+@receiver(post_delete, sender=OfferImage)
+def offer_image_changed(instance, **_):
+    """Offer's representation includes its main image."""
+    Offer.objects.filter(id=instance.offer_id).update(
+        updated_at=timezone.now(),
+    )
+
+
+@receiver(post_delete, sender=OfferApplication)
+def offer_application_deleted(instance, **_):
+    """Volunteer left the offer, so its place is freed.
+
+    Counter and recruitment status are updated in the same transaction as
+    the deletion.
+    """
+    OfferApplication.objects.release_place(
+        instance.offer_id,
+        instance.is_reserve,
+    )
+    transaction.on_commit(invalidate_api_cache)
+
+
+@receiver(post_save, sender=Offer)
+@receiver(post_delete, sender=Offer)
+@receiver(post_save, sender=Organization)
+@receiver(post_delete, sender=Organization)
+@receiver(post_save, sender=OfferImage)
+@receiver(post_delete, sender=OfferImage)
+def api_objects_changed(**_):
+    """Cached API responses might include changed object.
+
+    It covers offer status transitions as well, as all of them save offer.
+    """
+    transaction.on_commit(invalidate_api_cache)
+
+
+@receiver(pre_save, sender=Offer)
+def geocode_offer(instance, **_):
+    """Offer's coordinates follow its location."""
+    instance.latitude, instance.longitude = (
+        geocode(instance.location) or (None, None)
+    )
+
+
+@receiver(pre_save, sender=Organization)
+def geocode_organization(instance, **_):
+    """Organization's coordinates follow its address."""
+    instance.latitude, instance.longitude = (
+        geocode(instance.address) or (None, None)
+    )
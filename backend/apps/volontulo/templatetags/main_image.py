@@ -6,6 +6,7 @@
 
 from django import template
 
+from apps.volontulo.lib.renditions import get_rendition_name
 
 register = template.Library()
 
@@ -24,3 +25,30 @@ def main_image(images):
         return images[0]
 
     return ''
+
+
+@register.filter(name='rendition')
+def rendition(image, name):
+    """Get JPEG rendition of image, or original if it has no renditions.
+
+    :param image: OfferImage or UserGallery instance
+    :param name: string Rendition name, e.g. 'thumb'
+    """
+    if not image:
+        return ''
+    image_file = getattr(image, image.IMAGE_FIELD)
+    if not image.has_renditions:
+        return image_file.name
+    return get_rendition_name(image_file.name, name, 'jpg')
+
+
+@register.filter(name='main_image_rendition')
+def main_image_rendition(images, name):
+    """Get JPEG rendition of main or first image from all offer images.
+
+    :param images: list Offer images
+    :param name: string Rendition name, e.g. 'thumb'
+    """
+    images = list(images)
+    main_images = [image for image in images if image.is_main] or images
+    return rendition(main_images[0] if main_images else None, name)
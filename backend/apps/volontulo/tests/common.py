@@ -4,9 +4,13 @@
 .. module:: common
 """
 
+from contextlib import contextmanager
+
 from django.contrib.auth.models import User
+from django.db import connection
 
 from apps.volontulo.models import Offer
+from apps.volontulo.models import OfferApplication
 from apps.volontulo.models import Organization
 from apps.volontulo.models import UserProfile
 
@@ -22,6 +26,21 @@ COMMON_OFFER_DATA = {
 }
 
 
+@contextmanager
+def run_on_commit_callbacks():
+    """Run callbacks registered with transaction.on_commit() within block.
+
+    Test's transaction is never committed, so callbacks, like invalidation
+    of cached API responses, are run as if changes of the block were.
+    """
+    start = len(connection.run_on_commit)
+    yield
+    callbacks = connection.run_on_commit[start:]
+    del connection.run_on_commit[start:]
+    for _, callback in callbacks:
+        callback()
+
+
 def initialize_empty_volunteer():
     """Initialize empty volunteer."""
     volunteer_user1 = User.objects.create_user(
@@ -106,8 +125,7 @@ def initialize_filled_volunteer_and_organization():
             recruitment_status='open',
             action_status='ongoing',
         )
-        offer.volunteers.add(volunteer_user2)
-        offer.save()
+        OfferApplication.objects.create(offer=offer, user=volunteer_user2)
 
     # create additional organization offers for administrator use
     for i in range(100, 110):
@@ -176,6 +194,7 @@ def test_offer_list_fields(self, offer):
     self.assertIsInstance(offer.pop('finished_at'), str)
     self.assertIsInstance(offer.pop('id'), int)
     self.assertIsInstance(offer.pop('image'), (str, type(None)))
+    self.assertIsInstance(offer.pop('images'), (dict, type(None)))
     self.assertIsInstance(offer.pop('location'), str)
     self.assertIsInstance(offer.pop('offer_status'), str)
     self.assertIsInstance(offer.pop('slug'), str)
@@ -188,6 +207,8 @@ def test_offer_list_fields(self, offer):
     self.assertIsInstance(offer.pop('time_commitment'), str)
     self.assertIsInstance(offer.pop('time_period'), str)
     self.assertIsInstance(offer.pop('recruitment_end_date'), (str, type(None)))
+    self.assertIsInstance(offer.pop('volunteers_count'), int)
+    self.assertIsInstance(offer.pop('reserve_volunteers_count'), int)
     self.assertIsInstance(offer['organization'].pop('address'), str)
     self.assertIsInstance(offer['organization'].pop('description'), str)
     self.assertIsInstance(offer['organization'].pop('id'), int)
@@ -5,9 +5,12 @@
 """
 
 from django.contrib.auth.models import User
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 
 from apps.volontulo.models import Offer
+from apps.volontulo.models import OfferApplication
 from apps.volontulo.models import Organization
 
 
@@ -51,7 +54,7 @@ class TestOfferModel(TestCase):
             finished_at='2015-12-12 11:12:13+00:00',
         )
         for volunteer in volunteers:
-            offer.volunteers.add(volunteer)
+            OfferApplication.objects.create(offer=offer, user=volunteer)
 
     def test__string_representation(self):
         """Test Offer model string reprezentation."""
@@ -158,3 +161,49 @@ class OfferTestCase(TestCase):
             self.offer.status_old,
             'ACTIVE'
         )
+
+    def test__publish_places_offer_first(self):
+        """Testing that published offer is first without reweighting others"""
+        other_offer = Offer.objects.create(
+            organization=self.organization,
+            title='Other offer',
+            offer_status='published',
+            weight=-3,
+        )
+        new_offer = Offer.objects.create(
+            organization=self.organization,
+            title='New offer',
+        )
+
+        new_offer.publish()
+
+        self.offer.refresh_from_db()
+        other_offer.refresh_from_db()
+        self.assertEqual(self.offer.weight, 0)
+        self.assertEqual(other_offer.weight, -3)
+        self.assertEqual(new_offer.weight, -4)
+        self.assertEqual(
+            list(Offer.objects.get_weightened()),
+            [new_offer, other_offer, self.offer],
+        )
+
+    def test__publish_single_update(self):
+        """Testing that weight is computed by the UPDATE publishing offer"""
+        new_offer = Offer.objects.create(
+            organization=self.organization,
+            title='New offer',
+        )
+
+        with CaptureQueriesContext(connection) as context:
+            new_offer.publish()
+
+        self.assertEqual(
+            [
+                query['sql'].split()[0]
+                for query in context.captured_queries
+                if 'SAVEPOINT' not in query['sql']
+            ],
+            ['UPDATE', 'SELECT'],
+        )
+        self.assertEqual(new_offer.offer_status, 'published')
+        self.assertEqual(new_offer.weight, -1)
@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: test_offerapplication
+"""
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from apps.volontulo.factories import OfferFactory
+from apps.volontulo.factories import UserFactory
+from apps.volontulo.models import Offer
+from apps.volontulo.models import OfferApplication
+
+
+class TestOfferApplicationModel(TestCase):
+    """Tests for OfferApplication model."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Fixtures for OfferApplication model unittests."""
+        cls.offer = OfferFactory(
+            action_status='ongoing',
+            recruitment_status='open',
+            recruitment_end_date=None,
+            reserve_recruitment_end_date=None,
+            volunteers_limit=2,
+            reserve_recruitment=True,
+            reserve_volunteers_limit=1,
+        )
+        cls.users = UserFactory.create_batch(4)
+
+    def _apply(self, user):
+        """Apply user for offer and return result."""
+        return OfferApplication.objects.apply(self.offer.id, user.id)
+
+    def test__apply(self):
+        """Test that applying is an INSERT and an UPDATE."""
+        with CaptureQueriesContext(connection) as context:
+            result = self._apply(self.users[0])
+
+        self.assertEqual(result, OfferApplication.objects.APPLIED)
+        self.assertEqual(
+            [
+                query['sql'].split()[0]
+                for query in context.captured_queries
+                if 'SAVEPOINT' not in query['sql']
+            ],
+            ['INSERT', 'UPDATE'],
+        )
+        application = OfferApplication.objects.get()
+        self.assertEqual(application.offer, self.offer)
+        self.assertEqual(application.user, self.users[0])
+        self.assertFalse(application.is_reserve)
+        self.assertIsNotNone(application.created_at)
+        self.assertEqual(
+            Offer.objects.get(id=self.offer.id).volunteers_count,
+            1,
+        )
+
+    def test__apply_twice(self):
+        """Test that applying again is ignored."""
+        self._apply(self.users[0])
+
+        result = self._apply(self.users[0])
+
+        self.assertEqual(result, OfferApplication.objects.ALREADY_APPLIED)
+        self.assertEqual(OfferApplication.objects.count(), 1)
+        self.assertEqual(list(self.offer.volunteers.all()), self.users[:1])
+        self.assertEqual(
+            Offer.objects.get(id=self.offer.id).volunteers_count,
+            1,
+        )
+
+    def test__apply_over_limits(self):
+        """Test that volunteers fill main and reserve lists in turn."""
+        results = [self._apply(user) for user in self.users]
+
+        self.assertEqual(results, [
+            OfferApplication.objects.APPLIED,
+            OfferApplication.objects.APPLIED,
+            OfferApplication.objects.APPLIED_RESERVE,
+            OfferApplication.objects.OFFER_FULL,
+        ])
+        offer = Offer.objects.get(id=self.offer.id)
+        self.assertEqual(offer.volunteers_count, 2)
+        self.assertEqual(offer.reserve_volunteers_count, 1)
+        self.assertEqual(offer.recruitment_status, 'closed')
+        self.assertEqual(
+            list(OfferApplication.objects.filter(
+                is_reserve=True,
+            ).values_list('user_id', flat=True)),
+            [self.users[2].id],
+        )
+        self.assertFalse(
+            OfferApplication.objects.filter(user=self.users[3]).exists()
+        )
+
+    def test__apply_switches_to_supplemental(self):
+        """Test that filled main list opens reserve recruitment."""
+        self._apply(self.users[0])
+        self.assertEqual(
+            Offer.objects.get(id=self.offer.id).recruitment_status,
+            'open',
+        )
+
+        self._apply(self.users[1])
+
+        self.assertEqual(
+            Offer.objects.get(id=self.offer.id).recruitment_status,
+            'supplemental',
+        )
+
+    def test__apply_without_reserve_list(self):
+        """Test that filled main list closes recruitment without reserve."""
+        Offer.objects.filter(id=self.offer.id).update(
+            volunteers_limit=1,
+            reserve_recruitment=False,
+        )
+        self._apply(self.users[0])
+
+        result = self._apply(self.users[1])
+
+        self.assertEqual(result, OfferApplication.objects.OFFER_FULL)
+        self.assertEqual(
+            Offer.objects.get(id=self.offer.id).recruitment_status,
+            'closed',
+        )
+
+    def test__apply_without_limit(self):
+        """Test that limit of 0 means unlimited list."""
+        Offer.objects.filter(id=self.offer.id).update(volunteers_limit=0)
+
+        results = {self._apply(user) for user in self.users}
+
+        self.assertEqual(results, {OfferApplication.objects.APPLIED})
+        offer = Offer.objects.get(id=self.offer.id)
+        self.assertEqual(offer.volunteers_count, 4)
+        self.assertEqual(offer.recruitment_status, 'open')
+
+    def test__apply_closed_recruitment(self):
+        """Test that closed recruitment doesn't accept applications."""
+        self.offer.close_offer()
+
+        result = self._apply(self.users[0])
+
+        self.assertEqual(result, OfferApplication.objects.OFFER_FULL)
+
+    def test__offer_save_keeps_counters(self):
+        """Test that saving stale offer doesn't overwrite counters."""
+        offer = Offer.objects.get(id=self.offer.id)
+        self._apply(self.users[0])
+
+        offer.title = 'Changed title'
+        offer.save_without_counters()
+        offer.publish()
+
+        offer = Offer.objects.get(id=self.offer.id)
+        self.assertEqual(offer.title, 'Changed title')
+        self.assertEqual(offer.offer_status, 'published')
+        self.assertEqual(offer.volunteers_count, 1)
+
+    def test__offer_save_inserts_deleted_row(self):
+        """Test that plain save keeps Django's semantics."""
+        offer = Offer.objects.get(id=self.offer.id)
+        Offer.objects.filter(id=offer.id).delete()
+
+        offer.save()
+
+        self.assertTrue(Offer.objects.filter(id=offer.id).exists())
+
+    def test__delete_frees_place(self):
+        """Test that deleting application decrements offer's counters."""
+        for user in self.users[:3]:
+            self._apply(user)
+
+        OfferApplication.objects.filter(
+            user__in=self.users[1:3],
+        ).delete()
+
+        offer = Offer.objects.get(id=self.offer.id)
+        self.assertEqual(offer.volunteers_count, 1)
+        self.assertEqual(offer.reserve_volunteers_count, 0)
+
+    def test__delete_reopens_recruitment(self):
+        """Test that place freed on filled main list can be claimed."""
+        for user in self.users[:2]:
+            self._apply(user)
+        OfferApplication.objects.filter(user=self.users[1]).delete()
+
+        offer = Offer.objects.get(id=self.offer.id)
+        self.assertEqual(offer.recruitment_status, 'open')
+        self.assertEqual(
+            self._apply(self.users[2]),
+            OfferApplication.objects.APPLIED,
+        )
+        self.assertEqual(
+            Offer.objects.get(id=self.offer.id).recruitment_status,
+            'supplemental',
+        )
+
+    def test__delete_reopens_reserve_recruitment(self):
+        """Test that place freed on filled reserve list can be claimed."""
+        for user in self.users[:3]:
+            self._apply(user)
+        OfferApplication.objects.filter(user=self.users[2]).delete()
+
+        self.assertEqual(
+            Offer.objects.get(id=self.offer.id).recruitment_status,
+            'supplemental',
+        )
+        self.assertEqual(
+            self._apply(self.users[3]),
+            OfferApplication.objects.APPLIED_RESERVE,
+        )
+
+    def test__delete_keeps_finished_offer_closed(self):
+        """Test that leaving finished offer doesn't reopen recruitment."""
+        for user in self.users[:2]:
+            self._apply(user)
+        self.offer.close_offer()
+
+        OfferApplication.objects.filter(user=self.users[1]).delete()
+
+        offer = Offer.objects.get(id=self.offer.id)
+        self.assertEqual(offer.volunteers_count, 1)
+        self.assertEqual(offer.recruitment_status, 'closed')
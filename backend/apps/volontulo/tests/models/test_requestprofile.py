@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: test_requestprofile
+"""
+
+from unittest import mock
+
+from django.test import TestCase
+
+from apps.volontulo.models import RequestProfile
+
+
+class TestRequestProfile(TestCase):
+    """Class responsible for testing request profiling counters."""
+
+    def _get_counters(self):
+        """Return (requests, queries) of the only profiled view."""
+        profile = RequestProfile.objects.get()
+        self.assertEqual(profile.view_name, 'offer-list')
+        return profile.requests, profile.queries
+
+    def test_increment(self):
+        """Test that row is created and then incremented."""
+        RequestProfile.objects.increment(
+            {'view_name': 'offer-list'},
+            {'requests': 1, 'queries': 3},
+        )
+        RequestProfile.objects.increment(
+            {'view_name': 'offer-list'},
+            {'requests': 1, 'queries': 4},
+        )
+
+        self.assertEqual(self._get_counters(), (2, 7))
+
+    def test_increment_created_concurrently(self):
+        """Test that row created by another process is incremented."""
+        RequestProfile.objects.create(
+            view_name='offer-list',
+            requests=1,
+            queries=3,
+        )
+        rows = RequestProfile.objects.filter(view_name='offer-list')
+        # row is missing when checked first:
+        filter_rows = mock.patch.object(
+            RequestProfile.objects,
+            'filter',
+            side_effect=[RequestProfile.objects.none(), rows],
+        )
+
+        with filter_rows:
+            RequestProfile.objects.increment(
+                {'view_name': 'offer-list'},
+                {'requests': 1, 'queries': 4},
+            )
+
+        self.assertEqual(self._get_counters(), (2, 7))
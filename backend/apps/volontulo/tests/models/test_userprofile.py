@@ -6,6 +6,7 @@ u"""
 from __future__ import unicode_literals
 from django.test import TestCase
 
+from apps.volontulo.models import Offer
 from apps.volontulo.models import Organization
 from apps.volontulo.models import User
 from apps.volontulo.models import UserProfile
@@ -78,3 +79,23 @@ class TestUserProfile(TestCase):
         self.assertTrue(self.administrator_user.is_administrator)
         self.assertFalse(self.volunteer_user.is_administrator)
         self.assertFalse(self.organization_user.is_administrator)
+
+    def test__can_edit_offer(self):
+        """Check if organization ids are fetched once for many offers."""
+        organization = self.organization_user.organizations.get()
+        own_offer = Offer.objects.create(
+            organization=organization,
+            title='Own offer',
+        )
+        other_offer = Offer.objects.create(
+            organization=Organization.objects.create(name='Other'),
+            title='Other offer',
+        )
+
+        with self.assertNumQueries(1):
+            self.assertTrue(self.organization_user.can_edit_offer(own_offer))
+            self.assertFalse(
+                self.organization_user.can_edit_offer(other_offer)
+            )
+        self.assertTrue(self.administrator_user.can_edit_offer(other_offer))
+        self.assertFalse(self.volunteer_user.can_edit_offer(own_offer))
@@ -0,0 +1,66 @@
+"""
+.. module:: test_administrators_emails
+"""
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from apps.volontulo.factories import UserProfileFactory
+from apps.volontulo.utils import get_administrators_emails
+
+
+class AdministratorsEmailsTestCase(TestCase):
+
+    """Test for cached administrators emails."""
+
+    def setUp(self):
+        """Set up each test."""
+        cache.clear()
+        self.admins = UserProfileFactory.create_batch(
+            3,
+            is_administrator=True,
+        )
+        self.volunteer = UserProfileFactory.create()
+
+    def test_single_query(self):
+        """Testing if emails are fetched with one query and then cached."""
+        with self.assertNumQueries(1):
+            emails = get_administrators_emails()
+        with self.assertNumQueries(0):
+            self.assertEqual(get_administrators_emails(), emails)
+        self.assertEqual(emails, {
+            str(admin.user.id): admin.user.email for admin in self.admins
+        })
+
+    def test_invalidated_on_administrator_change(self):
+        """Testing if cache is invalidated when administrator is added."""
+        get_administrators_emails()
+        self.volunteer.is_administrator = True
+        self.volunteer.save()
+
+        self.assertIn(
+            str(self.volunteer.user.id),
+            get_administrators_emails(),
+        )
+
+    def test_invalidated_on_email_change(self):
+        """Testing if cache is invalidated when administrator's email changes.
+        """
+        get_administrators_emails()
+        user = self.admins[0].user
+        user.email = 'new.admin@example.com'
+        user.save()
+
+        self.assertEqual(
+            get_administrators_emails()[str(user.id)],
+            'new.admin@example.com',
+        )
+
+    def test_not_invalidated_on_login(self):
+        """Testing if cache survives updating user's last login."""
+        get_administrators_emails()
+        self.client.login(username=self.volunteer.user.username,
+                          password='pass123')
+
+        with self.assertNumQueries(0):
+            get_administrators_emails()
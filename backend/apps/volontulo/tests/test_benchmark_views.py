@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: test_benchmark_views
+"""
+
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from apps.volontulo.management.commands.benchmark_views import ROUTES
+from apps.volontulo.management.commands.benchmark_views import find_growing
+from apps.volontulo.management.commands.benchmark_views import \
+    find_unbenchmarked
+from apps.volontulo.models import Offer
+
+
+class TestBenchmarkViewsCommand(TestCase):
+
+    """Tests for benchmark_views management command.
+
+    Running it at small scales keeps N+1 queries out of all views.
+    """
+
+    def test_benchmark(self):
+        """Test that no view makes more queries for more offers."""
+        report_file, report_path = tempfile.mkstemp(suffix='.json')
+        os.close(report_file)
+        self.addCleanup(os.remove, report_path)
+
+        call_command(
+            'benchmark_views',
+            '--scales', '3', '12',
+            '--repeat', '1',
+            '--output', report_path,
+            stderr=StringIO(),
+        )
+
+        with open(report_path) as report_file:
+            report = json.load(report_file)
+        self.assertEqual(report['failed'], [])
+        self.assertEqual(report['growing_queries'], [])
+        self.assertEqual(
+            [scale['offers'] for scale in report['scales']],
+            [3, 12],
+        )
+        for scale in report['scales']:
+            self.assertEqual(len(scale['routes']), len(ROUTES))
+            for route in scale['routes']:
+                self.assertGreater(route['bytes'], 0)
+                self.assertGreaterEqual(route['time'], 0)
+        self.assertEqual(Offer.objects.count(), 0)
+
+    def test_growing_queries(self):
+        """Test that views making more queries for more offers are found."""
+        def scale(offers, queries):
+            """Return report of single scale."""
+            return {'offers': offers, 'routes': [
+                {'name': 'offers list', 'user': 'anonymous', 'queries': count}
+                for count in queries
+            ]}
+
+        self.assertEqual(
+            find_growing([scale(10, [2]), scale(100, [2])]),
+            [],
+        )
+        self.assertEqual(
+            find_growing([scale(10, [2]), scale(100, [12])]),
+            ['offers list (anonymous)'],
+        )
+
+    def test_all_routes_benchmarked(self):
+        """Test that every route is benchmarked or excluded explicitly."""
+        self.assertEqual(find_unbenchmarked(), [])
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: test_delete_orphaned_media
+"""
+
+import os
+import shutil
+import tempfile
+import time
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import override_settings
+from django.test import TestCase
+
+from apps.volontulo.factories import OfferFactory
+from apps.volontulo.factories import UserProfileFactory
+from apps.volontulo.models import OfferImage
+from apps.volontulo.models import UserGallery
+
+
+class TestDeleteOrphanedMediaCommand(TestCase):
+
+    """Tests for delete_orphaned_media management command."""
+
+    def setUp(self):
+        """Set up each test."""
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        offer = OfferFactory()
+        offer.images.all().delete()
+        # factory's image is an orphan too, start with empty directories:
+        shutil.rmtree(os.path.join(self.media_root, 'offers'))
+        # bulk_create skips signals creating renditions:
+        OfferImage.objects.bulk_create([
+            OfferImage(offer=offer, path='offers/used.png'),
+        ])
+        UserGallery.objects.bulk_create([
+            UserGallery(
+                userprofile=UserProfileFactory(),
+                image='profiles/avatar.jpg',
+            ),
+        ])
+        for name in (
+                'offers/used.png',
+                'offers/used.thumb.webp',
+                'offers/used.hero.jpg',
+                'offers/orphan.png',
+                'offers/orphan.thumb.jpg',
+                'offers/used.png.bak',
+                'profiles/avatar.jpg',
+                'profiles/avatar.card.webp',
+                'profiles/orphan.jpg',
+        ):
+            self._create_file(name)
+        os.mkdir(os.path.join(self.media_root, 'offers', 'subdirectory'))
+
+    def _create_file(self, name, age=86400):
+        """Create media file modified age seconds ago."""
+        path = os.path.join(self.media_root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as media_file:
+            media_file.write(b'x' * 10)
+        modified_at = time.time() - age
+        os.utime(path, (modified_at, modified_at))
+
+    @staticmethod
+    def _call_command(*args):
+        """Call command and return its output."""
+        stdout = StringIO()
+        call_command('delete_orphaned_media', *args, stdout=stdout)
+        return stdout.getvalue()
+
+    def _get_files(self):
+        """Return names of all remaining media files."""
+        return sorted(
+            os.path.join(directory, name)
+            for directory in ('offers', 'profiles')
+            for name in os.listdir(os.path.join(self.media_root, directory))
+            if os.path.isfile(os.path.join(self.media_root, directory, name))
+        )
+
+    def test_orphans_deleted(self):
+        """Test that only files of no object are deleted."""
+        output = self._call_command()
+
+        self.assertIn('offers: 6 files, 3 orphaned', output)
+        self.assertIn('profiles: 3 files, 1 orphaned', output)
+        self.assertEqual(self._get_files(), [
+            'offers/used.hero.jpg',
+            'offers/used.png',
+            'offers/used.thumb.webp',
+            'profiles/avatar.card.webp',
+            'profiles/avatar.jpg',
+        ])
+
+    def test_dry_run(self):
+        """Test that dry run only lists orphans."""
+        files = self._get_files()
+
+        output = self._call_command('--dry-run')
+
+        self.assertIn(
+            os.path.join(self.media_root, 'offers/orphan.png'),
+            output,
+        )
+        self.assertNotIn('used.png\n', output)
+        self.assertEqual(self._get_files(), files)
+
+    def test_recent_files_kept(self):
+        """Test that files uploaded recently are kept."""
+        self._create_file('offers/uploading.png', age=10)
+
+        self._call_command()
+
+        self.assertIn('offers/uploading.png', self._get_files())
+        self._call_command('--min-age=0')
+        self.assertNotIn('offers/uploading.png', self._get_files())
+
+    def test_missing_directory(self):
+        """Test that missing upload directory is skipped."""
+        shutil.rmtree(os.path.join(self.media_root, 'profiles'))
+
+        output = self._call_command()
+
+        self.assertNotIn('profiles', output)
@@ -0,0 +1,21 @@
+"""
+.. module:: test_explain_offers_queries
+"""
+
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+
+class ExplainOffersQueriesTestCase(TestCase):
+
+    """Test for explain_offers_queries command."""
+
+    def test_command_output(self):
+        """Testing if offers manager queries use indexes."""
+        out = StringIO()
+        call_command('explain_offers_queries', strict=True, stdout=out)
+        self.assertIn('get_active: index used', out.getvalue())
+        self.assertIn('get_archived: index used', out.getvalue())
+        self.assertIn('get_weightened: index used', out.getvalue())
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: test_geo
+"""
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils.six import StringIO
+
+from apps.volontulo.factories import OfferFactory
+from apps.volontulo.factories import OrganizationFactory
+from apps.volontulo.lib.geo import geocode
+from apps.volontulo.lib.geo import get_bounding_box
+from apps.volontulo.models import Offer
+from apps.volontulo.models import Organization
+
+
+class TestGeocode(TestCase):
+
+    """Tests for geocoding from local gazetteer."""
+
+    def test_town(self):
+        """Test geocoding town name."""
+        self.assertEqual(geocode('Warszawa'), (52.2297, 21.0122))
+
+    def test_normalized_name(self):
+        """Test that case, diacritics and whitespace are ignored."""
+        self.assertEqual(geocode('  ŁÓDŹ '), geocode('lodz'))
+        self.assertIsNotNone(geocode('lodz'))
+
+    def test_address(self):
+        """Test geocoding address ending with postal code and town."""
+        self.assertEqual(
+            geocode('ul. Długa 5, 80-001 Gdańsk'),
+            geocode('Gdańsk'),
+        )
+
+    def test_unknown(self):
+        """Test that unknown places aren't geocoded."""
+        self.assertIsNone(geocode('Atlantyda'))
+        self.assertIsNone(geocode(''))
+
+    def test_bounding_box(self):
+        """Test that bounding box is wider in longitude."""
+        min_lat, max_lat, min_lon, max_lon = get_bounding_box(52, 21, 10)
+
+        self.assertAlmostEqual(max_lat - min_lat, 0.18, places=2)
+        self.assertAlmostEqual(max_lon - min_lon, 0.29, places=2)
+
+
+class TestGeocodeLocationsCommand(TestCase):
+
+    """Tests for geocode_locations management command."""
+
+    def test_geocode_locations(self):
+        """Test that coordinates of existing objects are set."""
+        organization = OrganizationFactory(address='ul. Długa 5, Gdańsk')
+        offer = OfferFactory(organization=organization, location='Kraków')
+        Offer.objects.update(latitude=None, longitude=None)
+        Organization.objects.update(latitude=None, longitude=None)
+        stdout = StringIO()
+
+        call_command('geocode_locations', stdout=stdout)
+
+        offer.refresh_from_db()
+        organization.refresh_from_db()
+        self.assertAlmostEqual(offer.latitude, 50.0647)
+        self.assertAlmostEqual(organization.latitude, 54.3520)
+        self.assertIn('offers: 1 geocoded, 0 not found', stdout.getvalue())
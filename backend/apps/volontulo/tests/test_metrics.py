@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: test_metrics
+"""
+
+from unittest import mock
+
+from django.test import override_settings
+from django.test import TestCase
+from django.test.client import RequestFactory
+from rest_framework import status
+
+from apps.volontulo.factories import OfferFactory
+from apps.volontulo.factories import UserFactory
+from apps.volontulo.lib import metrics
+from apps.volontulo.lib.email import send_mail
+from apps.volontulo.models import MetricSample
+from apps.volontulo.models import OfferApplication
+
+
+@override_settings(METRICS=True)
+class TestMetricsRegistry(TestCase):
+
+    """Tests for metrics registry and its text format."""
+
+    def setUp(self):
+        """Start with no metrics."""
+        metrics.reset()
+        self.addCleanup(metrics.reset)
+
+    def test_counter(self):
+        """Test that counters are summed per labels."""
+        metrics.inc('volontulo_offer_applications_total', {'result': 'a'})
+        metrics.inc('volontulo_offer_applications_total', {'result': 'a'}, 2)
+        metrics.inc('volontulo_offer_applications_total', {'result': 'b'})
+
+        lines = metrics.render().splitlines()
+
+        self.assertIn(
+            '# TYPE volontulo_offer_applications_total counter',
+            lines,
+        )
+        self.assertIn(
+            'volontulo_offer_applications_total{result="a"} 3',
+            lines,
+        )
+        self.assertIn(
+            'volontulo_offer_applications_total{result="b"} 1',
+            lines,
+        )
+
+    def test_histogram(self):
+        """Test that histogram's buckets are cumulative."""
+        for seconds in (0.003, 0.2, 0.3, 20):
+            metrics.observe(
+                'volontulo_http_request_duration_seconds',
+                seconds,
+                {'route': 'offer-list'},
+            )
+
+        lines = metrics.render().splitlines()
+
+        for bound, count in (('0.005', 1), ('0.1', 1), ('0.25', 2),
+                             ('0.5', 3), ('10', 3), ('+Inf', 4)):
+            self.assertIn(
+                'volontulo_http_request_duration_seconds_bucket'
+                '{{le="{}",route="offer-list"}} {}'.format(bound, count),
+                lines,
+            )
+        self.assertIn(
+            'volontulo_http_request_duration_seconds_sum'
+            '{route="offer-list"} 20.503',
+            lines,
+        )
+        self.assertIn(
+            'volontulo_http_request_duration_seconds_count'
+            '{route="offer-list"} 4',
+            lines,
+        )
+
+    def test_label_escaping(self):
+        """Test that quotes in label values are escaped."""
+        metrics.inc('volontulo_emails_total', {'template': 'a"b'})
+
+        self.assertIn(
+            r'volontulo_emails_total{template="a\"b"} 1',
+            metrics.render(),
+        )
+
+    def test_buffered_until_flush(self):
+        """Test that metrics are shared only after flush."""
+        metrics.inc('volontulo_offers_published_total')
+        # a process that hasn't recorded anything:
+        with mock.patch.object(metrics, '_pending', metrics.Counter()):
+            self.assertNotIn(
+                'volontulo_offers_published_total 1',
+                metrics.render(),
+            )
+
+        metrics.flush()
+        with mock.patch.object(metrics, '_pending', metrics.Counter()):
+            self.assertIn(
+                'volontulo_offers_published_total 1',
+                metrics.render(),
+            )
+
+    @override_settings(METRICS_FLUSH_INTERVAL=0)
+    def test_not_flushed_in_transaction(self):
+        """Test that registry isn't flushed within transactions."""
+        metrics.inc('volontulo_offers_published_total')
+
+        self.assertFalse(MetricSample.objects.exists())
+        metrics.flush()
+        self.assertEqual(MetricSample.objects.get().value, 1)
+
+    @override_settings(METRICS=False)
+    def test_disabled(self):
+        """Test that nothing is recorded with metrics disabled."""
+        metrics.inc('volontulo_offers_published_total')
+
+        self.assertNotIn('volontulo_offers_published_total 1',
+                         metrics.render())
+
+
+@override_settings(METRICS=True)
+class TestMetricsInstrumentation(TestCase):
+
+    """Tests for metrics recorded by requests, emails and offers."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Set up data for all tests."""
+        cls.offer = OfferFactory(
+            offer_status='unpublished',
+            recruitment_status='open',
+            volunteers_limit=1,
+            reserve_recruitment=False,
+        )
+        cls.users = UserFactory.create_batch(2)
+
+    def setUp(self):
+        """Start with no metrics."""
+        metrics.reset()
+        self.addCleanup(metrics.reset)
+
+    def test_requests(self):
+        """Test that requests are recorded by route."""
+        self.client.get('/api/offers/')
+        response = self.client.get('/metrics')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response['Content-Type'],
+            'text/plain; version=0.0.4; charset=utf-8',
+        )
+        lines = response.content.decode().splitlines()
+        self.assertIn(
+            'volontulo_http_requests_total'
+            '{method="GET",route="offer-list",status="200"} 1',
+            lines,
+        )
+        self.assertIn(
+            'volontulo_http_request_duration_seconds_count'
+            '{route="offer-list"} 1',
+            lines,
+        )
+        self.assertTrue(any(
+            line.startswith('volontulo_db_queries_total{route="offer-list"}')
+            for line in lines
+        ))
+
+    @override_settings(METRICS=False)
+    def test_endpoint_disabled(self):
+        """Test that endpoint is missing with metrics disabled."""
+        response = self.client.get('/metrics')
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_applications_and_publications(self):
+        """Test that results of applications and publications are counted."""
+        self.offer.publish()
+        for user in self.users:
+            OfferApplication.objects.apply(self.offer.id, user.id)
+
+        lines = metrics.render().splitlines()
+
+        self.assertIn('volontulo_offers_published_total 1', lines)
+        self.assertIn(
+            'volontulo_offer_applications_total{result="applied"} 1',
+            lines,
+        )
+        self.assertIn(
+            'volontulo_offer_applications_total{result="offer_full"} 1',
+            lines,
+        )
+
+    def test_emails(self):
+        """Test that emails are counted by outcome."""
+        send_mail(
+            RequestFactory().get('/'),
+            'contact_to_admin',
+            ['volunteer@example.com'],
+            {'name': 'Jan'},
+            send_copy_to_admin=False,
+        )
+        send = mock.patch(
+            'apps.volontulo.lib.email.EmailMultiAlternatives.send',
+            side_effect=OSError,
+        )
+        with send, self.assertRaises(OSError):
+            send_mail(
+                RequestFactory().get('/'),
+                'contact_to_admin',
+                ['volunteer@example.com'],
+                {'name': 'Jan'},
+                send_copy_to_admin=False,
+            )
+
+        lines = metrics.render().splitlines()
+
+        self.assertIn(
+            'volontulo_emails_total'
+            '{outcome="sent",template="contact_to_admin"} 1',
+            lines,
+        )
+        self.assertIn(
+            'volontulo_emails_total'
+            '{outcome="failed",template="contact_to_admin"} 1',
+            lines,
+        )
+        self.assertIn('volontulo_email_send_duration_seconds_count 2', lines)
@@ -2,19 +2,33 @@
 .. module:: test_populate_database
 """
 
+import shutil
+import tempfile
 from io import StringIO
 from unittest import mock
 
+from django.contrib.auth.models import User
+from django.core.files.storage import default_storage
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.core.management import call_command
+from django.db.models import Count
+from django.test import override_settings
 from django.test import TestCase
 
+from apps.volontulo.models import Offer
+from apps.volontulo.models import OfferImage
+from apps.volontulo.models import Organization
+from apps.volontulo.models import UserProfile
+
 
 class PopulateDatabaseTestCase(TestCase):
 
     """Test for populate_database command."""
 
-    @mock.patch('apps.volontulo.factories.placeimg_com_download')
+    @mock.patch(
+        'apps.volontulo.management.commands.populate_database.'
+        'placeimg_com_download'
+    )
     def test_command_output(self, placeimg_com_download_mock):
         """Testing if populate_database command get proper output."""
         placeimg_com_download_mock.return_value = lambda: SimpleUploadedFile(
@@ -24,3 +38,39 @@ class PopulateDatabaseTestCase(TestCase):
         out = StringIO()
         call_command('populate_database', stdout=out)
         self.assertIn('Database successfully populated', out.getvalue())
+
+    def test_bulk(self):
+        """Test that bulk mode creates all objects with local images."""
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        out = StringIO()
+
+        with override_settings(MEDIA_ROOT=media_root):
+            call_command(
+                'populate_database',
+                '--bulk',
+                '--scale=2',
+                '--batch-size=7',
+                stdout=out,
+                stderr=StringIO(),
+            )
+
+            self.assertIn('Database successfully populated', out.getvalue())
+            self.assertEqual(Organization.objects.count(), 30)
+            self.assertEqual(Offer.objects.count(), 100)
+            self.assertEqual(User.objects.count(), 330)
+            self.assertEqual(UserProfile.objects.filter(
+                organizations__isnull=False,
+            ).count(), 30)
+            self.assertFalse(Offer.objects.filter(images=None).exists())
+            image = OfferImage.objects.first()
+            self.assertTrue(image.has_renditions)
+            self.assertTrue(default_storage.exists(image.path.name))
+            self.assertTrue(self.client.login(
+                username=User.objects.last().username,
+                password='volontulo',
+            ))
+        offer = Offer.objects.annotate(
+            applications=Count('offerapplication'),
+        ).order_by('-applications').first()
+        self.assertEqual(offer.volunteers_count, offer.applications)
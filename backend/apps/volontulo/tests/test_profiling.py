@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: test_profiling
+"""
+
+from django.core.cache import cache
+from django.test import override_settings
+from django.test import TestCase
+from rest_framework import status
+
+from apps.volontulo.factories import OfferFactory
+from apps.volontulo.factories import UserProfileFactory
+from apps.volontulo.lib.profiling import get_fingerprint
+from apps.volontulo.lib.profiling import get_repeated
+from apps.volontulo.lib.profiling import get_stats
+
+
+class TestFingerprints(TestCase):
+
+    """Tests for SQL fingerprints."""
+
+    def test_fingerprint(self):
+        """Test that queries differing in parameters share fingerprint."""
+        self.assertEqual(
+            get_fingerprint(
+                "SELECT * FROM volontulo_offer  WHERE id = 12 AND "
+                "title = 'it''s' AND weight IN (1, 2, 3)"
+            ),
+            "SELECT * FROM volontulo_offer WHERE id = ? AND "
+            "title = ? AND weight IN (...)",
+        )
+
+    def test_repeated(self):
+        """Test that only repeated queries are returned, most common first."""
+        self.assertEqual(
+            get_repeated([
+                'SELECT 1 FROM a WHERE id = 1',
+                'SELECT 1 FROM b',
+                'SELECT 1 FROM a WHERE id = 2',
+                'SELECT 1 FROM a WHERE id = 3',
+                'SELECT 1 FROM c WHERE id = 1',
+                'SELECT 1 FROM c WHERE id = 2',
+            ]),
+            [
+                ('SELECT ? FROM a WHERE id = ?', 3),
+                ('SELECT ? FROM c WHERE id = ?', 2),
+            ],
+        )
+
+
+@override_settings(REQUEST_PROFILING=True)
+class TestRequestProfilingMiddleware(TestCase):
+
+    """Tests for request profiling middleware and its API view."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Set up data for all tests."""
+        cls.offer = OfferFactory(offer_status='published')
+        cls.administrator = UserProfileFactory(
+            is_administrator=True,
+            user__password='123admin',
+        ).user
+
+    def setUp(self):
+        """Set up each test."""
+        cache.clear()
+
+    def test_counters(self):
+        """Test that requests are counted per view."""
+        self.client.get('/api/offers/')
+        self.client.get('/api/offers/')
+        self.client.get('/api/offers/{}/'.format(self.offer.id))
+
+        stats = {view['view']: view for view in get_stats()}
+        self.assertEqual(stats['offer-list']['requests'], 2)
+        self.assertEqual(stats['offer-detail']['requests'], 1)
+        self.assertGreater(stats['offer-list']['queries'], 0)
+        self.assertGreater(stats['offer-list']['time'], 0)
+        self.assertGreaterEqual(
+            stats['offer-list']['time'],
+            stats['offer-list']['db_time'],
+        )
+
+    @override_settings(REQUEST_PROFILING=False)
+    def test_disabled(self):
+        """Test that nothing is recorded unless profiling is enabled."""
+        self.client.get('/api/offers/')
+
+        self.assertEqual(get_stats(), [])
+
+    @override_settings(REQUEST_PROFILING_SLOW_QUERIES=0)
+    def test_slow_request_logged(self):
+        """Test that request over thresholds is logged."""
+        with self.assertLogs('volontulo.profiling', 'WARNING') as logs:
+            self.client.get('/api/offers/')
+
+        self.assertIn('offer-list', logs.output[0])
+        self.assertEqual(get_stats()[0]['slow_requests'], 1)
+
+    def test_api_view(self):
+        """Test that administrator can read and reset counters."""
+        self.client.get('/api/offers/')
+        self.client.force_login(self.administrator)
+
+        response = self.client.get('/api/profiling/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        views = {view['view']: view for view in response.data}
+        self.assertEqual(views['offer-list']['requests'], 1)
+        self.assertIn('average_db_time', views['offer-list'])
+        response = self.client.delete('/api/profiling/')
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        # only the resetting request itself is left:
+        self.assertEqual(
+            [view['view'] for view in get_stats()],
+            ['profiling'],
+        )
+
+    def test_api_view_forbidden(self):
+        """Test that only administrators can read counters."""
+        self.client.force_login(UserProfileFactory().user)
+
+        response = self.client.get('/api/profiling/')
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: test_reconcile_volunteers_counts
+"""
+
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from apps.volontulo.factories import OfferFactory
+from apps.volontulo.factories import UserFactory
+from apps.volontulo.models import Offer
+from apps.volontulo.models import OfferApplication
+
+
+class TestReconcileVolunteersCountsCommand(TestCase):
+
+    """Tests for reconcile_volunteers_counts management command."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Set up data for all tests."""
+        users = UserFactory.create_batch(3)
+        cls.drifted_offer = OfferFactory()
+        cls.correct_offer = OfferFactory(volunteers=users[:1])
+        for user in users[:2]:
+            OfferApplication.objects.create(
+                offer=cls.drifted_offer,
+                user=user,
+            )
+        OfferApplication.objects.create(
+            offer=cls.drifted_offer,
+            user=users[2],
+            is_reserve=True,
+        )
+
+    @staticmethod
+    def _call_command(*args):
+        """Call command and return its output."""
+        stdout = StringIO()
+        call_command('reconcile_volunteers_counts', *args, stdout=stdout)
+        return stdout.getvalue()
+
+    def test_reconcile(self):
+        """Test that only drifted counters are fixed."""
+        output = self._call_command()
+
+        offer = Offer.objects.get(id=self.drifted_offer.id)
+        self.assertEqual(offer.volunteers_count, 2)
+        self.assertEqual(offer.reserve_volunteers_count, 1)
+        self.assertEqual(
+            Offer.objects.get(id=self.correct_offer.id).volunteers_count,
+            1,
+        )
+        self.assertIn('Fixed counters of 1 offers', output)
+        self.assertIn('Fixed counters of 0 offers', self._call_command())
+
+    def test_dry_run(self):
+        """Test that dry run only reports drifted counters."""
+        output = self._call_command('--dry-run')
+
+        self.assertEqual(
+            output,
+            'Offer {}: 0 -> 2 volunteers, 0 -> 1 reserve volunteers\n'.format(
+                self.drifted_offer.id
+            ),
+        )
+        self.assertEqual(
+            Offer.objects.get(id=self.drifted_offer.id).volunteers_count,
+            0,
+        )
@@ -0,0 +1,238 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: test_renditions
+"""
+
+import io
+import os
+import shutil
+import tempfile
+
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.template import Context
+from django.template import Template
+from django.test import override_settings
+from django.test import TestCase
+from PIL import Image
+from rest_framework.test import APIRequestFactory
+
+from apps.volontulo.factories import OfferFactory
+from apps.volontulo.lib.renditions import get_rendition_name
+from apps.volontulo.lib.renditions import get_rendition_names
+from apps.volontulo.lib.renditions import RENDITIONS
+from apps.volontulo.models import OfferImage
+from apps.volontulo.serializers import OfferSerializer
+
+
+def create_image_file(size=(1200, 900), image_format='PNG'):
+    """Return uploaded file holding image of given size."""
+    content = io.BytesIO()
+    Image.new('RGBA', size, (200, 30, 30, 128)).save(content, image_format)
+    return SimpleUploadedFile(
+        'image.{}'.format(image_format.lower()),
+        content.getvalue(),
+    )
+
+
+class RenditionsTestCase(TestCase):
+
+    """Base class for tests storing images in temporary media root."""
+
+    def setUp(self):
+        """Set up each test."""
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.offer = OfferFactory()
+        self.offer.images.all().delete()
+
+
+class TestCreateRenditions(RenditionsTestCase):
+
+    """Tests for renditions created on upload."""
+
+    def test_renditions_created(self):
+        """Test that all renditions are stored next to original."""
+        image = OfferImage.objects.create(
+            offer=self.offer,
+            path=create_image_file(),
+        )
+
+        self.assertTrue(image.has_renditions)
+        image.refresh_from_db()
+        self.assertTrue(image.has_renditions)
+        for name in get_rendition_names(image.path.name):
+            self.assertEqual(
+                os.path.dirname(name),
+                os.path.dirname(image.path.name),
+            )
+            self.assertTrue(default_storage.exists(name))
+
+    def test_renditions_sizes_and_formats(self):
+        """Test that cropped renditions have exact size."""
+        image = OfferImage.objects.create(
+            offer=self.offer,
+            path=create_image_file(),
+        )
+
+        for extension, image_format in (('webp', 'WEBP'), ('jpg', 'JPEG')):
+            for rendition, size in (
+                    ('thumb', (160, 160)),
+                    ('card', (640, 360)),
+                    ('hero', (853, 640)),
+            ):
+                rendition_name = get_rendition_name(
+                    image.path.name, rendition, extension,
+                )
+                with default_storage.open(rendition_name) as rendition_file:
+                    rendition_image = Image.open(rendition_file)
+                    self.assertEqual(rendition_image.format, image_format)
+                    self.assertEqual(rendition_image.size, size)
+
+    def test_small_image_not_upscaled(self):
+        """Test that fitted rendition is not bigger than original."""
+        image = OfferImage.objects.create(
+            offer=self.offer,
+            path=create_image_file((300, 200)),
+        )
+
+        rendition_name = get_rendition_name(image.path.name, 'hero', 'jpg')
+        with default_storage.open(rendition_name) as rendition_file:
+            self.assertEqual(Image.open(rendition_file).size, (300, 200))
+
+    def test_broken_image(self):
+        """Test that broken image is stored without renditions."""
+        with self.assertLogs('volontulo.signals', 'WARNING'):
+            image = OfferImage.objects.create(
+                offer=self.offer,
+                path=SimpleUploadedFile('image.png', b'not an image'),
+            )
+
+        image.refresh_from_db()
+        self.assertFalse(image.has_renditions)
+        self.assertTrue(default_storage.exists(image.path.name))
+        for name in get_rendition_names(image.path.name):
+            self.assertFalse(default_storage.exists(name))
+
+    def test_serializer_images(self):
+        """Test that serialized offer links all renditions."""
+        image = OfferImage.objects.create(
+            offer=self.offer,
+            path=create_image_file(),
+            is_main=True,
+        )
+        request = APIRequestFactory().get('/')
+
+        images = OfferSerializer(
+            self.offer,
+            context={'request': request},
+        ).data['images']
+
+        self.assertEqual(
+            list(images),
+            ['original'] + list(RENDITIONS),
+        )
+        self.assertEqual(
+            images['thumb']['webp'],
+            request.build_absolute_uri(default_storage.url(
+                get_rendition_name(image.path.name, 'thumb', 'webp'),
+            )),
+        )
+
+    def test_serializer_no_images(self):
+        """Test that offer without images has no renditions."""
+        request = APIRequestFactory().get('/')
+
+        self.assertIsNone(OfferSerializer(
+            self.offer,
+            context={'request': request},
+        ).data['images'])
+
+    def test_template_filter(self):
+        """Test that templates fall back to original without renditions."""
+        image = OfferImage.objects.create(
+            offer=self.offer,
+            path=create_image_file(),
+        )
+        template = Template(
+            "{% load main_image %}"
+            "{{ offer.images.all|main_image_rendition:'thumb' }}"
+        )
+
+        self.assertEqual(
+            template.render(Context({'offer': self.offer})),
+            get_rendition_name(image.path.name, 'thumb', 'jpg'),
+        )
+        OfferImage.objects.update(has_renditions=False)
+        self.assertEqual(
+            template.render(Context({'offer': self.offer})),
+            image.path.name,
+        )
+
+
+class TestCreateImageRenditionsCommand(RenditionsTestCase):
+
+    """Tests for create_image_renditions management command."""
+
+    def setUp(self):
+        """Set up each test."""
+        super(TestCreateImageRenditionsCommand, self).setUp()
+        self.image = OfferImage.objects.create(
+            offer=self.offer,
+            path=create_image_file(),
+        )
+        for name in get_rendition_names(self.image.path.name):
+            default_storage.delete(name)
+        OfferImage.objects.update(has_renditions=False)
+
+    @staticmethod
+    def _call_command(*args):
+        """Call command and return its output."""
+        stdout = io.StringIO()
+        stderr = io.StringIO()
+        call_command(
+            'create_image_renditions',
+            '--processes=2',
+            *args,
+            stdout=stdout,
+            stderr=stderr
+        )
+        return stdout.getvalue(), stderr.getvalue()
+
+    def test_missing_renditions_created(self):
+        """Test that renditions are created in worker processes."""
+        stdout, stderr = self._call_command()
+
+        self.assertIn('OfferImage: 1 created, 0 failed', stdout)
+        self.assertEqual(stderr, '')
+        self.image.refresh_from_db()
+        self.assertTrue(self.image.has_renditions)
+        for name in get_rendition_names(self.image.path.name):
+            self.assertTrue(default_storage.exists(name))
+
+    def test_existing_renditions_skipped(self):
+        """Test that images with renditions are skipped without --force."""
+        OfferImage.objects.update(has_renditions=True)
+
+        stdout, _ = self._call_command()
+
+        self.assertIn('OfferImage: 0 created, 0 failed', stdout)
+        stdout, _ = self._call_command('--force')
+        self.assertIn('OfferImage: 1 created, 0 failed', stdout)
+
+    def test_broken_image_reported(self):
+        """Test that broken image is reported and left without renditions."""
+        with default_storage.open(self.image.path.name, 'wb') as image_file:
+            image_file.write(b'not an image')
+
+        stdout, stderr = self._call_command()
+
+        self.assertIn('OfferImage: 0 created, 1 failed', stdout)
+        self.assertIn(self.image.path.name, stderr)
+        self.image.refresh_from_db()
+        self.assertFalse(self.image.has_renditions)
@@ -0,0 +1,96 @@
+"""
+.. module:: test_send_queued_emails
+"""
+
+import json
+from io import StringIO
+from unittest import mock
+
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase
+from django.test import override_settings
+from django.test.client import RequestFactory
+from django.utils import timezone
+
+from apps.volontulo.lib.email import send_mail
+from apps.volontulo.models import OutgoingEmail
+
+
+@override_settings(EMAIL_DELIVERY_MODE='queue')
+class SendQueuedEmailsTestCase(TestCase):
+
+    """Test for queued emails delivery."""
+
+    def setUp(self):
+        """Queue an email."""
+        send_mail(
+            RequestFactory().get('/'),
+            'contact_to_admin',
+            ['volunteer@example.com'],
+            {'name': 'Jan'},
+            send_copy_to_admin=False,
+        )
+
+    def test_email_queued(self):
+        """Testing if email is stored in outbox instead of being sent."""
+        self.assertEqual(len(mail.outbox), 0)
+        outgoing_email = OutgoingEmail.objects.get()
+        self.assertEqual(outgoing_email.status, 'pending')
+        self.assertEqual(outgoing_email.subject, 'Kontakt z administratorem')
+        self.assertEqual(
+            json.loads(outgoing_email.recipients),
+            ['volunteer@example.com'],
+        )
+
+    def test_command_sends_queued_emails(self):
+        """Testing if send_queued_emails command sends emails."""
+        out = StringIO()
+        call_command('send_queued_emails', stdout=out)
+
+        self.assertIn('Sent 1 emails, 0 failed', out.getvalue())
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['volunteer@example.com'])
+        self.assertEqual(len(mail.outbox[0].alternatives), 1)
+        self.assertEqual(OutgoingEmail.objects.get().status, 'sent')
+
+    @mock.patch(
+        'apps.volontulo.lib.email.EmailMultiAlternatives.send',
+        side_effect=OSError('Connection refused'),
+    )
+    def test_failed_email_is_retried_later(self, _):
+        """Testing if failed email is postponed with backoff."""
+        call_command('send_queued_emails', stdout=StringIO())
+
+        outgoing_email = OutgoingEmail.objects.get()
+        self.assertEqual(outgoing_email.status, 'pending')
+        self.assertEqual(outgoing_email.attempts, 1)
+        self.assertEqual(outgoing_email.last_error, 'Connection refused')
+        self.assertGreater(outgoing_email.next_attempt_at, timezone.now())
+
+    @mock.patch(
+        'apps.volontulo.lib.email.EmailMultiAlternatives.send',
+        side_effect=OSError('Connection refused'),
+    )
+    def test_failed_email_is_given_up(self, _):
+        """Testing if email is marked as failed after last attempt."""
+        call_command('send_queued_emails', max_attempts=1, stdout=StringIO())
+
+        self.assertEqual(OutgoingEmail.objects.get().status, 'failed')
+
+    @mock.patch(
+        'apps.volontulo.lib.email.EmailMultiAlternatives.send',
+        side_effect=SystemExit,
+    )
+    def test_claimed_email_is_postponed(self, _):
+        """Testing if email of crashed worker isn't sent again right away."""
+        with self.assertRaises(SystemExit):
+            call_command('send_queued_emails', stdout=StringIO())
+
+        outgoing_email = OutgoingEmail.objects.get()
+        self.assertEqual(outgoing_email.status, 'pending')
+        self.assertEqual(outgoing_email.attempts, 1)
+        self.assertGreater(outgoing_email.next_attempt_at, timezone.now())
+        out = StringIO()
+        call_command('send_queued_emails', stdout=out)
+        self.assertIn('Sent 0 emails, 0 failed', out.getvalue())
@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: test_update_offer_statuses
+"""
+
+import datetime
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.volontulo.factories import OfferFactory
+from apps.volontulo.models import Offer
+
+
+class TestUpdateOfferStatuses(TestCase):
+
+    """Tests for updating offer statuses from their dates."""
+
+    def setUp(self):
+        """Set up each test."""
+        self.now = timezone.now()
+        self.past = self.now - datetime.timedelta(days=1)
+        self.future = self.now + datetime.timedelta(days=1)
+
+    @staticmethod
+    def _create_offer(**kwargs):
+        """Create offer with open recruitment and no dates."""
+        defaults = {
+            'action_status': 'ongoing',
+            'recruitment_status': 'open',
+            'started_at': None,
+            'finished_at': None,
+            'recruitment_end_date': None,
+            'reserve_recruitment': False,
+            'reserve_recruitment_end_date': None,
+        }
+        defaults.update(kwargs)
+        return OfferFactory(**defaults)
+
+    @staticmethod
+    def _get_statuses(offer):
+        """Return current action and recruitment status of offer."""
+        offer = Offer.objects.get(id=offer.id)
+        return offer.action_status, offer.recruitment_status
+
+    def test_action_finished(self):
+        """Test that offers finished in the past are finished."""
+        offer = self._create_offer(finished_at=self.past)
+        future_offer = self._create_offer(
+            action_status='future',
+            started_at=self.past - datetime.timedelta(days=1),
+            finished_at=self.past,
+        )
+
+        updated = Offer.objects.update_statuses(self.now)
+
+        self.assertEqual(updated['finished'], 2)
+        self.assertEqual(self._get_statuses(offer), ('finished', 'closed'))
+        self.assertEqual(
+            self._get_statuses(future_offer),
+            ('finished', 'closed'),
+        )
+
+    def test_action_started(self):
+        """Test that future offers started in the past are ongoing."""
+        offer = self._create_offer(
+            action_status='future',
+            started_at=self.past,
+            finished_at=self.future,
+        )
+        not_started_offer = self._create_offer(
+            action_status='future',
+            started_at=self.future,
+        )
+
+        updated = Offer.objects.update_statuses(self.now)
+
+        self.assertEqual(updated['started'], 1)
+        self.assertEqual(self._get_statuses(offer), ('ongoing', 'open'))
+        self.assertEqual(
+            self._get_statuses(not_started_offer),
+            ('future', 'open'),
+        )
+
+    def test_recruitment_ended(self):
+        """Test that ended recruitment is closed or supplemental."""
+        closed_offer = self._create_offer(recruitment_end_date=self.past)
+        supplemental_offer = self._create_offer(
+            recruitment_end_date=self.past,
+            reserve_recruitment=True,
+            reserve_recruitment_end_date=self.future,
+        )
+        open_offer = self._create_offer(recruitment_end_date=self.future)
+
+        updated = Offer.objects.update_statuses(self.now)
+
+        self.assertEqual(updated['recruitment_ended'], 2)
+        self.assertEqual(self._get_statuses(closed_offer)[1], 'closed')
+        self.assertEqual(
+            self._get_statuses(supplemental_offer)[1],
+            'supplemental',
+        )
+        self.assertEqual(self._get_statuses(open_offer)[1], 'open')
+
+    def test_reserve_recruitment_ended(self):
+        """Test that ended reserve recruitment is closed."""
+        offer = self._create_offer(
+            recruitment_status='supplemental',
+            reserve_recruitment=True,
+            reserve_recruitment_end_date=self.past,
+        )
+
+        updated = Offer.objects.update_statuses(self.now)
+
+        self.assertEqual(updated['reserve_recruitment_ended'], 1)
+        self.assertEqual(self._get_statuses(offer)[1], 'closed')
+
+    def test_up_to_date_offers_untouched(self):
+        """Test that offers with current statuses aren't updated."""
+        offer = self._create_offer(
+            started_at=self.past,
+            finished_at=self.future,
+            recruitment_end_date=self.future,
+        )
+        updated_at = Offer.objects.get(id=offer.id).updated_at
+
+        updated = Offer.objects.update_statuses(self.now)
+
+        self.assertFalse(any(updated.values()))
+        self.assertEqual(Offer.objects.get(id=offer.id).updated_at, updated_at)
+
+    def test_command(self):
+        """Test update_offer_statuses management command."""
+        offer = self._create_offer(finished_at=self.past)
+        stdout = StringIO()
+
+        call_command('update_offer_statuses', stdout=stdout)
+
+        self.assertEqual(self._get_statuses(offer), ('finished', 'closed'))
+        self.assertIn('finished: 1', stdout.getvalue())
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: test_uploads
+"""
+
+import base64
+import os
+
+from django.test import TestCase
+
+from apps.volontulo.lib.uploads import CHUNK_SIZE
+from apps.volontulo.lib.uploads import get_base64_size
+from apps.volontulo.lib.uploads import is_base64
+from apps.volontulo.lib.uploads import open_base64
+from apps.volontulo.lib.uploads import strip_whitespace
+
+
+class TestBase64Uploads(TestCase):
+
+    """Tests for streamed decoding of base64 uploads."""
+
+    def test_is_base64(self):
+        """Test that only padded base64 without whitespace is accepted."""
+        self.assertTrue(is_base64(''))
+        self.assertTrue(is_base64('YWJj'))
+        self.assertTrue(is_base64('YQ=='))
+        self.assertFalse(is_base64('YWJ'))
+        self.assertFalse(is_base64('YW Jj'))
+        self.assertFalse(is_base64('Y=Jj'))
+        self.assertFalse(is_base64('YWJj!==='))
+
+    def test_strip_whitespace(self):
+        """Test that line breaks and spaces are removed from content."""
+        content = 'YWJj'
+        self.assertIs(strip_whitespace(content), content)
+        self.assertEqual(strip_whitespace('YW\r\nJj\n YQ==\n'), 'YWJjYQ==')
+
+    def test_size(self):
+        """Test that size is known without decoding."""
+        for size in (0, 1, 2, 3, 4, 100):
+            self.assertEqual(
+                get_base64_size(base64.b64encode(b'x' * size).decode()),
+                size,
+            )
+
+    def test_decoded_in_chunks(self):
+        """Test that content is decoded chunk by chunk."""
+        data = os.urandom(CHUNK_SIZE * 2 + 100)
+
+        base64_file = open_base64(base64.b64encode(data).decode(), 'a.png')
+        chunks = list(base64_file.chunks(CHUNK_SIZE))
+
+        self.assertEqual(base64_file.size, len(data))
+        self.assertEqual([len(chunk) for chunk in chunks], [
+            CHUNK_SIZE, CHUNK_SIZE, 100,
+        ])
+        self.assertEqual(b''.join(chunks), data)
+
+    def test_small_reads(self):
+        """Test that reads smaller than base64 quantum lose nothing."""
+        data = os.urandom(10)
+        base64_file = open_base64(base64.b64encode(data).decode())
+
+        self.assertEqual(
+            b''.join(iter(lambda: base64_file.read(1), b'')),
+            data,
+        )
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: test_cache
+"""
+
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.volontulo.models import Offer
+from apps.volontulo.tests.common import run_on_commit_callbacks
+from apps.volontulo.tests.views.offers.commons import TestOffersCommons
+
+
+class TestOffersListCacheAPIView(TestOffersCommons, APITestCase):
+
+    """Tests for REST API's offers list cache for anonymous users."""
+
+    def setUp(self):
+        """Set up each test."""
+        cache.clear()
+
+    def test_anonymous_list_cached(self):
+        """Test that cached list doesn't touch database."""
+        response = self.client.get('/api/offers/')
+
+        with self.assertNumQueries(0):
+            cached_response = self.client.get('/api/offers/')
+        self.assertEqual(cached_response.status_code, status.HTTP_200_OK)
+        self.assertEqual(cached_response.data, response.data)
+        self.assertEqual(cached_response['ETag'], response['ETag'])
+
+    def test_anonymous_list_cached_not_modified(self):
+        """Test that cached list answers conditional GET."""
+        etag = self.client.get('/api/offers/')['ETag']
+
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/offers/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_query_string_in_cache_key(self):
+        """Test that filtered lists are cached separately."""
+        self.client.get('/api/offers/')
+
+        response = self.client.get('/api/offers/?location=nowhere')
+
+        self.assertEqual(len(response.data), 0)
+
+    def test_invalidated_on_offer_change(self):
+        """Test that changing offer invalidates cache."""
+        self.client.get('/api/offers/')
+        with run_on_commit_callbacks():
+            self.inactive_offer.publish()
+
+        response = self.client.get('/api/offers/')
+
+        self.assertEqual(len(response.data), 2)
+
+    def test_invalidated_on_commit(self):
+        """Test that cache is invalidated once changes are committed."""
+        self.client.get('/api/offers/')
+        with run_on_commit_callbacks():
+            self.inactive_offer.publish()
+            stale_response = self.client.get('/api/offers/')
+
+        response = self.client.get('/api/offers/')
+
+        self.assertEqual(len(stale_response.data), 1)
+        self.assertEqual(len(response.data), 2)
+
+    def test_invalidated_on_organization_change(self):
+        """Test that changing organization invalidates cache."""
+        self.client.get('/api/offers/')
+        self.organization.name = 'Changed name'
+        with run_on_commit_callbacks():
+            self.organization.save()
+
+        response = self.client.get('/api/offers/')
+
+        self.assertEqual(
+            response.data[0]['organization']['name'],
+            'Changed name',
+        )
+
+    def test_invalidated_on_reorder(self):
+        """Test that bulk reorder invalidates cache."""
+        self.inactive_offer.publish()
+        self.client.get('/api/offers/')
+        with run_on_commit_callbacks():
+            Offer.objects.reorder([
+                self.active_offer.id,
+                self.inactive_offer.id,
+            ])
+
+        response = self.client.get('/api/offers/')
+
+        self.assertEqual(response.data[0]['id'], self.active_offer.id)
+
+    def test_authenticated_list_not_cached(self):
+        """Test that lists of logged in users aren't served from cache."""
+        self.client.get('/api/offers/')
+        self.client.login(username='admin@example.com', password='123admin')
+
+        response = self.client.get('/api/offers/')
+
+        self.assertEqual(len(response.data), 2)
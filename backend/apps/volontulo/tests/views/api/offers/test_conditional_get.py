@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: test_conditional_get
+"""
+
+import calendar
+from datetime import datetime
+from datetime import timedelta
+
+from django.utils import timezone
+from django.utils.http import http_date
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.volontulo.models import Offer
+from apps.volontulo.models import Organization
+from apps.volontulo.tests.common import run_on_commit_callbacks
+from apps.volontulo.tests.views.offers.commons import TestOffersCommons
+
+UPDATED_AT = datetime(2018, 3, 1, 12, 30, 15, tzinfo=timezone.utc)
+UPDATED_TIMESTAMP = calendar.timegm(UPDATED_AT.utctimetuple())
+
+
+class TestOffersConditionalGetAPIView(TestOffersCommons, APITestCase):
+
+    """Tests for REST API's offers conditional GET requests."""
+
+    def _assert_not_modified_until_change(self, url, change):
+        """Check that url answers 304 until change() is applied."""
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('Last-Modified', response)
+        etag = response['ETag']
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+
+        with run_on_commit_callbacks():
+            change()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def _change_offer(self):
+        """Change active offer."""
+        self.active_offer.title = 'Changed title'
+        self.active_offer.save()
+
+    def _change_organization(self):
+        """Change organization nested in offers."""
+        self.organization.name = 'Changed name'
+        self.organization.save()
+
+    def test_offer_list(self):
+        """Test conditional GET of offers list."""
+        self._assert_not_modified_until_change(
+            '/api/offers/',
+            self._change_offer,
+        )
+
+    def test_offer_list_organization_changed(self):
+        """Test that changing organization changes offers list ETag."""
+        self._assert_not_modified_until_change(
+            '/api/offers/',
+            self._change_organization,
+        )
+
+    def test_offer_list_image_removed(self):
+        """Test that removing offer's image changes offers list ETag."""
+        self._assert_not_modified_until_change(
+            '/api/offers/',
+            lambda: self.active_offer.images.all().delete(),
+        )
+
+    def test_offer_read(self):
+        """Test conditional GET of single offer."""
+        self._assert_not_modified_until_change(
+            '/api/offers/{}/'.format(self.active_offer.id),
+            self._change_offer,
+        )
+
+    def test_organization_offers(self):
+        """Test conditional GET of organization's offers."""
+        self._assert_not_modified_until_change(
+            '/api/organizations/{}/offers/'.format(self.organization.id),
+            self._change_offer,
+        )
+
+    def test_organization_read(self):
+        """Test conditional GET of single organization."""
+        self._assert_not_modified_until_change(
+            '/api/organizations/{}/'.format(self.organization.id),
+            self._change_organization,
+        )
+
+    def _set_updated_at(self, updated_at):
+        """Set modification time of active offer and its organization."""
+        Offer.objects.filter(id=self.active_offer.id).update(
+            updated_at=updated_at,
+        )
+        Organization.objects.filter(id=self.organization.id).update(
+            updated_at=updated_at,
+        )
+
+    def test_modified_within_second(self):
+        """Test that change within second of Last-Modified isn't missed."""
+        url = '/api/offers/{}/'.format(self.active_offer.id)
+        self._set_updated_at(UPDATED_AT)
+        last_modified = self.client.get(url)['Last-Modified']
+        self.assertEqual(last_modified, http_date(UPDATED_TIMESTAMP))
+
+        self._set_updated_at(UPDATED_AT + timedelta(microseconds=300000))
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Last-Modified'], last_modified)
+        response = self.client.get(
+            url,
+            HTTP_IF_MODIFIED_SINCE=http_date(UPDATED_TIMESTAMP + 1),
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_etag_precedence(self):
+        """Test that ETag takes precedence over If-Modified-Since."""
+        url = '/api/offers/{}/'.format(self.active_offer.id)
+        etag = self.client.get(url)['ETag']
+        self._change_offer()
+
+        response = self.client.get(
+            url,
+            HTTP_IF_NONE_MATCH=etag,
+            HTTP_IF_MODIFIED_SINCE=http_date(UPDATED_TIMESTAMP * 2),
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: test_image
+"""
+
+import base64
+import io
+import json
+import shutil
+import tempfile
+
+from django.core.files.storage import default_storage
+from django.test import override_settings
+from PIL import Image
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.volontulo.models import OfferImage
+from apps.volontulo.tests.views.offers.commons import TestOffersCommons
+
+
+def create_image_content():
+    """Return content of small PNG image."""
+    content = io.BytesIO()
+    Image.new('RGB', (40, 30), (10, 120, 200)).save(content, 'PNG')
+    return content.getvalue()
+
+
+class TestOffersImageAPIView(TestOffersCommons, APITestCase):
+
+    """Tests for uploading offer images with REST API."""
+
+    def setUp(self):
+        """Set up each test."""
+        super(TestOffersImageAPIView, self).setUp()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.client.login(
+            username='cls.organization@example.com',
+            password='123org'
+        )
+        self.image_content = create_image_content()
+
+    def _put_base64(self, content):
+        """Update offer with image given as base64 content."""
+        return self.client.put(
+            '/api/offers/{}/'.format(self.active_offer.id),
+            json.dumps({
+                'organization': {'id': self.organization.id},
+                'benefits': 'offer benefits',
+                'description': 'offer description',
+                'location': 'offer location',
+                'timeCommitment': 'offer time commitment',
+                'title': 'offer title',
+                'image': {'filename': 'image.png', 'content': content},
+            }),
+            content_type='application/json',
+        )
+
+    def _post_multipart(self, content):
+        """Upload offer's image as multipart form."""
+        upload = io.BytesIO(content)
+        upload.name = 'image.png'
+        return self.client.post(
+            '/api/offers/{}/image/'.format(self.active_offer.id),
+            {'image': upload},
+            format='multipart',
+        )
+
+    def _assert_image_stored(self):
+        """Check that uploaded image replaced offer's images."""
+        image = OfferImage.objects.get(offer=self.active_offer)
+        self.assertTrue(image.is_main)
+        with default_storage.open(image.path.name) as image_file:
+            self.assertEqual(image_file.read(), self.image_content)
+
+    def test_base64_upload(self):
+        """Test that base64 image is decoded into storage."""
+        response = self._put_base64(
+            base64.b64encode(self.image_content).decode()
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self._assert_image_stored()
+
+    def test_base64_line_wrapped(self):
+        """Test that line wrapped base64 image is accepted."""
+        response = self._put_base64(
+            base64.encodebytes(self.image_content).decode()
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self._assert_image_stored()
+
+    def test_base64_invalid(self):
+        """Test that content which isn't base64 is rejected."""
+        response = self._put_base64('not base64!')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('image', response.data)
+
+    @override_settings(OFFER_IMAGE_MAX_SIZE=100)
+    def test_base64_too_big(self):
+        """Test that too big image is rejected before decoding."""
+        response = self._put_base64(
+            base64.b64encode(self.image_content).decode()
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('image', response.data)
+        self.assertEqual(
+            OfferImage.objects.filter(offer=self.active_offer).count(),
+            1,
+        )
+
+    def test_multipart_upload(self):
+        """Test that image can be uploaded as multipart form."""
+        response = self._post_multipart(self.image_content)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNotNone(response.data['image'])
+        self._assert_image_stored()
+
+    def test_multipart_not_image(self):
+        """Test that uploaded file has to be an image."""
+        response = self._post_multipart(b'not an image')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(OFFER_IMAGE_MAX_SIZE=100)
+    def test_multipart_too_big(self):
+        """Test that too big multipart image is rejected."""
+        response = self._post_multipart(self.image_content)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_multipart_other_organization(self):
+        """Test that volunteer can't upload offer's image."""
+        self.client.login(
+            username='volunteer@example.com',
+            password='123volunteer'
+        )
+
+        response = self._post_multipart(self.image_content)
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
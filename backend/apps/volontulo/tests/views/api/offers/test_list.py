@@ -4,9 +4,13 @@
 .. module:: test_list
 """
 
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from rest_framework import status
 from rest_framework.test import APITestCase
 
+from apps.volontulo.factories import OfferFactory
 from apps.volontulo.tests.views.offers.commons import TestOffersCommons
 from apps.volontulo.tests import common
 
@@ -95,6 +99,11 @@ class TestAnonymousUserOffersListAPIView(_TestOffersListAPIView):
 
     """Tests for REST API's list offers view for anonymous user."""
 
+    def setUp(self):
+        """Set up each test."""
+        # responses cached by other tests outlive their rolled back data:
+        cache.clear()
+
     def test_offer_list_length(self):
         """Test offers list length for anonymous user.
 
@@ -105,3 +114,21 @@ class TestAnonymousUserOffersListAPIView(_TestOffersListAPIView):
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data), 1)
+
+    def test_offer_list_queries_count(self):
+        """Test that number of queries doesn't depend on number of offers."""
+        with CaptureQueriesContext(connection) as context:
+            self.client.get('/api/offers/')
+        queries_count = len(context.captured_queries)
+
+        OfferFactory.create_batch(
+            5,
+            organization=self.organization,
+            offer_status='published',
+        )
+        cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get('/api/offers/')
+
+        self.assertEqual(len(response.data), 6)
+        self.assertEqual(len(context.captured_queries), queries_count)
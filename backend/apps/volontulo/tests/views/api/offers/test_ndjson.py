@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: test_ndjson
+"""
+
+import json
+from unittest import mock
+
+from django.db import DatabaseError
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.volontulo.factories import OrganizationFactory
+from apps.volontulo.models import Offer
+from apps.volontulo.tests.views.offers.commons import TestOffersCommons
+from apps.volontulo.views.api import OfferViewSet
+
+
+def read_ndjson(response):
+    """Return list of objects from streamed NDJSON response."""
+    return [
+        json.loads(line.decode('utf-8'))
+        for line in b''.join(response.streaming_content).splitlines()
+    ]
+
+
+class TestOffersImportAPIView(TestOffersCommons, APITestCase):
+
+    """Tests for REST API's NDJSON offers import."""
+
+    def setUp(self):
+        """Set up each test."""
+        super(TestOffersImportAPIView, self).setUp()
+        self.client.login(
+            username='cls.organization@example.com',
+            password='123org'
+        )
+
+    def _get_row(self, title, organization=None):
+        """Return JSON line of offer to import."""
+        return json.dumps({
+            'benefits': 'offer benefits',
+            'description': 'offer description',
+            'location': 'Gdańsk',
+            'organization': {'id': (organization or self.organization).id},
+            'timeCommitment': 'offer time commitment',
+            'title': title,
+        })
+
+    def _import(self, lines):
+        """Post NDJSON lines and return parsed results."""
+        response = self.client.post(
+            '/api/offers/import/',
+            '\n'.join(lines).encode('utf-8'),
+            content_type='application/x-ndjson',
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        return read_ndjson(response)
+
+    def test_import(self):
+        """Test that valid rows are created and invalid reported."""
+        results = self._import([
+            self._get_row('first'),
+            '',
+            '{not json',
+            json.dumps({'title': 'incomplete'}),
+            self._get_row('other', OrganizationFactory()),
+            json.dumps([1, 2]),
+            self._get_row('second'),
+        ])
+
+        self.assertEqual(
+            [(result['line'], result['status']) for result in results],
+            [
+                (1, 'created'),
+                (3, 'invalid'),
+                (4, 'invalid'),
+                (5, 'invalid'),
+                (6, 'invalid'),
+                (7, 'created'),
+            ],
+        )
+        self.assertIn('timeCommitment', results[2]['errors'])
+        self.assertIn('organization', results[3]['errors'])
+        offers = Offer.objects.filter(title__in=('first', 'second'))
+        self.assertEqual(offers.count(), 2)
+        self.assertTrue(all(
+            offer.organization_id == self.organization.id and
+            offer.latitude is not None
+            for offer in offers
+        ))
+
+    def test_import_in_batches(self):
+        """Test that rows spanning several batches are all imported."""
+        lines = [self._get_row('offer {}'.format(i)) for i in range(250)]
+
+        results = self._import(lines)
+
+        self.assertEqual(len(results), 250)
+        self.assertEqual(Offer.objects.filter(
+            title__startswith='offer ',
+            organization=self.organization,
+        ).exclude(title='offer title').count(), 250)
+
+    def test_failed_batch(self):
+        """Test that rows of a batch failing to insert are reported."""
+        bulk_create = Offer.objects.bulk_create
+
+        def fail_first_batch(offers):
+            """Raise for the first batch, insert others."""
+            if offers[0].title == 'first':
+                raise DatabaseError
+            return bulk_create(offers)
+
+        with mock.patch.object(OfferViewSet, 'import_batch_size', 2), \
+                mock.patch.object(Offer.objects, 'bulk_create',
+                                  side_effect=fail_first_batch):
+            results = self._import([
+                self._get_row('first'),
+                json.dumps({'title': 'incomplete'}),
+                self._get_row('second'),
+            ])
+
+        self.assertEqual(
+            [(result['line'], result['status']) for result in results],
+            [(1, 'error'), (2, 'invalid'), (3, 'created')],
+        )
+        self.assertIn('nonFieldErrors', results[0]['errors'])
+        self.assertEqual(
+            list(Offer.objects.filter(
+                title__in=('first', 'second'),
+            ).values_list('title', flat=True)),
+            ['second'],
+        )
+
+    def test_image_rejected(self):
+        """Test that rows with images are rejected."""
+        row = json.loads(self._get_row('with image'))
+        row['image'] = {'filename': 'a.png', 'content': ''}
+
+        results = self._import([json.dumps(row)])
+
+        self.assertEqual(results[0]['status'], 'invalid')
+        self.assertIn('image', results[0]['errors'])
+
+    def test_anonymous(self):
+        """Test that anonymous user can't import offers."""
+        self.client.logout()
+
+        response = self.client.post(
+            '/api/offers/import/',
+            self._get_row('anonymous'),
+            content_type='application/x-ndjson',
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertFalse(Offer.objects.filter(title='anonymous').exists())
+
+
+class TestOffersExportAPIView(TestOffersCommons, APITestCase):
+
+    """Tests for REST API's NDJSON offers export."""
+
+    def test_export(self):
+        """Test that visible offers are exported one per line."""
+        response = self.client.get('/api/offers/export/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        offers = read_ndjson(response)
+        self.assertEqual(
+            [offer['id'] for offer in offers],
+            [self.active_offer.id],
+        )
+        self.assertIn('timeCommitment', offers[0])
+        self.assertIsNotNone(offers[0]['image'])
+
+    def test_export_organization_offers(self):
+        """Test that organization members export unpublished offers too."""
+        self.client.login(
+            username='cls.organization@example.com',
+            password='123org'
+        )
+
+        offers = read_ndjson(self.client.get('/api/offers/export/'))
+
+        self.assertEqual(
+            sorted(offer['id'] for offer in offers),
+            sorted((self.active_offer.id, self.inactive_offer.id)),
+        )
+
+    def test_export_queries(self):
+        """Test that images are prefetched for batches of offers."""
+        self.client.login(
+            username='cls.organization@example.com',
+            password='123org'
+        )
+        response = self.client.get('/api/offers/export/')
+
+        # offers with organizations and their images:
+        with self.assertNumQueries(2):
+            read_ndjson(response)
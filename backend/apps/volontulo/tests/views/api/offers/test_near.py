@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: test_near
+"""
+
+from unittest import mock
+
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.volontulo.factories import OfferFactory
+from apps.volontulo.factories import OrganizationFactory
+from apps.volontulo.filters import OfferNearFilter
+
+GDANSK = '54.3520,18.6466'
+
+
+class TestOffersNearAPIView(APITestCase):
+
+    """Tests for REST API's offers lookup by distance."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Set up data for all tests."""
+        organization = OrganizationFactory()
+        cls.offers = {
+            location: OfferFactory(
+                organization=organization,
+                offer_status='published',
+                location=location,
+            )
+            for location in ('Gdańsk', 'Sopot', 'Gdynia', 'Kraków')
+        }
+        cls.unknown_location_offer = OfferFactory(
+            organization=organization,
+            offer_status='published',
+            location='Nieznane miejsce',
+        )
+
+    def setUp(self):
+        """Set up each test."""
+        cache.clear()
+
+    def _get_locations(self, url):
+        """Return locations of found offers."""
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [offer['location'] for offer in response.data]
+
+    def test_geocoded_on_save(self):
+        """Test that offer's coordinates follow its location."""
+        offer = self.offers['Kraków']
+        self.assertAlmostEqual(offer.latitude, 50.0647)
+        self.assertAlmostEqual(offer.longitude, 19.9450)
+        self.assertIsNone(self.unknown_location_offer.latitude)
+
+        offer.location = 'gdansk'
+        offer.save()
+
+        self.assertAlmostEqual(offer.latitude, 54.3520)
+
+    def test_radius(self):
+        """Test that offers within radius are ordered by distance."""
+        self.assertEqual(
+            self._get_locations(
+                '/api/offers/?near={}&radius=25'.format(GDANSK)
+            ),
+            ['Gdańsk', 'Sopot', 'Gdynia'],
+        )
+
+    def test_small_radius(self):
+        """Test that offers outside radius are skipped."""
+        self.assertEqual(
+            self._get_locations(
+                '/api/offers/?near={}&radius=5'.format(GDANSK)
+            ),
+            ['Gdańsk'],
+        )
+
+    def test_huge_radius(self):
+        """Test that radius is limited to max_radius."""
+        with mock.patch.object(
+            OfferNearFilter,
+            'filter_radius',
+            autospec=True,
+            side_effect=OfferNearFilter.filter_radius,
+        ) as filter_radius:
+            locations = self._get_locations(
+                '/api/offers/?near={}&radius=1e10'.format(GDANSK)
+            )
+
+        self.assertEqual(locations, ['Gdańsk', 'Sopot', 'Gdynia', 'Kraków'])
+        self.assertEqual(
+            filter_radius.call_args[0][-1],
+            OfferNearFilter.max_radius,
+        )
+
+    def test_nearest(self):
+        """Test that nearest offers are returned."""
+        self.assertEqual(
+            self._get_locations(
+                '/api/offers/?near={}&nearest=2'.format(GDANSK)
+            ),
+            ['Gdańsk', 'Sopot'],
+        )
+        self.assertEqual(
+            self._get_locations('/api/offers/?near={}'.format(GDANSK)),
+            ['Gdańsk', 'Sopot', 'Gdynia', 'Kraków'],
+        )
+
+    def test_nearest_radius_limited(self):
+        """Test that circle of nearest offers grows up to max_radius."""
+        with mock.patch.object(
+            OfferNearFilter,
+            'filter_radius',
+            autospec=True,
+            side_effect=OfferNearFilter.filter_radius,
+        ) as filter_radius:
+            locations = self._get_locations(
+                '/api/offers/?near={}&nearest=100'.format(GDANSK)
+            )
+
+        self.assertEqual(locations, ['Gdańsk', 'Sopot', 'Gdynia', 'Kraków'])
+        radiuses = [call[0][-1] for call in filter_radius.call_args_list]
+        self.assertEqual(max(radiuses), OfferNearFilter.max_radius)
+        self.assertEqual(radiuses[-1], OfferNearFilter.max_radius)
+
+    def test_paginated(self):
+        """Test that offers near point can be paginated."""
+        response = self.client.get(
+            '/api/offers/?near={}&radius=25&page_size=2'.format(GDANSK)
+        )
+        next_page = self.client.get(response.data['next'])
+
+        self.assertEqual(
+            [offer['location'] for offer in response.data['results']] +
+            [offer['location'] for offer in next_page.data['results']],
+            ['Gdańsk', 'Sopot', 'Gdynia'],
+        )
+
+    def test_invalid_params(self):
+        """Test that invalid params are rejected."""
+        for query in (
+                'near=54.35',
+                'near=abc,18.64',
+                'near=154.35,18.64',
+                'near={}&radius=-5'.format(GDANSK),
+                'near={}&nearest=x'.format(GDANSK),
+        ):
+            response = self.client.get('/api/offers/?{}'.format(query))
+
+            self.assertEqual(
+                response.status_code,
+                status.HTTP_400_BAD_REQUEST,
+            )
@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: test_pagination
+"""
+
+import base64
+import json
+
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.volontulo.factories import OfferFactory
+from apps.volontulo.factories import OrganizationFactory
+
+
+class TestOffersPaginationAPIView(APITestCase):
+
+    """Tests for REST API's offers keyset pagination."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Set up data for all tests."""
+        cls.organization = OrganizationFactory()
+        cls.offers = [
+            OfferFactory(
+                organization=cls.organization,
+                offer_status='published',
+                weight=weight,
+            )
+            for weight in (3, 1, 1, 2, 5)
+        ]
+
+    def setUp(self):
+        """Set up each test."""
+        cache.clear()
+
+    def _fetch_all_pages(self, url):
+        """Follow next links and return ids of all fetched offers."""
+        ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            ids.extend(offer['id'] for offer in response.data['results'])
+            url = response.data['next']
+        return ids
+
+    def test_not_paginated_by_default(self):
+        """Test that list is returned without pagination params."""
+        response = self.client.get('/api/offers/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 5)
+
+    def test_pages_follow_weight_order(self):
+        """Test that pages follow (weight, id) ordering."""
+        ids = self._fetch_all_pages('/api/offers/?page_size=2')
+
+        self.assertEqual(ids, [
+            offer.id for offer in sorted(
+                self.offers,
+                key=lambda offer: (offer.weight, offer.id),
+            )
+        ])
+
+    def test_previous_link(self):
+        """Test that previous link returns preceding page."""
+        first_page = self.client.get('/api/offers/?page_size=2')
+        second_page = self.client.get(first_page.data['next'])
+        response = self.client.get(second_page.data['previous'])
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'], first_page.data['results'])
+        self.assertIsNone(response.data['previous'])
+
+    def test_pages_stable_while_publishing(self):
+        """Test that publishing offer doesn't shift next page boundary."""
+        response = self.client.get('/api/offers/?page_size=2')
+        ids = [offer['id'] for offer in response.data['results']]
+
+        OfferFactory(
+            organization=self.organization,
+            offer_status='unpublished',
+        ).publish()
+        ids.extend(self._fetch_all_pages(response.data['next']))
+
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertEqual(set(ids), {offer.id for offer in self.offers})
+
+    def test_null_weights(self):
+        """Test that offers without weight are paginated last."""
+        unweighted = [
+            OfferFactory(
+                organization=self.organization,
+                offer_status='published',
+                weight=None,
+            )
+            for _ in range(2)
+        ]
+
+        ids = self._fetch_all_pages('/api/offers/?page_size=1')
+
+        self.assertEqual(ids, [
+            offer.id for offer in sorted(
+                self.offers,
+                key=lambda offer: (offer.weight, offer.id),
+            )
+        ] + sorted(offer.id for offer in unweighted))
+
+    def test_null_weights_previous_link(self):
+        """Test that previous pages are returned across NULL weights."""
+        OfferFactory(
+            organization=self.organization,
+            offer_status='published',
+            weight=None,
+        )
+        url = '/api/offers/?page_size=2'
+        pages = []
+        while url:
+            response = self.client.get(url)
+            pages.append(response.data['results'])
+            url = response.data['next']
+
+        previous = self.client.get(response.data['previous'])
+
+        self.assertEqual(previous.status_code, status.HTTP_200_OK)
+        self.assertEqual(previous.data['results'], pages[-2])
+
+    def test_invalid_cursor(self):
+        """Test that invalid cursor returns 404."""
+        response = self.client.get('/api/offers/?cursor=invalid')
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_crafted_cursor(self):
+        """Test that cursor with values of wrong types returns 404."""
+        for cursor in (
+                {'k': 'abc', 'p': [1, 1]},
+                {'k': [1], 'p': [1, 1]},
+                {'k': 1, 'p': {'weight': 1}},
+                {'k': 1, 'p': [[1], 1]},
+                {'k': 0, 'p': ['x', 'y']},
+                {'k': 2 ** 64, 'p': [1, 1]},
+        ):
+            response = self.client.get('/api/offers/', {
+                'cursor': base64.urlsafe_b64encode(
+                    json.dumps(cursor).encode('utf-8'),
+                ).decode('ascii'),
+            })
+
+            self.assertEqual(
+                response.status_code,
+                status.HTTP_404_NOT_FOUND,
+                cursor,
+            )
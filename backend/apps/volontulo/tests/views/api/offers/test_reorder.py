@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: test_reorder
+"""
+
+from unittest import mock
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.volontulo.factories import OfferFactory
+from apps.volontulo.models import Offer
+from apps.volontulo.serializers import OffersReorderSerializer
+from apps.volontulo.tests.views.offers.commons import TestOffersCommons
+
+
+class TestOffersReorderAPIView(TestOffersCommons, APITestCase):
+
+    """Tests for REST API's reorder offers view."""
+
+    def _reorder(self, offers):
+        """Post ordered list of offers ids."""
+        return self.client.post(
+            '/api/offers/reorder/',
+            {'offers': offers},
+            format='json',
+        )
+
+    def test_reorder_for_admin(self):
+        """Test that admin can reorder offers with a single UPDATE."""
+        self.client.login(username='admin@example.com', password='123admin')
+
+        with CaptureQueriesContext(connection) as context:
+            response = self._reorder(
+                [self.active_offer.id, self.inactive_offer.id]
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len([
+            query for query in context.captured_queries
+            if query['sql'].startswith('UPDATE')
+        ]), 1)
+        self.assertEqual(
+            list(Offer.objects.order_by('weight').values_list(
+                'id',
+                'weight',
+            )),
+            [(self.active_offer.id, 0), (self.inactive_offer.id, 1)],
+        )
+
+    def test_reorder_unknown_offer(self):
+        """Test that reordering unknown offers is rejected."""
+        self.client.login(username='admin@example.com', password='123admin')
+
+        response = self._reorder([self.active_offer.id, 666999])
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_reorder_some_offers(self):
+        """Test that list missing some offers is rejected."""
+        self.client.login(username='admin@example.com', password='123admin')
+
+        response = self._reorder([self.inactive_offer.id])
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            set(Offer.objects.values_list('weight', flat=True)),
+            {self.active_offer.weight, self.inactive_offer.weight},
+        )
+
+    def test_reorder_offer_created_meanwhile(self):
+        """Test that offer created after validation rolls reorder back."""
+        self.client.login(username='admin@example.com', password='123admin')
+        offers = [self.active_offer.id, self.inactive_offer.id]
+        weights = list(Offer.objects.order_by('id').values_list(
+            'weight',
+            flat=True,
+        ))
+
+        def create_offer(value):
+            """Create offer once list is validated."""
+            OfferFactory(organization=self.organization)
+            return value
+
+        with mock.patch.object(
+            OffersReorderSerializer,
+            'validate_offers',
+            side_effect=create_offer,
+        ):
+            response = self._reorder(offers)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.data['offers'],
+            [OffersReorderSerializer.incomplete_message],
+        )
+        self.assertEqual(Offer.objects.count(), 2)
+        self.assertEqual(
+            list(Offer.objects.order_by('id').values_list(
+                'weight',
+                flat=True,
+            )),
+            weights,
+        )
+
+    def test_reorder_duplicated_offer(self):
+        """Test that list with duplicated offers is rejected."""
+        self.client.login(username='admin@example.com', password='123admin')
+
+        response = self._reorder([self.active_offer.id, self.active_offer.id])
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_reorder_for_organization(self):
+        """Test that user with organization can't reorder offers."""
+        self.client.login(
+            username='cls.organization@example.com',
+            password='123org'
+        )
+
+        response = self._reorder([self.active_offer.id])
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_reorder_for_anonymous(self):
+        """Test that anonymous user can't reorder offers."""
+        response = self._reorder([self.active_offer.id])
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
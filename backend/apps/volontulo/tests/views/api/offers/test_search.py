@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: test_search
+"""
+
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.volontulo.factories import OfferFactory
+from apps.volontulo.factories import OrganizationFactory
+from apps.volontulo.pagination import OfferPagination
+
+
+class TestOffersSearchAPIView(APITestCase):
+
+    """Tests for REST API's offers search."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Set up data for all tests."""
+        cls.organization = OrganizationFactory(name='Schronisko Azyl')
+        cls.garden_offer = OfferFactory(
+            organization=cls.organization,
+            offer_status='published',
+            title='Prace w ogrodzie',
+            location='Gdańsk',
+            weight=2,
+        )
+        cls.dogs_offer = OfferFactory(
+            organization=cls.organization,
+            offer_status='published',
+            title='Spacery z psami',
+            benefits='Dużo ruchu na świeżym powietrzu',
+            location='Gdynia',
+            weight=1,
+        )
+        cls.unpublished_offer = OfferFactory(
+            organization=cls.organization,
+            offer_status='unpublished',
+            title='Spacery po lesie',
+        )
+
+    def setUp(self):
+        """Set up each test."""
+        cache.clear()
+
+    def _search(self, url):
+        """Return ids of found offers."""
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [offer['id'] for offer in response.data]
+
+    def test_search_title(self):
+        """Test searching by offer's title."""
+        self.assertEqual(
+            self._search('/api/offers/?search=spacery'),
+            [self.dogs_offer.id],
+        )
+
+    def test_search_benefits(self):
+        """Test searching by offer's benefits."""
+        self.assertEqual(
+            self._search('/api/offers/?search=powietrzu'),
+            [self.dogs_offer.id],
+        )
+
+    def test_search_organization_name(self):
+        """Test searching by organization's name."""
+        self.assertEqual(
+            self._search('/api/offers/?search=azyl'),
+            [self.dogs_offer.id, self.garden_offer.id],
+        )
+
+    def test_search_all_words(self):
+        """Test that offers have to match all searched words."""
+        self.assertEqual(
+            self._search('/api/offers/?search=azyl+gdańsk'),
+            [self.garden_offer.id],
+        )
+
+    def test_empty_search(self):
+        """Test that empty search doesn't filter offers."""
+        self.assertEqual(len(self._search('/api/offers/?search=')), 2)
+
+    def test_search_paginated(self):
+        """Test that search results can be paginated."""
+        response = self.client.get('/api/offers/?search=azyl&page_size=1')
+        next_page = self.client.get(response.data['next'])
+
+        self.assertEqual(
+            [response.data['results'][0]['id'],
+             next_page.data['results'][0]['id']],
+            [self.dogs_offer.id, self.garden_offer.id],
+        )
+        self.assertIsNone(next_page.data['next'])
+
+
+class TestOfferPaginationOrdering(APITestCase):
+
+    """Tests for ordering of offers pagination."""
+
+    def setUp(self):
+        """Set up each test."""
+        self.paginator = OfferPagination()
+        self.paginator.ordering_fields = self.paginator.search_ordering
+
+    def test_reversed_ordering(self):
+        """Test that direction of every field is flipped."""
+        self.assertEqual(
+            self.paginator.get_ordering(reverse=True),
+            ['rank', '-weight', '-id'],
+        )
+
+    def test_seek_filter_descending(self):
+        """Test that comparison is flipped for descending fields."""
+        position = {'k': 1, 'p': ['0.5', 3, 1]}
+
+        seek_filter = str(self.paginator.get_seek_filter(position))
+        reverse_seek_filter = str(
+            self.paginator.get_seek_filter(position, reverse=True)
+        )
+
+        self.assertIn("('rank__lt', '0.5')", seek_filter)
+        self.assertIn("('weight__gt', 3)", seek_filter)
+        self.assertIn("('rank__gt', '0.5')", reverse_seek_filter)
+        self.assertIn("('weight__lt', 3)", reverse_seek_filter)
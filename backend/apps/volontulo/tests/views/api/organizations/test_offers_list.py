@@ -5,6 +5,7 @@
 from django.test import TestCase
 
 from apps.volontulo.factories import OfferFactory
+from apps.volontulo.factories import UserProfileFactory
 from apps.volontulo.tests import common
 
 
@@ -37,3 +38,34 @@ class TestOrganizationOffers(TestCase):
         self.assertEqual(res.status_code, 200)
         for offer in res.data:
             common.test_offer_list_fields(self, offer)
+
+    def test_unpublished_visibility(self):
+        """ Test that unpublished offers are shown only to members """
+        unpublished = OfferFactory.create(
+            organization=self.offer.organization,
+            offer_status='unpublished',
+        )
+        member = UserProfileFactory.create(
+            organizations=(self.offer.organization,),
+        )
+        administrator = UserProfileFactory.create(is_administrator=True)
+        path = '/api/organizations/{}/offers/'.format(
+            self.offer.organization.id,
+        )
+
+        for user, offers_ids in (
+                (None, [self.offer.id]),
+                (UserProfileFactory.create().user, [self.offer.id]),
+                (member.user, [self.offer.id, unpublished.id]),
+                (administrator.user, [self.offer.id, unpublished.id]),
+        ):
+            self.client.logout()
+            if user is not None:
+                self.client.force_login(user)
+
+            res = self.client.get(path)
+
+            self.assertEqual(
+                sorted(offer['id'] for offer in res.data),
+                sorted(offers_ids),
+            )
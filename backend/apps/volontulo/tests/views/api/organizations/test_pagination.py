@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: test_pagination
+"""
+
+from rest_framework.test import APITestCase
+
+from apps.volontulo.factories import OrganizationFactory
+
+
+class TestOrganizationsPaginationAPIView(APITestCase):
+
+    """Tests for REST API's organizations keyset pagination."""
+
+    def test_pages_follow_name_order(self):
+        """Test that pages follow (name, id) ordering."""
+        organizations = [
+            OrganizationFactory(name=name)
+            for name in ('Gamma', 'Alpha', 'Beta', 'Alpha')
+        ]
+        url = '/api/organizations/?page_size=3'
+        ids = []
+        while url:
+            response = self.client.get(url)
+            ids.extend(org['id'] for org in response.data['results'])
+            url = response.data['next']
+
+        self.assertEqual(ids, [
+            org.id for org in sorted(
+                organizations,
+                key=lambda org: (org.name, org.id),
+            )
+        ])
@@ -10,6 +10,7 @@ from django.test import Client
 from django.test import TestCase
 
 from apps.volontulo.models import Offer
+from apps.volontulo.models import OfferApplication
 from apps.volontulo.models import Organization
 from apps.volontulo.models import UserProfile
 
@@ -149,6 +150,78 @@ class TestOffersJoin(TestCase):
             'Już wyraziłeś chęć uczestnictwa w tej ofercie.',
         )
 
+    def test_offers_join_creates_application(self):
+        """Test that joining offer creates application."""
+        self.client.login(
+            username='volunteer@example.com',
+            password='vol123',
+        )
+
+        self.client.post('/o/offers/volontulo-offer/{}/join'.format(
+            self.offer.id
+        ), {
+            'email': 'volunteer@example.com',
+            'phone_no': '+42 42 42 42',
+            'fullname': 'Mister Volunteer',
+            'comments': 'Some important staff.',
+        })
+
+        self.assertEqual(
+            list(self.offer.volunteers.all()),
+            [self.volunteer],
+        )
+        self.assertEqual(
+            Offer.objects.get(id=self.offer.id).volunteers_count,
+            1,
+        )
+
+    def test_offers_join_full_offer(self):
+        """Test attempt of joining offer without free places."""
+        Offer.objects.filter(id=self.offer.id).update(
+            volunteers_limit=1,
+            volunteers_count=1,
+            reserve_recruitment=False,
+        )
+        self.client.login(
+            username='volunteer@example.com',
+            password='vol123',
+        )
+
+        response = self.client.post('/o/offers/volontulo-offer/{}/join'.format(
+            self.offer.id
+        ), {
+            'email': 'volunteer@example.com',
+            'phone_no': '+42 42 42 42',
+            'fullname': 'Mister Volunteer',
+            'comments': 'Some important staff.',
+        }, follow=True)
+
+        self.assertRedirects(response, '/o/offers', 302, 200)
+        self.assertContains(
+            response,
+            'Niestety, w tej ofercie nie ma już wolnych miejsc.',
+        )
+        self.assertFalse(self.offer.volunteers.exists())
+
+    def test_join_page_for_applied_user(self):
+        """Test that user who already applied is redirected."""
+        OfferApplication.objects.create(offer=self.offer, user=self.volunteer)
+        self.client.login(
+            username='volunteer@example.com',
+            password='vol123',
+        )
+
+        response = self.client.get(
+            '/o/offers/volontulo-offer/{}/join'.format(self.offer.id),
+            follow=True,
+        )
+
+        self.assertRedirects(response, '/o/offers', 302, 200)
+        self.assertContains(
+            response,
+            'Już wyraziłeś chęć uczestnictwa w tej ofercie.',
+        )
+
     def test_offers_join_valid_form_and_anonymous_user(self):
         """Test attempt of joining offer with valid form and anon user."""
         post_data = {
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: test_offers_reorder
+"""
+
+from django.test import TestCase
+
+from apps.volontulo.models import Offer
+from apps.volontulo.tests.views.offers.commons import TestOffersCommons
+
+
+class TestOffersReorder(TestOffersCommons, TestCase):
+    """Class responsible for testing offers reordering."""
+
+    def test_offers_reorder_for_admin(self):
+        """Test that admin sets weights of offers."""
+        self.client.login(username='admin@example.com', password='123admin')
+
+        response = self.client.post('/o/offers/reorder/', {
+            'submit': 'reorder',
+            'weight_{}'.format(self.active_offer.id): '7',
+            'weight_{}'.format(self.inactive_offer.id): '-2',
+        })
+
+        self.assertRedirects(
+            response,
+            '/o/offers',
+            fetch_redirect_response=False,
+        )
+        self.assertEqual(Offer.objects.get(id=self.active_offer.id).weight, 7)
+        self.assertEqual(
+            Offer.objects.get(id=self.inactive_offer.id).weight,
+            -2,
+        )
+
+    def test_offers_reorder_invalid_weight(self):
+        """Test that invalid weights leave offers untouched."""
+        self.client.login(username='admin@example.com', password='123admin')
+
+        self.client.post('/o/offers/reorder/', {
+            'submit': 'reorder',
+            'weight_{}'.format(self.active_offer.id): '7',
+            'weight_{}'.format(self.inactive_offer.id): 'abc',
+        })
+
+        self.assertEqual(
+            Offer.objects.get(id=self.active_offer.id).weight,
+            self.active_offer.weight,
+        )
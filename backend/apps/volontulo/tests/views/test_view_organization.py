@@ -47,7 +47,8 @@ class TestCreateOrganization(TestOrganizations):
             'Ta organizacja nie utworzyła jeszcze żadnych ofert.'
         )
         self.assertIn('offers', response.context)
-        self.assertEqual(len(response.context['offers']), 14)
+        # unpublished offers are shown only to organization's members:
+        self.assertEqual(len(response.context['offers']), 4)
 
     def test__get_empty_organization_view_by_volunteer(self):
         """Requesting for empty organization view by volunteer user."""
@@ -51,6 +51,8 @@ urlpatterns = [
         name='password_reset_confirm'
     ),
     url(r'^api/messages/$', api_views.messages_view, name='messages'),
+    url(r'^api/profiling/$', api_views.profiling_view, name='profiling'),
+    url(r'^metrics$', views.metrics_view, name='metrics'),
 
     # login and loggged user space:
     url(r'^o/logout$', auth_views.logout, name='logout'),
@@ -5,6 +5,7 @@ u"""
 """
 from django.contrib.admin.models import LogEntry
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.contrib.contenttypes.models import ContentType
 from django.shortcuts import get_object_or_404
 from django.shortcuts import redirect
@@ -23,29 +24,55 @@ OFFERS_STATUSES = {
     'CLOSED': 'Zamknięta',
 }
 
+ADMINISTRATORS_EMAILS_CACHE_KEY = 'volontulo:administrators_emails'
+# Signals invalidate the cache, timeout only limits staleness when cache
+# backend isn't shared between processes:
+ADMINISTRATORS_EMAILS_CACHE_TIMEOUT = 60 * 60
+
 
 def get_administrators_emails():
     """Get all administrators emails or superuser email
 
+    Emails are cached and invalidated by signals when administrators change.
+
     Format returned:
     emails = {
         1: 'admin1@example.com',
         2: 'admin2@example.com',
     }
     """
-    administrators = UserProfile.objects.filter(is_administrator=True)
-    emails = {}
-    for admin in administrators:
-        emails[str(admin.user.id)] = admin.user.email
+    emails = cache.get(ADMINISTRATORS_EMAILS_CACHE_KEY)
+    if emails is not None:
+        return emails
 
-    if not emails:
-        administrators = User.objects.filter(is_superuser=True)
-        for admin in administrators:
-            emails[str(admin.id)] = admin.email
+    emails = {
+        str(user_id): email
+        for user_id, email in UserProfile.objects.filter(
+            is_administrator=True,
+        ).values_list('user_id', 'user__email')
+    }
 
+    if not emails:
+        emails = {
+            str(user_id): email
+            for user_id, email in User.objects.filter(
+                is_superuser=True,
+            ).values_list('id', 'email')
+        }
+
+    cache.set(
+        ADMINISTRATORS_EMAILS_CACHE_KEY,
+        emails,
+        ADMINISTRATORS_EMAILS_CACHE_TIMEOUT,
+    )
     return emails
 
 
+def invalidate_administrators_emails():
+    """Drop cached administrators emails."""
+    cache.delete(ADMINISTRATORS_EMAILS_CACHE_KEY)
+
+
 def save_history(req, obj, action):
     """Save model changes history."""
     LogEntry.objects.log_action(
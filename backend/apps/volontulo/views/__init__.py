@@ -7,14 +7,16 @@ from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.models import User
+from django.http import Http404
+from django.http import HttpResponse
 from django.shortcuts import render
 
 from apps.volontulo.forms import AdministratorContactForm
 from apps.volontulo.forms import EditProfileForm
 from apps.volontulo.forms import UserGalleryForm
+from apps.volontulo.lib import metrics
 from apps.volontulo.lib.email import send_mail
 from apps.volontulo.models import Offer
-from apps.volontulo.models import UserProfile
 
 
 def logged_as_admin(request):
@@ -26,7 +28,7 @@ def logged_as_admin(request):
     """
     return (
         request.user.is_authenticated() and
-        UserProfile.objects.get(user=request.user).is_administrator
+        request.user.userprofile.is_administrator
     )
 
 
@@ -49,12 +51,20 @@ def logged_user_profile(request):
 
     def _populate_participated_offers(request):
         """Populate offers that current user participate."""
-        return Offer.objects.filter(volunteers=request.user)
+        return Offer.objects.filter(
+            volunteers=request.user,
+        ).select_related(
+            'organization',
+        ).prefetch_related(
+            'images',
+        )
 
     def _populate_created_offers(request):
         """Populate offers that current user create."""
         return Offer.objects.filter(
             organization__userprofiles__user=request.user
+        ).prefetch_related(
+            'images',
         )
 
     def _is_saving_user_avatar():
@@ -116,7 +126,7 @@ def logged_user_profile(request):
             )
 
     profile_form = _init_edit_profile_form()
-    userprofile = UserProfile.objects.get(user=request.user)
+    userprofile = request.user.userprofile
 
     if request.method == 'POST':
         if _is_saving_user_avatar():
@@ -202,3 +212,16 @@ def server_error(request):
         request,
         '500.html',
     )
+
+
+def metrics_view(request):  # pylint: disable=unused-argument
+    """Metrics of all workers in Prometheus text format.
+
+    :param request: WSGIRequest instance
+    """
+    if not settings.METRICS:
+        raise Http404
+    return HttpResponse(
+        metrics.render(),
+        content_type='text/plain; version=0.0.4; charset=utf-8',
+    )
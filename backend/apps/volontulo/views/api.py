@@ -3,6 +3,8 @@
 """
 .. module:: api
 """
+import logging
+
 from django.contrib import messages
 from django.contrib.auth import authenticate
 from django.contrib.auth import login
@@ -11,28 +13,46 @@ from django.contrib.auth.models import User
 from django.contrib.auth.tokens import default_token_generator
 from django.contrib.messages import get_messages
 from django.contrib.sites.shortcuts import get_current_site
-from django.db.models import Q
+from django.core.cache import cache
+from django.db import DatabaseError
+from django.db import transaction
+from django.db.models import prefetch_related_objects
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django.utils.encoding import force_bytes, force_text
 from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import status
-from rest_framework.decorators import api_view, detail_route
+from rest_framework.decorators import api_view, detail_route, list_route
 from rest_framework.decorators import authentication_classes
 from rest_framework.decorators import permission_classes
+from rest_framework.exceptions import PermissionDenied
+from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import MultiPartParser
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework import viewsets
 
+from apps.volontulo import filters
 from apps.volontulo import models
+from apps.volontulo import pagination
 from apps.volontulo import permissions
 from apps.volontulo import serializers
 from apps.volontulo.authentication import CsrfExemptSessionAuthentication
+from apps.volontulo.lib import ndjson
+from apps.volontulo.lib import profiling
+from apps.volontulo.lib.api_cache import get_response_cache_key
+from apps.volontulo.lib.api_cache import invalidate_api_cache
+from apps.volontulo.lib.api_cache import RESPONSE_CACHE_TIMEOUT
+from apps.volontulo.lib.conditional_get import conditional_response
+from apps.volontulo.lib.conditional_get import respond_conditionally
 from apps.volontulo.lib.email import send_mail
+from apps.volontulo.lib.geo import geocode
 from apps.volontulo.models import Organization
 from apps.volontulo.serializers import \
     OrganizationContactSerializer, UsernameSerializer, PasswordSerializer
-from apps.volontulo.views import logged_as_admin
+
+logger = logging.getLogger('volontulo.api')
 
 
 @api_view(['POST'])
@@ -139,6 +159,33 @@ def password_reset_confirm(request, uidb64, token):
     return Response({}, status=status.HTTP_201_CREATED)
 
 
+@api_view(['GET', 'DELETE'])
+@permission_classes((permissions.IsAdministrator,))
+def profiling_view(request):
+    """REST API view with request profiling counters aggregated by view.
+
+    Times are given in milliseconds. DELETE resets the counters.
+    """
+    if request.method == 'DELETE':
+        profiling.reset_stats()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+    return Response([
+        {
+            'view': stats['view'],
+            'requests': stats['requests'],
+            'slow_requests': stats['slow_requests'],
+            'time': stats['time'] / 1000,
+            'average_time': stats['time'] / stats['requests'] / 1000,
+            'average_db_time': stats['db_time'] / stats['requests'] / 1000,
+            'average_queries': stats['queries'] / stats['requests'],
+            'average_duplicate_queries': (
+                stats['duplicate_queries'] / stats['requests']
+            ),
+        }
+        for stats in profiling.get_stats()
+    ], status=status.HTTP_200_OK)
+
+
 @api_view(['GET'])
 @permission_classes((AllowAny,))
 def messages_view(request):
@@ -149,15 +196,98 @@ def messages_view(request):
     )
 
 
+class ConditionalGetMixin(object):
+
+    """Answers with 304 Not Modified if listed or retrieved objects didn't
+    change since client's last request."""
+
+    timestamp_fields = ('updated_at',)
+
+    def list(self, request, *args, **kwargs):
+        """List objects or answer with 304 Not Modified."""
+        return conditional_response(
+            request,
+            self.filter_queryset(self.get_queryset()),
+            lambda: super(ConditionalGetMixin, self).list(
+                request, *args, **kwargs
+            ),
+            self.timestamp_fields,
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        """Retrieve object or answer with 304 Not Modified."""
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        return conditional_response(
+            request,
+            self.filter_queryset(self.get_queryset()).filter(**{
+                self.lookup_field: kwargs[lookup_url_kwarg],
+            }),
+            lambda: super(ConditionalGetMixin, self).retrieve(
+                request, *args, **kwargs
+            ),
+            self.timestamp_fields,
+        )
+
+
+class AnonymousCacheMixin(object):
+
+    """Serves list responses for anonymous users from cache.
+
+    All anonymous users see the same objects, so they share cached
+    responses. Cache is invalidated by signals whenever listed objects
+    change.
+    """
+
+    def list(self, request, *args, **kwargs):
+        """List objects, from cache for anonymous users."""
+        if request.user.is_authenticated():
+            return super(AnonymousCacheMixin, self).list(
+                request, *args, **kwargs
+            )
+
+        cache_key = get_response_cache_key(request)
+        cached = cache.get(cache_key)
+        if cached is None:
+            response = super(AnonymousCacheMixin, self).list(
+                request, *args, **kwargs
+            )
+            if response.status_code == status.HTTP_200_OK:
+                cache.set(cache_key, {
+                    'data': response.data,
+                    'etag': response['ETag'],
+                    'last_modified': response.last_modified_timestamp,
+                }, RESPONSE_CACHE_TIMEOUT)
+            return response
+
+        return respond_conditionally(
+            request,
+            cached['etag'],
+            cached['last_modified'],
+            lambda: Response(cached['data'], status=status.HTTP_200_OK),
+        )
+
+
 @authentication_classes((CsrfExemptSessionAuthentication,))
-class OfferViewSet(viewsets.ModelViewSet):
+class OfferViewSet(AnonymousCacheMixin, ConditionalGetMixin,
+                   viewsets.ModelViewSet):
 
     """REST API offers viewset."""
 
-    queryset = models.Offer.objects.order_by('weight')
+    queryset = models.Offer.objects.select_related(
+        'organization',
+    ).prefetch_related(
+        'images',
+    ).order_by('weight')
     serializer_class = serializers.OfferSerializer
     permission_classes = (permissions.OfferPermission,)
-    filter_backends = (DjangoFilterBackend,)
+    pagination_class = pagination.OfferPagination
+    timestamp_fields = ('updated_at', 'organization__updated_at')
+    filter_backends = (
+        filters.OfferPermissionFilter,
+        DjangoFilterBackend,
+        filters.OfferSearchFilter,
+        filters.OfferNearFilter,
+    )
     filter_fields = (
         'finished_at',
         'location',
@@ -168,29 +298,184 @@ class OfferViewSet(viewsets.ModelViewSet):
         'started_at',
         'recruitment_end_date'
     )
+    import_batch_size = 100
+    export_batch_size = 500
 
-    def get_queryset(self):
-        """Queryset depends on user role."""
-        qs = super(OfferViewSet, self).get_queryset()
-
-        if logged_as_admin(self.request):
-            return qs
-        user = self.request.user
-        if user.is_authenticated():
-            return qs.filter(
-                Q(offer_status='published') |
-                Q(organization__in=user.userprofile.organizations.all())
-            )
-        return qs.filter(offer_status='published')
+    @staticmethod
+    @list_route(
+        methods=['POST'],
+        permission_classes=(permissions.IsAdministrator,),
+    )
+    def reorder(request):
+        """Endpoint to order offers as in given list of their ids.
+
+        List is validated and offers are reordered in one transaction.
+        Offers created or deleted meanwhile are detected by number of
+        reordered ones, and the transaction is rolled back.
+        """
+        serializer = serializers.OffersReorderSerializer(data=request.data)
+        with transaction.atomic():
+            serializer.is_valid(raise_exception=True)
+            offers = serializer.validated_data['offers']
+            reordered = models.Offer.objects.reorder(offers)
+            if not reordered == len(offers) == models.Offer.objects.count():
+                raise ValidationError({'offers': [
+                    serializer.incomplete_message,
+                ]})
+        return Response({}, status=status.HTTP_200_OK)
+
+    @list_route(
+        methods=['POST'],
+        url_path='import',
+        renderer_classes=(ndjson.NDJSONRenderer,),
+    )
+    def import_offers(self, request):
+        """Endpoint creating offers from NDJSON, one offer per line.
+
+        Streams back NDJSON result of every line: created offer's id (on
+        databases returning ids from bulk inserts) or validation errors.
+        Offers have no images, these are uploaded separately.
+        """
+        return StreamingHttpResponse(
+            self._import_offers(request),
+            content_type=ndjson.CONTENT_TYPE,
+        )
+
+    def _import_offers(self, request):
+        """Yield NDJSON results of validating and inserting offers.
 
+        Request body is read lazily, batch by batch. Each batch is
+        inserted with a single bulk_create in its own transaction, rows of
+        a batch that failed to insert are reported as errors.
+        """
+        for batch in ndjson.iter_batches(
+                ndjson.iter_rows(request.stream or []),
+                self.import_batch_size,
+        ):
+            results = []
+            offers = []
+            for number, row in batch:
+                offer, errors = self._validate_import_row(request, row)
+                if offer is not None:
+                    offers.append(offer)
+                    results.append({'line': number, 'offer': offer})
+                else:
+                    results.append({
+                        'line': number,
+                        'status': 'invalid',
+                        'errors': errors,
+                    })
+            inserted = self._insert_offers(offers)
+            for result in results:
+                offer = result.pop('offer', None)
+                if offer is not None and inserted:
+                    result.update(status='created', id=offer.pk)
+                elif offer is not None:
+                    result.update(status='error', errors={
+                        'non_field_errors': ["Nie udało się zapisać oferty."],
+                    })
+                yield ndjson.dumps(result)
 
-class OrganizationViewSet(viewsets.ModelViewSet):
+    @staticmethod
+    def _insert_offers(offers):
+        """Insert offers in a transaction and return if it succeeded."""
+        if not offers:
+            return True
+        try:
+            with transaction.atomic():
+                models.Offer.objects.bulk_create(offers)
+        except DatabaseError as ex:
+            logger.warning('Import of %d offers failed: %s', len(offers), ex)
+            return False
+        # bulk_create sends no post_save signals:
+        invalidate_api_cache()
+        return True
+
+    @staticmethod
+    def _validate_import_row(request, row):
+        """Return (unsaved offer, None) built from row or (None, errors)."""
+        if not isinstance(row, dict):
+            return None, {'non_field_errors': ["Niepoprawny wiersz JSON."]}
+        if row.get('image') is not None:
+            return None, {'image': ["Import nie obsługuje obrazów."]}
+        serializer = serializers.OfferSerializer(
+            data=row,
+            context={'request': request},
+        )
+        try:
+            if not serializer.is_valid():
+                return None, serializer.errors
+        except PermissionDenied as ex:
+            return None, {'organization': [ex.detail]}
+        data = dict(serializer.validated_data)
+        data.pop('images', None)
+        offer = models.Offer(**data)
+        # bulk_create sends no pre_save signals:
+        offer.latitude, offer.longitude = (
+            geocode(offer.location) or (None, None)
+        )
+        return offer, None
+
+    @list_route(
+        methods=['GET'],
+        url_path='export',
+        renderer_classes=(ndjson.NDJSONRenderer,),
+    )
+    def export_offers(self, request):
+        """Endpoint streaming offers visible to user as NDJSON.
+
+        Offers are read with iterator(), images are prefetched batch by
+        batch, so memory use doesn't grow with the number of offers.
+        """
+        return StreamingHttpResponse(
+            self._export_offers(
+                self.filter_queryset(self.get_queryset()),
+                request,
+            ),
+            content_type=ndjson.CONTENT_TYPE,
+        )
+
+    def _export_offers(self, queryset, request):
+        """Yield NDJSON lines of serialized offers."""
+        for batch in ndjson.iter_batches(
+                queryset.prefetch_related(None).iterator(),
+                self.export_batch_size,
+        ):
+            prefetch_related_objects(batch, 'images')
+            for offer in batch:
+                yield ndjson.dumps(serializers.OfferSerializer(
+                    offer,
+                    context={'request': request},
+                ).data)
+
+    @detail_route(methods=['POST'], parser_classes=(MultiPartParser,))
+    # pylint: disable=invalid-name,unused-argument
+    def image(self, request, pk):
+        """Endpoint to replace offer's image with multipart upload.
+
+        Django streams uploaded files bigger than FILE_UPLOAD_MAX_MEMORY_SIZE
+        to a temporary file, so big images aren't held in memory.
+        """
+        offer = self.get_object()
+        serializer = serializers.OfferImageUploadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        image = serializer.validated_data['image']
+        serializers.OfferSerializer.replace_image(offer, image.name, image)
+        return Response(
+            self.get_serializer(self.get_object()).data,
+            status=status.HTTP_200_OK,
+        )
+
+
+class OrganizationViewSet(AnonymousCacheMixin, ConditionalGetMixin,
+                          viewsets.ModelViewSet):
 
     """REST API organizations viewset."""
 
     queryset = models.Organization.objects.all()
     serializer_class = serializers.OrganizationSerializer
     permission_classes = (permissions.OrganizationPermission,)
+    pagination_class = pagination.OrganizationPagination
 
     @staticmethod
     @detail_route(methods=['POST'], permission_classes=(AllowAny,))
@@ -217,17 +502,22 @@ class OrganizationViewSet(viewsets.ModelViewSet):
     def offers(request, pk):
         """ Endpoint to get offers for organization """
         organization = get_object_or_404(Organization, id=pk)
-        is_user_org_member = False
-        if request.user.is_authenticated:
-            if organization in request.user.userprofile.organizations.all():
-                is_user_org_member = True
-        if logged_as_admin(request) or is_user_org_member:
-            offers = organization.offer_set.get_for_administrator()
-        else:
-            offers = organization.offer_set.get_weightened()
-        return Response(
-            serializers.OfferSerializer(
-                offers,
-                many=True,
-                context={'request': request}).data,
-            status=status.HTTP_200_OK)
+        offers = filters.OfferPermissionFilter().filter_queryset(
+            request,
+            organization.offer_set.order_by('weight'),
+        ).select_related(
+            'organization',
+        ).prefetch_related(
+            'images',
+        )
+        return conditional_response(
+            request,
+            offers,
+            lambda: Response(
+                serializers.OfferSerializer(
+                    offers,
+                    many=True,
+                    context={'request': request}).data,
+                status=status.HTTP_200_OK),
+            ('updated_at', 'organization__updated_at'),
+        )
@@ -19,7 +19,9 @@ from apps.volontulo.forms import (
     CreateOfferForm, OfferApplyForm, OfferImageForm
 )
 from apps.volontulo.lib.email import send_mail
-from apps.volontulo.models import Offer, OfferImage, UserProfile
+from apps.volontulo.models import (
+    Offer, OfferApplication, OfferImage, UserProfile
+)
 from apps.volontulo.utils import correct_slug, save_history
 from apps.volontulo.views import logged_as_admin
 
@@ -40,7 +42,11 @@ class OffersList(View):
             offers = Offer.objects.get_active()
 
         return render(request, "offers/offers_list.html", context={
-            'offers': offers,
+            'offers': offers.select_related(
+                'organization',
+            ).prefetch_related(
+                'images',
+            ),
         })
 
     @staticmethod
@@ -173,15 +179,19 @@ class OffersReorder(View):
         :param id_:
         :return:
         """
-        offers = Offer.objects.get_weightened()
+        offers = Offer.objects.get_weightened().select_related(
+            'organization',
+        ).prefetch_related(
+            'images',
+        )
         return render(request, 'offers/reorder.html', {
             'offers': offers, 'id': id_})
 
     @staticmethod
-    def post(request, _):
-        """Display offer list with weights GET request.
+    def post(request, id_):  # pylint: disable=unused-argument
+        """Save weights of offers POST request.
 
-        :param request:
+        :param request: WSGIRequest instance
         :param id_: Integer newly created offer id
         :return:
         """
@@ -190,10 +200,16 @@ class OffersReorder(View):
                      for item
                      in request.POST.items()
                      if item[0].startswith('weight_')]
-            weights = {id_.split('_')[1]: weight
-                       for id_, weight in items}
-            for id_, weight in weights.items():
-                Offer.objects.filter(id=id_).update(weight=weight)
+            try:
+                weights = {int(id_.split('_')[1]): int(weight)
+                           for id_, weight in items}
+            except ValueError:
+                messages.error(
+                    request,
+                    "Wagi ofert muszą być liczbami całkowitymi."
+                )
+                return redirect('offers_list')
+            Offer.objects.set_weights(weights)
 
             messages.success(
                 request,
@@ -299,9 +315,9 @@ class OffersEdit(View):
         )
 
         if form.is_valid():
-            offer = form.save()
+            offer = form.save(commit=False)
+            offer.save_without_counters()
             offer.unpublish()
-            offer.save()
             save_history(request, offer, action=CHANGE)
             messages.success(request, "Oferta została zmieniona.")
         else:
@@ -381,10 +397,10 @@ class OffersJoin(View):
     def get(request, slug, id_):  # pylint: disable=unused-argument
         """View responsible for showing join form for particular offer."""
         if request.user.is_authenticated():
-            has_applied = Offer.objects.filter(
-                volunteers=request.user,
-                volunteers__offer=id_,
-            ).count()
+            has_applied = OfferApplication.objects.filter(
+                offer_id=id_,
+                user=request.user,
+            ).exists()
             if has_applied:
                 messages.error(
                     request,
@@ -447,19 +463,20 @@ class OffersJoin(View):
                 )
                 return redirect('register')
 
-            has_applied = Offer.objects.filter(
-                volunteers=user,
-                volunteers__offer=id_,
-            ).count()
-            if has_applied:
+            result = OfferApplication.objects.apply(offer.id, user.id)
+            if result == OfferApplication.objects.ALREADY_APPLIED:
                 messages.error(
                     request,
                     "Już wyraziłeś chęć uczestnictwa w tej ofercie."
                 )
                 return redirect('offers_list')
+            if result == OfferApplication.objects.OFFER_FULL:
+                messages.error(
+                    request,
+                    "Niestety, w tej ofercie nie ma już wolnych miejsc."
+                )
+                return redirect('offers_list')
 
-            offer.volunteers.add(user)
-            offer.save()
             send_mail(
                 request,
                 'offer_application',
@@ -475,10 +492,17 @@ class OffersJoin(View):
                     offer=offer,
                 )
             )
-            messages.success(
-                request,
-                "Zgłoszenie chęci uczestnictwa zostało wysłane."
-            )
+            if result == OfferApplication.objects.APPLIED_RESERVE:
+                messages.success(
+                    request,
+                    "Zgłoszenie chęci uczestnictwa zostało wysłane. "
+                    "Zostałeś wpisany na listę rezerwową."
+                )
+            else:
+                messages.success(
+                    request,
+                    "Zgłoszenie chęci uczestnictwa zostało wysłane."
+                )
             return redirect(
                 '{ANGULAR_ROOT}/offers/{slug}/{id}'.format(
                     ANGULAR_ROOT=settings.ANGULAR_ROOT,
@@ -516,5 +540,7 @@ class OffersArchived(View):
         :param request: WSGIRequest instance
         """
         return render(request, 'offers/archived.html', {
-            'offers': Offer.objects.get_archived()
+            'offers': Offer.objects.get_archived().select_related(
+                'organization',
+            ),
         })
@@ -14,6 +14,7 @@ from django.shortcuts import render
 from django.utils.text import slugify
 from django.views.generic import View
 
+from apps.volontulo.filters import OfferPermissionFilter
 from apps.volontulo.forms import VolounteerToOrganizationContactForm
 from apps.volontulo.lib.email import send_mail
 from apps.volontulo.models import Offer
@@ -139,13 +140,18 @@ def organization_form(request, slug, id_):  # pylint: disable=unused-argument
 def organization_view(request, slug, id_):  # pylint: disable=unused-argument
     """View responsible for viewing organization."""
     org = get_object_or_404(Organization, id=id_)
-    offers = Offer.objects.filter(organization_id=id_)
+    offers = OfferPermissionFilter().filter_queryset(
+        request,
+        Offer.objects.filter(organization_id=id_),
+    ).prefetch_related(
+        'images',
+    )
     allow_contact = True
     allow_edit = False
     allow_offer_create = False
     if (
             request.user.is_authenticated() and
-            request.user.userprofile in org.userprofiles.all()
+            org.id in request.user.userprofile.organization_ids
     ):
         allow_contact = False
         allow_edit = True
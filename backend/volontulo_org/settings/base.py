@@ -47,6 +47,8 @@ INSTALLED_APPS = (
 )
 
 MIDDLEWARE_CLASSES = (
+    'apps.volontulo.middleware.RequestProfilingMiddleware',
+    'apps.volontulo.middleware.MetricsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -108,6 +110,21 @@ REST_FRAMEWORK = {
     ),
 }
 
+# Cache
+# Cached API responses are invalidated by signals, so with several worker
+# processes use a backend shared between them, e.g. DatabaseCache with
+# LOCATION set to a table created by `manage.py createcachetable`.
+
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get(
+            'VOLONTULO_CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache',
+        ),
+        'LOCATION': os.environ.get('VOLONTULO_CACHE_LOCATION', ''),
+    }
+}
+
 # Internationalization
 # https://docs.djangoproject.com/en/1.8/topics/i18n/
 
@@ -122,6 +139,36 @@ USE_L10N = True
 USE_TZ = True
 
 
+# Request profiling
+# Opt-in, as recording queries of every request has its cost. Counters are
+# aggregated per view in the database, so they are shared by all workers
+# whatever the cache backend, and served to administrators at
+# /api/profiling/. Requests over the thresholds are logged to
+# `volontulo.profiling` logger.
+
+REQUEST_PROFILING = os.environ.get('VOLONTULO_REQUEST_PROFILING') == 'on'
+REQUEST_PROFILING_SLOW_TIME = float(os.environ.get(
+    'VOLONTULO_REQUEST_PROFILING_SLOW_TIME',
+    1.0,
+))
+REQUEST_PROFILING_SLOW_QUERIES = int(os.environ.get(
+    'VOLONTULO_REQUEST_PROFILING_SLOW_QUERIES',
+    50,
+))
+
+# Metrics
+# Opt-in Prometheus metrics served at /metrics. Every process buffers its
+# metrics and adds them to counters in the database every
+# METRICS_FLUSH_INTERVAL seconds, so all workers are aggregated with any
+# cache backend. Endpoint isn't authenticated, access to it should be
+# limited by the proxy.
+
+METRICS = os.environ.get('VOLONTULO_METRICS') == 'on'
+METRICS_FLUSH_INTERVAL = float(os.environ.get(
+    'VOLONTULO_METRICS_FLUSH_INTERVAL',
+    10,
+))
+
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/1.8/howto/static-files/
 
@@ -132,6 +179,9 @@ STATIC_URL = '/static/'
 EMAIL_HOST = 'localhost'
 EMAIL_PORT = 25
 EMAIL_USE_TLS = False
+# 'sync' sends emails within the request, 'queue' stores them in the outbox
+# for the send_queued_emails management command.
+EMAIL_DELIVERY_MODE = os.environ.get('VOLONTULO_EMAIL_DELIVERY_MODE', 'sync')
 
 
 # verify if it's required for registering user
@@ -141,6 +191,11 @@ AUTHENTICATION_BACKENDS = (
 
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 MEDIA_URL = '/media/'
+# uploaded offer images bigger than that (in bytes) are rejected:
+OFFER_IMAGE_MAX_SIZE = int(os.environ.get(
+    'VOLONTULO_OFFER_IMAGE_MAX_SIZE',
+    10 * 1024 * 1024,
+))
 
 SYSTEM_DOMAIN = 'localhost'
 